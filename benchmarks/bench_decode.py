@@ -0,0 +1,87 @@
+"""
+Micro-benchmark da decodificação de frames (process_frame).
+
+Compara o caminho antigo (JPEG colorido -> cinza -> expand_dims +
+concatenate) com o FrameDecoder (JPEG direto em cinza, buffer de 3 canais
+reaproveitado e decodificação reduzida opcional).
+
+Uso:
+    python -m benchmarks.bench_decode
+"""
+
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from focus_track_api.services.frame_pipeline import FrameDecoder
+
+RESOLUTIONS = [(640, 480), (1280, 720), (1920, 1080)]
+ITERATIONS = 200
+JPEG_QUALITY = 85
+
+
+def legacy_process_frame(data: bytes):
+    nparr = np.frombuffer(data, np.uint8)
+    img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    frame_size = img.shape[1], img.shape[0]
+    gray = np.expand_dims(gray, axis=2)
+    gray = np.concatenate([gray, gray, gray], axis=2)
+
+    return gray, frame_size
+
+
+def make_jpeg(width: int, height: int) -> bytes:
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    base = (x + y) / 2
+    noise = rng.normal(0, 12, (height, width)).astype(np.float32)
+    gray = np.clip(base + noise, 0, 255).astype(np.uint8)
+    img = cv2.merge([gray, np.flipud(gray), np.fliplr(gray)])
+    ok, encoded = cv2.imencode(
+        '.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY]
+    )
+    assert ok
+    return encoded.tobytes()
+
+
+def measure(decode, data: bytes) -> tuple[float, float]:
+    """Retorna (ms por frame, KiB de pico alocado por frame)"""
+    decode(data)  # aquecimento / alocação dos buffers reaproveitáveis
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        decode(data)
+    elapsed_ms = (time.perf_counter() - start) * 1000 / ITERATIONS
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    decode(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed_ms, (peak - base) / 1024
+
+
+def main():
+    print(f'{"resolução":>10} {"modo":<22} {"ms/frame":>9} {"KiB/frame":>10}')
+    for width, height in RESOLUTIONS:
+        data = make_jpeg(width, height)
+        modes = {
+            'legado': legacy_process_frame,
+            'cinza direto': FrameDecoder().decode,
+            'cinza reduzido (640)': FrameDecoder(max_decode_width=640).decode,
+        }
+        for name, decode in modes.items():
+            ms, kib = measure(decode, data)
+            resolution = f'{width}x{height}'
+            print(f'{resolution:>10} {name:<22} {ms:9.2f} {kib:10.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark do cálculo em lote dos landmarks métricos.
+
+Compara, por frame, get_metric_landmarks chamado frame a frame com
+get_metric_landmarks_batch sobre pilhas (N, 3, 478) de tamanhos
+crescentes, como no reprocessamento offline. Também mostra o erro máximo
+do lote em relação ao caminho de um frame.
+
+Uso:
+    python -m benchmarks.bench_face_geometry
+"""
+
+import time
+
+import numpy as np
+
+from focus_track_api.services.face_geometry import (
+    FaceGeometry,
+    get_metric_landmarks,
+    get_metric_landmarks_batch,
+)
+from tests.landmarks import FRAME_SIZE, make_landmarks
+
+BATCH_SIZES = (1, 10, 100, 1000)
+REPEATS = 5
+# Amplitude (graus) das poses aleatórias
+MAX_ANGLE = 30.0
+
+
+def make_stack(size: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return np.stack([
+        make_landmarks(*rng.uniform(-MAX_ANGLE, MAX_ANGLE, 3)).T
+        for _ in range(size)
+    ])
+
+
+def best_us(function, stack: np.ndarray) -> float:
+    """µs por frame de function(stack) no melhor de REPEATS"""
+    best = float('inf')
+    for _ in range(REPEATS):
+        data = stack.copy()
+        start = time.perf_counter()
+        function(data)
+        best = min(best, (time.perf_counter() - start) * 1e6 / len(stack))
+    return best
+
+
+def main():
+    width, height = FRAME_SIZE
+    pcf = FaceGeometry(frame_height=height, frame_width=width, fy=width)
+
+    def single(stack):
+        return [get_metric_landmarks(frame, pcf) for frame in stack]
+
+    def batch(stack):
+        return get_metric_landmarks_batch(stack, pcf)
+
+    print(f'{"N":>5} {"µs/frame":>9} {"lote µs/frame":>14} {"erro máx":>9}')
+    for size in BATCH_SIZES:
+        stack = make_stack(size)
+        metric, transforms = batch(stack.copy())
+        error = max(
+            max(
+                np.abs(expected - metric[i]).max(),
+                np.abs(expected_transform - transforms[i]).max(),
+            )
+            for i, (expected, expected_transform) in enumerate(
+                single(stack.copy())
+            )
+        )
+        print(
+            f'{size:5d} {best_us(single, stack):9.1f} '
+            f'{best_us(batch, stack):14.1f} {error:9.1e}'
+        )
+
+
+if __name__ == '__main__':
+    main()
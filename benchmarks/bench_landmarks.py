@@ -0,0 +1,116 @@
+"""
+Micro-benchmark da extração de landmarks do resultado do FaceMesh.
+
+Compara o caminho antigo (um np.array por ponto + percurso do protobuf por
+região) com `extract_landmarks` + `landmark_regions` (colunas x, y, z
+escritas direto no buffer reaproveitado e um único fancy index para todas
+as regiões).
+
+Uso:
+    python -m benchmarks.bench_landmarks
+"""
+
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from focus_track_api.utils.constants import FACE_REGIONS, LANDMARK_COUNT
+from focus_track_api.utils.utils import (
+    clamp_landmarks,
+    extract_landmarks,
+    landmark_regions,
+)
+from tests.landmarks import FRAME_SIZE, make_landmarks
+
+ITERATIONS = 500
+
+try:
+    from mediapipe.framework.formats import landmark_pb2
+except ImportError:  # pragma: no cover - mediapipe ausente
+    landmark_pb2 = None
+
+
+def make_face_mesh_result(landmarks: np.ndarray):
+    """Monta `multi_face_landmarks` com um rosto, como o FaceMesh retorna"""
+    if landmark_pb2 is not None:
+        face = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z in landmarks.tolist():
+            face.landmark.add(x=x, y=y, z=z)
+        return [face]
+
+    points = [SimpleNamespace(x=x, y=y, z=z) for x, y, z in landmarks.tolist()]
+    return [SimpleNamespace(landmark=points)]
+
+
+def legacy_face_landmarks(lms, frame_size):
+    width, height = frame_size
+
+    surface = 0
+    for lms0 in lms:
+        landmarks = [
+            np.array([point.x, point.y, point.z]) for point in lms0.landmark
+        ]
+        landmarks = np.array(landmarks)
+
+        landmarks[landmarks[:, 0] < 0.0, 0] = 0.0
+        landmarks[landmarks[:, 0] > 1.0, 0] = 1.0
+        landmarks[landmarks[:, 1] < 0.0, 1] = 0.0
+        landmarks[landmarks[:, 1] > 1.0, 1] = 1.0
+
+        dx = landmarks[:, 0].max() - landmarks[:, 0].min()
+        dy = landmarks[:, 1].max() - landmarks[:, 1].min()
+        if dx * dy > surface:
+            biggest_face = landmarks
+
+    landmarks_dict = {
+        region: [
+            [landmark.x * width, landmark.y * height]
+            for landmark in (lms[0].landmark[i] for i in indices)
+        ]
+        for region, indices in FACE_REGIONS.items()
+    }
+    return landmarks_dict, biggest_face
+
+
+def vectorised_face_landmarks(out):
+    def run(lms, frame_size):
+        landmarks = extract_landmarks(lms, out)
+        landmarks_dict = {
+            region: points.tolist()
+            for region, points in landmark_regions(
+                landmarks, frame_size
+            ).items()
+        }
+        return landmarks_dict, clamp_landmarks(landmarks)
+
+    return run
+
+
+def measure(extract, lms) -> float:
+    """Retorna ms por frame"""
+    extract(lms, FRAME_SIZE)  # aquecimento
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        extract(lms, FRAME_SIZE)
+    return (time.perf_counter() - start) * 1000 / ITERATIONS
+
+
+def main():
+    lms = make_face_mesh_result(make_landmarks())
+    out = np.empty((LANDMARK_COUNT, 3), dtype=np.float32)
+    source = 'protobuf' if landmark_pb2 is not None else 'SimpleNamespace'
+
+    print(f'pontos: {source}')
+    print(f'{"modo":<12} {"ms/frame":>9}')
+    modes = {
+        'legado': legacy_face_landmarks,
+        'vetorizado': vectorised_face_landmarks(out),
+    }
+    for name, extract in modes.items():
+        print(f'{name:<12} {measure(extract, lms):9.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark do HeadPoseEstimator.
+
+Compara o caminho atual (solvePnP iterativo do zero + solvePnPRefineVVS a
+cada frame) com o modo headless usando warm start (rvec/tvec do frame
+anterior) e/ou o solver SQPNP, e com o modo 'procrustes', que tira os
+ângulos da transformação já resolvida para os landmarks métricos, em uma
+sequência sintética de 300 frames com a cabeça oscilando e jitter de
+landmarks. O erro é a diferença máxima de ângulo (roll, pitch, yaw) em
+relação ao caminho atual.
+
+Também mede os landmarks métricos, comuns a todos os modos: a função de
+referência get_metric_landmarks contra o MetricLandmarkContext usado pelo
+HeadPoseEstimator.
+
+Uso:
+    python -m benchmarks.bench_pose
+"""
+
+import time
+
+import numpy as np
+
+from focus_track_api.services.face_geometry import get_metric_landmarks
+from focus_track_api.services.pose_estimation import HeadPoseEstimator
+from tests.landmarks import FRAME_SIZE, make_landmarks
+
+FRAMES = 300
+REPEATS = 5
+# Desvio do jitter dos landmarks, em pixels
+JITTER_PX = 0.3
+
+MODES = {
+    'atual (iterativo + VVS)': {},
+    'warm start + VVS': {'warm_start': True},
+    'warm start': {'warm_start': True, 'refine': False},
+    'sqpnp + VVS': {'solver': 'sqpnp'},
+    'sqpnp': {'solver': 'sqpnp', 'refine': False},
+    'sqpnp + warm start': {
+        'solver': 'sqpnp',
+        'warm_start': True,
+        'refine': False,
+    },
+    'procrustes': {'solver': 'procrustes'},
+}
+
+
+def head_sequence() -> list[np.ndarray]:
+    rng = np.random.default_rng(0)
+    frames = []
+    for i in range(FRAMES):
+        phase = 2 * np.pi * i / FRAMES
+        landmarks = make_landmarks(
+            yaw=25 * np.sin(phase),
+            pitch=10 * np.sin(2 * phase),
+            roll=5 * np.cos(phase),
+        )
+        landmarks[:, :2] += rng.normal(
+            0, JITTER_PX, (len(landmarks), 2)
+        ) / np.asarray(FRAME_SIZE)
+        frames.append(landmarks)
+    return frames
+
+
+def run(estimator: HeadPoseEstimator, frames) -> tuple[np.ndarray, float]:
+    """Retorna (ângulos por frame, µs por frame no melhor de REPEATS)"""
+    estimator.get_pose(None, frames[0], FRAME_SIZE)  # aquecimento
+
+    best_us = float('inf')
+    for _ in range(REPEATS):
+        estimator.reset()
+        angles = []
+        start = time.perf_counter()
+        for landmarks in frames:
+            _, roll, pitch, yaw = estimator.get_pose(
+                None, landmarks, FRAME_SIZE
+            )
+            angles.append((roll.item(), pitch.item(), yaw.item()))
+        elapsed_us = (time.perf_counter() - start) * 1e6 / len(frames)
+        best_us = min(best_us, elapsed_us)
+    return np.array(angles), best_us
+
+
+def best_us(function, frames) -> float:
+    """µs por frame de function(landmarks) no melhor de REPEATS"""
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for landmarks in frames:
+            function(landmarks)
+        elapsed_us = (time.perf_counter() - start) * 1e6 / len(frames)
+        best = min(best, elapsed_us)
+    return best
+
+
+def main():
+    frames = head_sequence()
+    estimator = HeadPoseEstimator()
+    reference, _ = run(estimator, frames)
+    reference_us = best_us(
+        lambda lms: get_metric_landmarks(lms.T.copy(), estimator.pcf), frames
+    )
+    fixed_us = best_us(estimator.metric_context.metric_landmarks, frames)
+
+    print(f'get_metric_landmarks (referência): {reference_us:.1f} µs/frame')
+    print(f'MetricLandmarkContext (modos solvePnP): {fixed_us:.1f} µs/frame')
+    print(
+        f'{"modo":<24} {"µs/frame":>9} {"µs PnP":>7} '
+        f'{"erro médio °":>13} {"máx °":>7}'
+    )
+    for name, options in MODES.items():
+        angles, elapsed_us = run(
+            HeadPoseEstimator(headless=True, **options), frames
+        )
+        error = np.abs(angles - reference)
+        print(
+            f'{name:<24} {elapsed_us:9.1f} {elapsed_us - fixed_us:7.1f} '
+            f'{error.mean():13.4f} {error.max():7.4f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Micro-benchmark da serialização das respostas do WebSocket de monitoramento.
+
+Compara o caminho antigo (árvore FrameMetrics/Point2D do Pydantic,
+`model_dump` e `json.dumps` como no `send_json` do Starlette) com o
+FrameResponder (FrameResult serializado uma única vez para texto JSON,
+binário ou delta): µs de serialização e bytes por frame.
+
+Também simula uma sequência de frames com leve movimento de cabeça para
+medir o tráfego médio de cada formato (o modo delta depende do movimento).
+
+Uso:
+    python -m benchmarks.bench_response
+"""
+
+import json
+import time
+
+import numpy as np
+
+from focus_track_api.schemas.attention import (
+    AttentionMetrics,
+    FaceLandmarks,
+    FrameMetrics,
+    Point2D,
+)
+from focus_track_api.schemas.monitor import MonitorOptions
+from focus_track_api.services.frame_response import FrameResponder, FrameResult
+from focus_track_api.utils.utils import region_points, split_regions
+from tests.landmarks import FRAME_SIZE, make_landmarks
+
+ITERATIONS = 2000
+SCORES = 12.5, 40.0, 80.25
+TIME_ON_SCREEN = 93.5
+SEQUENCE_FRAMES = 300
+# Amplitude (graus) do movimento de cabeça simulado e jitter (px)
+HEAD_SWAY = 3.0
+JITTER = 0.3
+
+
+def legacy_response(points) -> bytes:
+    fatigue, distraction, attention = SCORES
+    payload = FrameMetrics(
+        landmarks=FaceLandmarks(**{
+            region: [Point2D(x=x, y=y) for x, y in coords.tolist()]
+            for region, coords in split_regions(points).items()
+        }),
+        attention_metrics=AttentionMetrics(
+            fatigue_score=fatigue,
+            distraction_score=distraction,
+            attention_score=attention,
+            time_on_screen=TIME_ON_SCREEN,
+        ),
+    ).model_dump()
+    payload['session_status'] = 'active'
+    payload['total_paused_time'] = 0.0
+    payload['paused_at'] = None
+    payload['frames_coalesced'] = 0
+    return json.dumps(
+        payload, ensure_ascii=False, separators=(',', ':')
+    ).encode()
+
+
+def responder_encoder(encoding: str):
+    responder = FrameResponder(MonitorOptions(encoding=encoding))
+
+    def encode(points):
+        return responder.respond(
+            FrameResult(
+                *SCORES,
+                time_on_screen=TIME_ON_SCREEN,
+                landmark_points=points,
+                session_status='active',
+            )
+        )
+
+    return encode
+
+
+def measure(encode, points) -> tuple[float, int]:
+    """Retorna (µs por frame, bytes por frame)"""
+    size = len(encode(points))
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        encode(points)
+    elapsed_us = (time.perf_counter() - start) * 1e6 / ITERATIONS
+
+    return elapsed_us, size
+
+
+def simulated_sequence() -> list:
+    """Frames com a cabeça oscilando lentamente e jitter do FaceMesh"""
+    rng = np.random.default_rng(0)
+    frames = []
+    for i in range(SEQUENCE_FRAMES):
+        yaw = HEAD_SWAY * np.sin(i / 30)
+        points = region_points(make_landmarks(yaw=yaw), FRAME_SIZE)
+        frames.append(points + rng.normal(0, JITTER, points.shape))
+    return frames
+
+
+def sequence_egress(frames, encode) -> float:
+    """Bytes médios por frame ao longo da sequência"""
+    return sum(len(encode(points)) for points in frames) / len(frames)
+
+
+def main():
+    points = region_points(make_landmarks(), FRAME_SIZE)
+    modes = {
+        'pydantic': lambda: legacy_response,
+        'json': lambda: responder_encoder('json'),
+        'binário': lambda: responder_encoder('binary'),
+        'delta': lambda: responder_encoder('delta'),
+    }
+
+    print(f'pontos por frame: {len(points)}')
+    print(f'{"modo":<9} {"µs/frame":>9} {"bytes":>7}')
+    for name, encoder in modes.items():
+        us, size = measure(encoder(), points)
+        print(f'{name:<9} {us:9.1f} {size:7d}')
+
+    frames = simulated_sequence()
+    print(f'\nsequência de {SEQUENCE_FRAMES} frames (bytes/frame):')
+    for name, encoder in modes.items():
+        print(f'{name:<9} {sequence_egress(frames, encoder()):9.0f}')
+
+
+if __name__ == '__main__':
+    main()
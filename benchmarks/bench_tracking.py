@@ -0,0 +1,180 @@
+"""
+Benchmark do rastreamento de landmarks entre execuções do FaceMesh.
+
+Com um vídeo gravado, compara o FramePipeline com FaceMesh em todos os
+frames (referência) ao pipeline com `tracking_interval` = N: custo por frame
+e erro dos landmarks rastreados, do EAR e da pose em relação à referência.
+
+Sem vídeo (ou sem o FaceMesh instalado), mede apenas o LandmarkTracker em
+uma sequência sintética: uma textura que se move como um rosto (oscilação
+lenta, rotação e jitter), com os landmarks verdadeiros conhecidos e o
+FaceMesh emulado pelos pontos verdadeiros a cada N frames.
+
+Uso:
+    python -m benchmarks.bench_tracking [video.mp4] [--intervals 2 3 5]
+"""
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from focus_track_api.services.frame_pipeline import (
+    FramePipeline,
+    PipelineConfig,
+)
+from focus_track_api.services.landmark_tracker import (
+    LandmarkTracker,
+    tracked_landmarks,
+)
+from focus_track_api.services.monitor_protocol import encode_raw_frame
+from focus_track_api.services.pose_estimation import HeadPoseEstimator
+from tests.landmarks import FRAME_SIZE, make_landmarks
+
+SYNTHETIC_FRAMES = 300
+DEFAULT_INTERVALS = [2, 3, 5, 10]
+# Custo típico de uma inferência do FaceMesh (refine_landmarks) em CPU,
+# usado apenas como referência na sequência sintética
+FACE_MESH_MS = 12.0
+
+
+def load_video(path: str) -> list[bytes]:
+    """Frames do vídeo como frames brutos RGB (sem custo de decodificação)"""
+    capture = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        frames.append(encode_raw_frame(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+    capture.release()
+    return frames
+
+
+def run_pipeline(frames: list[bytes], interval: int):
+    pipeline = FramePipeline(
+        PipelineConfig(tracking_interval=interval, landmarks_every=1)
+    )
+    analyses = []
+    start = time.perf_counter()
+    for frame in frames:
+        analyses.append(pipeline.process(frame))
+    elapsed_ms = (time.perf_counter() - start) * 1000 / len(frames)
+    pipeline.close()
+    return analyses, elapsed_ms, pipeline.tracker
+
+
+def compare_video(path: str, intervals: list[int]):
+    frames = load_video(path)
+    reference, reference_ms, _ = run_pipeline(frames, 1)
+    print(f'{len(frames)} frames, FaceMesh em todos: {reference_ms:.2f} ms')
+    print(
+        f'{"N":>3} {"ms/frame":>9} {"rastreados":>10} {"derivas":>8} '
+        f'{"erro px":>8} {"p95 px":>7} {"|ΔEAR|":>7} {"|Δyaw|":>7}'
+    )
+    for interval in intervals:
+        analyses, elapsed_ms, tracker = run_pipeline(frames, interval)
+        pairs = [
+            (ref, ana)
+            for ref, ana in zip(reference, analyses)
+            if ref.face_detected and ana.face_detected
+        ]
+        errors = np.concatenate([
+            np.linalg.norm(ref.landmark_points - ana.landmark_points, axis=1)
+            for ref, ana in pairs
+        ])
+        ear = np.mean([abs(ref.ear - ana.ear) for ref, ana in pairs])
+        yaw = np.mean([abs(ref.yaw - ana.yaw) for ref, ana in pairs])
+        print(
+            f'{interval:>3} {elapsed_ms:9.2f} {tracker.tracked_frames:>10} '
+            f'{tracker.drift_resets:>8} {errors.mean():8.2f} '
+            f'{np.percentile(errors, 95):7.2f} {ear:7.4f} {yaw:7.2f}'
+        )
+
+
+def synthetic_sequence():
+    """(frames em cinza, landmarks verdadeiros) de uma textura em movimento"""
+    rng = np.random.default_rng(0)
+    width, height = FRAME_SIZE
+    texture = cv2.GaussianBlur(
+        rng.integers(0, 256, (height, width), dtype=np.uint8), (0, 0), 2.0
+    )
+    texture = cv2.normalize(texture, None, 0, 255, cv2.NORM_MINMAX)
+    base = make_landmarks().astype(np.float32)
+    center = (width / 2, height / 2)
+
+    frames, landmarks = [], []
+    for i in range(SYNTHETIC_FRAMES):
+        phase = 2 * np.pi * i / SYNTHETIC_FRAMES
+        transform = cv2.getRotationMatrix2D(
+            center, 5 * np.sin(3 * phase), 1 + 0.05 * np.sin(phase)
+        )
+        transform[:, 2] += (30 * np.sin(2 * phase), 15 * np.cos(phase))
+        transform[:, 2] += rng.normal(0, 0.3, 2)
+        frames.append(cv2.warpAffine(texture, transform, FRAME_SIZE))
+
+        points = base[:, :2] * FRAME_SIZE @ transform[:, :2].T
+        moved = base.copy()
+        moved[:, :2] = (points + transform[:, 2]) / FRAME_SIZE
+        landmarks.append(moved)
+    return frames, landmarks
+
+
+def compare_synthetic(intervals: list[int]):
+    frames, truth = synthetic_sequence()
+    indices = tracked_landmarks(HeadPoseEstimator().model_lms_ids)
+    out = np.empty_like(truth[0])
+    print(
+        f'sequência sintética: {len(frames)} frames, FaceMesh emulado '
+        f'(~{FACE_MESH_MS:.0f} ms em CPU)'
+    )
+    print(
+        f'{"N":>3} {"ms rastreio":>11} {"ms/frame est.":>13} '
+        f'{"derivas":>8} {"erro px":>8} {"máx px":>7}'
+    )
+    for interval in intervals:
+        tracker = LandmarkTracker(indices, interval)
+        errors, tracking_s = [], 0.0
+        for frame, landmarks in zip(frames, truth):
+            start = time.perf_counter()
+            tracked = tracker.track(frame, out)
+            tracking_s += time.perf_counter() - start
+            if tracked is None:
+                tracker.reset(frame, landmarks)
+                continue
+            errors.append(
+                np.linalg.norm(
+                    (tracked[:, :2] - landmarks[:, :2]) * FRAME_SIZE, axis=1
+                )
+            )
+
+        errors = np.concatenate(errors)
+        tracking_ms = tracking_s * 1000 / max(tracker.tracked_frames, 1)
+        full_runs = len(frames) - tracker.tracked_frames
+        estimated_ms = (
+            full_runs * FACE_MESH_MS + tracker.tracked_frames * tracking_ms
+        ) / len(frames)
+        print(
+            f'{interval:>3} {tracking_ms:11.2f} {estimated_ms:13.2f} '
+            f'{tracker.drift_resets:>8} {errors.mean():8.2f} '
+            f'{errors.max():7.2f}'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('video', nargs='?')
+    parser.add_argument(
+        '--intervals', type=int, nargs='+', default=DEFAULT_INTERVALS
+    )
+    args = parser.parse_args()
+
+    if args.video:
+        compare_video(args.video, args.intervals)
+    else:
+        compare_synthetic(args.intervals)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from http import HTTPStatus
 
 from fastapi import FastAPI
@@ -11,8 +12,16 @@ from focus_track_api.routers import (
     users,
 )
 from focus_track_api.schemas.shared import Message
+from focus_track_api.services.cv_executor import shutdown_cv_executor
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    shutdown_cv_executor()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(auth.router)
 app.include_router(users.router)
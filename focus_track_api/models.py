@@ -3,7 +3,7 @@ from datetime import datetime
 from typing import List, Optional
 from zoneinfo import ZoneInfo
 
-from sqlalchemy import ForeignKey, Text, func
+from sqlalchemy import JSON, ForeignKey, Index, LargeBinary, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, registry, relationship
 
@@ -107,8 +107,19 @@ class StudySession:
     distraction_rate: Mapped[float] = mapped_column(default=0.0)
     max_fatigue: Mapped[float] = mapped_column(default=0.0)
     max_distraction: Mapped[float] = mapped_column(default=0.0)
+    # Quantis aproximados do attention_score (histograma da sessão)
+    attention_p50: Mapped[float] = mapped_column(default=0.0)
+    attention_p90: Mapped[float] = mapped_column(default=0.0)
+    attention_p99: Mapped[float] = mapped_column(default=0.0)
     perclos: Mapped[float] = mapped_column(default=0.0)
-    critical_events: Mapped[Optional[str]] = mapped_column(Text, default=None)
+    # Médias dos scores por bucket de tempo (blob de SessionTimeline)
+    attention_timeline: Mapped[Optional[bytes]] = mapped_column(
+        LargeBinary, default=None, deferred=True
+    )
+    # Frames por resolução processada pelo pipeline ("LxA" -> frames)
+    processing_resolutions: Mapped[Optional[dict]] = mapped_column(
+        JSON, default=None
+    )
     status: Mapped[str] = mapped_column(
         default='waiting'
     )  # waiting, active, paused, finished
@@ -119,3 +130,28 @@ class StudySession:
     created_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now()
     )
+
+
+@table_registry.mapped_as_dataclass
+class CriticalEvent:
+    __tablename__ = 'critical_events'
+    __table_args__ = (
+        Index('ix_critical_events_user_id_timestamp', 'user_id', 'timestamp'),
+        Index(
+            'ix_critical_events_session_id_timestamp',
+            'session_id',
+            'timestamp',
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), init=False, primary_key=True, default=uuid.uuid4
+    )
+    session_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey('study_sessions.id', ondelete='CASCADE')
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey('users.id'))
+    timestamp: Mapped[float]  # Instante do evento (epoch, em segundos)
+    type: Mapped[str]  # distraction, fatigue, attention
+    level: Mapped[str]  # high, medium, critical
+    score: Mapped[float]
@@ -1,37 +1,74 @@
+import asyncio
+import json
 import time
+from dataclasses import replace
 from http import HTTPStatus
-from typing import Annotated
+from typing import Annotated, Optional
 from uuid import UUID
 
 from fastapi import (
     APIRouter,
     Depends,
     HTTPException,
+    Query,
     WebSocket,
     WebSocketDisconnect,
 )
+from pydantic import ValidationError
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from focus_track_api.database import get_session
 from focus_track_api.models import StudySession, User
-from focus_track_api.schemas.session_metrics import SessionMetrics
+from focus_track_api.schemas.monitor import MonitorOptions
 from focus_track_api.schemas.study_session import (
+    CriticalEventFilter,
+    CriticalEventList,
     StudySessionCreate,
     StudySessionSchema,
+    StudySessionTimeline,
 )
 from focus_track_api.security import get_current_user, get_current_user_socket
 from focus_track_api.services.attention import (
     finalize_session,
+    flush_critical_events,
+    handle_envelope,
     handle_frame,
-    init_cv_dependencies,
     start_study_session,
 )
 from focus_track_api.services.attention_scorer import AttentionScorer
+from focus_track_api.services.critical_events import get_critical_events
+from focus_track_api.services.cv_executor import (
+    default_pipeline_config,
+    get_cv_executor,
+)
+from focus_track_api.services.frame_buffer import LatestFrameSlot
+from focus_track_api.services.frame_pipeline import PipelineConfig
+from focus_track_api.services.frame_response import (
+    DEFAULT_RESPONDER,
+    FrameResponder,
+)
+from focus_track_api.services.monitor_protocol import (
+    RESYNC_MESSAGE_TYPE,
+    FrameTimer,
+    is_envelope,
+    split_frames,
+)
+from focus_track_api.services.session_metrics import SessionMetrics
+from focus_track_api.services.session_timeline import (
+    LTTB_MIN_POINTS,
+    TIMELINE_BUCKET_SECONDS,
+    TIMELINE_COLUMNS,
+    timeline_points,
+)
 from focus_track_api.services.study_session import (
     create_study_session,
     get_study_session,
+    get_study_session_timeline,
 )
+from focus_track_api.settings import Settings
+
+settings = Settings()
 
 router = APIRouter(prefix='/study-session', tags=['study-session'])
 
@@ -39,46 +76,181 @@ Session = Annotated[AsyncSession, Depends(get_session)]
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
 
-def _process_frame_payload(payload):
-    """Processa o payload do frame e retorna o formato adequado para envio"""
-    if isinstance(payload, dict) and 'error' in payload:
-        return payload
-    elif isinstance(payload, dict):
-        # Se é um dicionário (com informações de status da sessão)
-        return payload
-    else:
-        # Se é um objeto Pydantic (FrameMetrics)
-        return payload.model_dump()
-
-
 async def _handle_frame_processing(
     frame_data: bytes,
-    face_mesh_instance,
-    eye_detector,
-    t_now: float,
-    fps: float,
-    head_pose,
+    received_at: float,
+    timer: FrameTimer,
+    cv_session,
     scorer,
     metrics,
     start_time,
     study_session,
     session,
+    responder=DEFAULT_RESPONDER,
+    frames_coalesced=0,
 ):
-    """Processa um frame e retorna o payload"""
-    payload = await handle_frame(
-        frame_data,
-        face_mesh_instance,
-        eye_detector,
+    """Processa uma mensagem (frame ou envelope) e retorna o payload"""
+    try:
+        frames = [
+            (frame, *timer.tick(received_at, captured_at))
+            for captured_at, frame in split_frames(frame_data)
+        ]
+    except ValueError as e:
+        return {
+            'error': 'INVALID_ENVELOPE',
+            'message': str(e),
+            'type': 'PROCESSING',
+        }
+
+    if is_envelope(frame_data):
+        return await handle_envelope(
+            frames,
+            cv_session,
+            scorer,
+            metrics,
+            start_time,
+            study_session,
+            session,
+            responder,
+            frames_coalesced,
+        )
+
+    ((frame, t_now, fps),) = frames
+    return await handle_frame(
+        frame,
+        cv_session,
         t_now,
         fps,
-        head_pose,
         scorer,
         metrics,
         start_time,
         study_session,
         session,
+        responder,
+        frames_coalesced,
+    )
+
+
+def _handle_control_message(text: str, responder: FrameResponder):
+    """Trata mensagens de texto do cliente (pedido de keyframe)"""
+    try:
+        message = json.loads(text)
+    except json.JSONDecodeError:
+        return
+    if (
+        isinstance(message, dict)
+        and message.get('type') == RESYNC_MESSAGE_TYPE
+    ):
+        responder.request_resync()
+
+
+async def _receive_frames(
+    websocket: WebSocket,
+    slot: LatestFrameSlot,
+    responder: FrameResponder = DEFAULT_RESPONDER,
+):
+    """Lê o socket continuamente, mantendo apenas o frame mais recente"""
+    try:
+        while True:
+            message = await websocket.receive()
+            _dispatch_message(message, slot, responder)
+    except Exception as e:
+        slot.close(e)
+
+
+def _dispatch_message(
+    message: dict,
+    slot: LatestFrameSlot,
+    responder: FrameResponder,
+):
+    """Frames binários vão para a caixa; textos são mensagens de controle"""
+    if message['type'] == 'websocket.disconnect':
+        raise WebSocketDisconnect(message.get('code', 1000))
+    if message.get('bytes'):
+        slot.put(message['bytes'], time.perf_counter())
+    elif message.get('text'):
+        _handle_control_message(message['text'], responder)
+
+
+async def _monitor_options(websocket: WebSocket) -> MonitorOptions | None:
+    """Opções de resposta pedidas pelo cliente na query string"""
+    try:
+        return MonitorOptions.model_validate(dict(websocket.query_params))
+    except ValidationError:
+        await websocket.close(code=1008, reason='Invalid monitor options')
+        return None
+
+
+def _pipeline_config(options: MonitorOptions) -> PipelineConfig:
+    """O pipeline extrai apenas as regiões e os frames que serão enviados"""
+    return replace(
+        default_pipeline_config(),
+        regions=options.landmark_regions,
+        landmarks_every=options.landmarks_every,
+    )
+
+
+def _frame_responder(options: MonitorOptions) -> FrameResponder:
+    return FrameResponder(
+        options,
+        settings.MONITOR_KEYFRAME_INTERVAL,
+        settings.MONITOR_DELTA_TOLERANCE,
     )
-    return _process_frame_payload(payload)
+
+
+async def _send_payload(
+    websocket: WebSocket, payload: str | bytes | dict, frames_coalesced: int
+):
+    """Envia a resposta já serializada; erros (dict) vão como JSON"""
+    if isinstance(payload, bytes):
+        await websocket.send_bytes(payload)
+    elif isinstance(payload, str):
+        await websocket.send_text(payload)
+    else:
+        payload['frames_coalesced'] = frames_coalesced
+        await websocket.send_json(payload)
+
+
+async def _serve_next_frame(
+    websocket: WebSocket,
+    slot: LatestFrameSlot,
+    timer: FrameTimer,
+    cv_session,
+    scorer,
+    metrics,
+    start_time,
+    study_session,
+    session,
+    responder: FrameResponder,
+):
+    """Aguarda o frame mais recente, processa e envia sua resposta"""
+    frame_data, received_at, frames_coalesced = await slot.get()
+
+    try:
+        payload = await _handle_frame_processing(
+            frame_data,
+            received_at,
+            timer,
+            cv_session,
+            scorer,
+            metrics,
+            start_time,
+            study_session,
+            session,
+            responder,
+            frames_coalesced,
+        )
+        await _send_payload(websocket, payload, frames_coalesced)
+
+    except Exception as e:
+        print(f'Erro ao processar frame: {e}')
+        error_payload = {
+            'error': 'WEBSOCKET_ERROR',
+            'message': f'Erro na conexão WebSocket: {str(e)}',
+            'type': 'WEBSOCKET',
+        }
+        await websocket.send_json(error_payload)
+        raise
 
 
 @router.websocket('/monitor')
@@ -91,61 +263,46 @@ async def monitor_session(
     if not token:
         await websocket.close(code=1008, reason='Token is required')
         return
+    options = await _monitor_options(websocket)
+    if options is None:
+        return
 
     session_generator = get_session()
     session = await anext(session_generator)
     user = await get_current_user_socket(session, token=token)
 
-    face_mesh_instance, eye_detector, head_pose = init_cv_dependencies()
-
     metrics = SessionMetrics()
     scorer = AttentionScorer(t_now := time.perf_counter())
     studySession = await start_study_session(session, user)
     start_time = studySession.start_time  # Usar o start_time da sessão criada
-    prev_time = t_now
-    fps = 0.0
+    timer = FrameTimer(t_now)
+
+    cv_session = await get_cv_executor().open_session(
+        _pipeline_config(options)
+    )
+    responder = _frame_responder(options)
+    slot = LatestFrameSlot()
+    receiver = asyncio.create_task(_receive_frames(websocket, slot, responder))
 
     try:
         while True:
-            t_now = time.perf_counter()
-            elapsed_time = t_now - prev_time
-            prev_time = t_now
-
-            if elapsed_time > 0:
-                fps = round(1 / elapsed_time, 3)
-
-            frame_data = await websocket.receive_bytes()
-            if not frame_data:
-                continue
-
-            try:
-                payload = await _handle_frame_processing(
-                    frame_data,
-                    face_mesh_instance,
-                    eye_detector,
-                    t_now,
-                    fps,
-                    head_pose,
-                    scorer,
-                    metrics,
-                    start_time,
-                    studySession,
-                    session,
-                )
-                await websocket.send_json(payload)
-
-            except Exception as e:
-                print(f'Erro ao processar frame: {e}')
-                error_payload = {
-                    'error': 'WEBSOCKET_ERROR',
-                    'message': f'Erro na conexão WebSocket: {str(e)}',
-                    'type': 'WEBSOCKET',
-                }
-                await websocket.send_json(error_payload)
-                raise
+            await _serve_next_frame(
+                websocket,
+                slot,
+                timer,
+                cv_session,
+                scorer,
+                metrics,
+                start_time,
+                studySession,
+                session,
+                responder,
+            )
 
     except WebSocketDisconnect:
-        print('WebSocket disconnected')
+        print(
+            f'WebSocket disconnected - frames descartados: {slot.total_dropped}'
+        )
         await finalize_session(session, user, studySession, metrics, scorer)
 
         # Tentar enviar mensagem de finalização antes de fechar
@@ -155,11 +312,23 @@ async def monitor_session(
                 'total_paused_time': studySession.total_paused_time,
                 'paused_at': None,
                 'message': 'Sessão finalizada com sucesso',
+                # Frames por resolução efetivamente processada no pipeline
+                'processing_resolutions': metrics.processing_resolutions(),
             }
             await websocket.send_json(finalization_message)
         except Exception:
             pass  # Ignora erro se já foi desconectado
 
+    finally:
+        receiver.cancel()
+        await cv_session.close()
+        # Saídas por erro não passam pela finalização: grava os eventos
+        # ainda no buffer (uma falha aqui só é registrada, sem esconder o
+        # erro original)
+        await flush_critical_events(
+            metrics.critical_events, studySession, session, force=True
+        )
+
 
 @router.post(
     '', response_model=StudySessionSchema, status_code=HTTPStatus.CREATED
@@ -188,6 +357,70 @@ async def list_study_sessions(
     return result.scalars().all()
 
 
+@router.get('/events', response_model=CriticalEventList)
+async def list_critical_events(
+    db: Session,
+    current_user: CurrentUser,
+    filter_events: Annotated[CriticalEventFilter, Query()],
+):
+    """
+    Eventos críticos do usuário em ordem cronológica, paginados e
+    opcionalmente filtrados por sessão e intervalo de instantes epoch.
+    """
+    events = await get_critical_events(
+        db,
+        current_user.id,
+        offset=filter_events.offset,
+        limit=filter_events.limit,
+        session_id=filter_events.session_id,
+        start=filter_events.start,
+        end=filter_events.end,
+    )
+    return {'events': events}
+
+
+@router.get('/{session_id}/timeline', response_model=StudySessionTimeline)
+async def get_study_session_timeline_endpoint(
+    db: Session,
+    current_user: CurrentUser,
+    session_id: str,
+    max_points: Annotated[Optional[int], Query(ge=LTTB_MIN_POINTS)] = None,
+):
+    """
+    Linha do tempo da sessão (médias por bucket de tempo), reduzida por
+    LTTB a no máximo `max_points` pontos quando pedido.
+    """
+    try:
+        session_uuid = UUID(session_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail='ID inválido')
+
+    timeline = await get_study_session_timeline(db, session_uuid)
+
+    if not timeline or timeline[0] != current_user.id:
+        raise HTTPException(
+            status_code=404, detail='Sessão de estudo não encontrada.'
+        )
+
+    blob = timeline[1]
+    if blob is None:
+        return StudySessionTimeline(
+            bucket_seconds=TIMELINE_BUCKET_SECONDS,
+            t=[],
+            **{column: [] for column in TIMELINE_COLUMNS},
+        )
+
+    bucket_seconds, times, means = timeline_points(blob, max_points)
+    return StudySessionTimeline(
+        bucket_seconds=bucket_seconds,
+        t=times.tolist(),
+        **{
+            column: means[:, i].tolist()
+            for i, column in enumerate(TIMELINE_COLUMNS)
+        },
+    )
+
+
 @router.get('/{session_id}', response_model=StudySessionSchema)
 async def get_study_session_endpoint(
     db: Session,
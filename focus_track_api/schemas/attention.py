@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel
 
@@ -13,16 +13,16 @@ class RegionLandmarks(BaseModel):
 
 
 class FaceLandmarks(BaseModel):
-    face_boundary: List[Point2D]
-    left_eyebrow: List[Point2D]
-    right_eyebrow: List[Point2D]
-    left_eye: List[Point2D]
-    right_eye: List[Point2D]
-    left_iris: List[Point2D]
-    right_iris: List[Point2D]
-    nose: List[Point2D]
-    inner_lips: List[Point2D]
-    outer_lips: List[Point2D]
+    face_boundary: Optional[List[Point2D]] = None
+    left_eyebrow: Optional[List[Point2D]] = None
+    right_eyebrow: Optional[List[Point2D]] = None
+    left_eye: Optional[List[Point2D]] = None
+    right_eye: Optional[List[Point2D]] = None
+    left_iris: Optional[List[Point2D]] = None
+    right_iris: Optional[List[Point2D]] = None
+    nose: Optional[List[Point2D]] = None
+    inner_lips: Optional[List[Point2D]] = None
+    outer_lips: Optional[List[Point2D]] = None
 
 
 class AttentionMetrics(BaseModel):
@@ -33,5 +33,5 @@ class AttentionMetrics(BaseModel):
 
 
 class FrameMetrics(BaseModel):
-    landmarks: FaceLandmarks
+    landmarks: Optional[FaceLandmarks] = None
     attention_metrics: AttentionMetrics
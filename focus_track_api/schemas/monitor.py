@@ -0,0 +1,46 @@
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+from focus_track_api.utils.constants import FACE_REGIONS
+
+
+class MonitorOptions(BaseModel):
+    """Opções de resposta do WebSocket de monitoramento (query string)"""
+
+    encoding: Literal['json', 'binary', 'delta'] = 'json'
+    # Regiões de landmarks enviadas, separadas por vírgula (padrão: todas)
+    regions: Optional[tuple[str, ...]] = None
+    # Envia os landmarks a cada N frames com rosto detectado
+    landmarks_every: int = Field(1, ge=1)
+    # Envia apenas as métricas de atenção, sem landmarks
+    metrics_only: bool = False
+
+    @field_validator('regions', mode='before')
+    @classmethod
+    def split_regions(cls, value):
+        if isinstance(value, str):
+            return tuple(
+                region.strip() for region in value.split(',') if region.strip()
+            )
+        return value
+
+    @field_validator('regions')
+    @classmethod
+    def validate_regions(cls, value):
+        if value is None:
+            return None
+        unknown = set(value) - FACE_REGIONS.keys()
+        if unknown:
+            raise ValueError(f'Regiões desconhecidas: {sorted(unknown)}')
+        # Sempre na ordem de FACE_REGIONS, independente da ordem pedida
+        return tuple(region for region in FACE_REGIONS if region in value)
+
+    @property
+    def landmark_regions(self) -> tuple[str, ...]:
+        """Regiões efetivamente enviadas (nenhuma com `metrics_only`)"""
+        if self.metrics_only:
+            return ()
+        if self.regions is None:
+            return tuple(FACE_REGIONS)
+        return self.regions
@@ -4,6 +4,8 @@ from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict
 
+from focus_track_api.schemas.shared import FilterPage
+
 
 class StudySessionPublic(BaseModel):
     id: UUID
@@ -17,8 +19,11 @@ class StudySessionPublic(BaseModel):
     distraction_rate: float
     max_fatigue: float
     max_distraction: float
+    attention_p50: float = 0.0
+    attention_p90: float = 0.0
+    attention_p99: float = 0.0
     perclos: float
-    critical_events: Optional[str] = None
+    processing_resolutions: Optional[dict[str, int]] = None
     status: str
     paused_at: Optional[datetime] = None
     total_paused_time: float
@@ -37,8 +42,11 @@ class StudySessionCreate(BaseModel):
     distraction_rate: float = 0.0
     max_fatigue: float = 0.0
     max_distraction: float = 0.0
+    attention_p50: float = 0.0
+    attention_p90: float = 0.0
+    attention_p99: float = 0.0
     perclos: float = 0.0
-    critical_events: Optional[str] = None
+    processing_resolutions: Optional[dict[str, int]] = None
 
 
 class StudySessionSchema(BaseModel):
@@ -53,11 +61,48 @@ class StudySessionSchema(BaseModel):
     distraction_rate: float
     max_fatigue: float
     max_distraction: float
+    attention_p50: float = 0.0
+    attention_p90: float = 0.0
+    attention_p99: float = 0.0
     perclos: float
-    critical_events: Optional[str] = None
+    processing_resolutions: Optional[dict[str, int]] = None
     status: str
     paused_at: Optional[datetime] = None
     total_paused_time: float
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class StudySessionTimeline(BaseModel):
+    """Médias dos scores por bucket de tempo, em colunas"""
+
+    bucket_seconds: float
+    # Segundos desde o primeiro frame da sessão (início de cada bucket)
+    t: list[float]
+    attention: list[float]
+    fatigue: list[float]
+    distraction: list[float]
+
+
+class CriticalEventPublic(BaseModel):
+    session_id: UUID
+    # Instante do evento (epoch, em segundos)
+    timestamp: float
+    type: str
+    level: str
+    score: float
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CriticalEventList(BaseModel):
+    events: list[CriticalEventPublic]
+
+
+class CriticalEventFilter(FilterPage):
+    """Página de eventos, opcionalmente de uma sessão e/ou de [start, end)"""
+
+    session_id: Optional[UUID] = None
+    start: Optional[float] = None
+    end: Optional[float] = None
@@ -1,3 +1,59 @@
+# Capacidade inicial da janela do PERCLOS: 60 s a 60 fps
+PERCLOS_WINDOW_CAPACITY = 60 * 60
+
+
+class PerclosWindow:
+    """
+    Janela deslizante do PERCLOS em um buffer circular de capacidade fixa.
+
+    Cada slot guarda o instante de um frame e se os olhos estavam fechados;
+    os totais da janela são mantidos a cada frame, de modo que o PERCLOS
+    custa O(1) amortizado e memória constante, sem reconstruir listas. Os
+    instantes devem ser não decrescentes (como os do FrameTimer): frames
+    são descartados pelo início do buffer. Se a janela encher (mais de
+    PERCLOS_WINDOW_CAPACITY frames em 60 s), a capacidade é dobrada.
+    """
+
+    __slots__ = ('_closed', '_head', '_times', 'closed_frames', 'frames')
+
+    def __init__(self, capacity: int = PERCLOS_WINDOW_CAPACITY):
+        self._times = [0.0] * capacity
+        self._closed = bytearray(capacity)
+        self._head = 0
+        self.frames = 0
+        self.closed_frames = 0
+
+    def add(self, t_now: float, closed: bool, cutoff_time: float):
+        """Inclui o frame e descarta os anteriores a `cutoff_time`"""
+        if self.frames == len(self._times):
+            self._grow()
+        tail = (self._head + self.frames) % len(self._times)
+        self._times[tail] = t_now
+        self._closed[tail] = closed
+        self.frames += 1
+        self.closed_frames += closed
+
+        while self.frames and self._times[self._head] < cutoff_time:
+            self.closed_frames -= self._closed[self._head]
+            self._head = (self._head + 1) % len(self._times)
+            self.frames -= 1
+
+    def _grow(self):
+        capacity = len(self._times)
+        order = [(self._head + i) % capacity for i in range(self.frames)]
+        self._times = [self._times[i] for i in order] + [0.0] * capacity
+        self._closed = bytearray(self._closed[i] for i in order) + bytearray(
+            capacity
+        )
+        self._head = 0
+
+    @property
+    def perclos(self) -> float:
+        if self.frames == 0:
+            return 0.0
+        return self.closed_frames / self.frames
+
+
 class AttentionScorer:
     """
     Attention Scorer class that contains methods for estimating EAR, Gaze_Score, PERCLOS and Head Pose over time,
@@ -9,6 +65,31 @@ class AttentionScorer:
     - get_PERCLOS: specifically used to evaluate the driver sleepiness
     """
 
+    __slots__ = (
+        'PERCLOS_TIME_PERIOD',
+        'closure_time',
+        'distracted_time',
+        'ear_thresh',
+        'ear_time_thresh',
+        'eye_closure_counter',
+        'gaze_thresh',
+        'gaze_time_thresh',
+        'last_time_attended',
+        'last_time_eye_opened',
+        'last_time_looked_ahead',
+        'not_look_ahead_time',
+        'perclos_thresh',
+        'perclos_window',
+        'pitch_thresh',
+        'pose_time_thresh',
+        'prev_time',
+        'roll_thresh',
+        'total_closed_frames',
+        'total_frames',
+        'verbose',
+        'yaw_thresh',
+    )
+
     def __init__(
         self,
         t_now,
@@ -90,8 +171,7 @@ class AttentionScorer:
         self.total_frames = 0
 
         # Para PERCLOS com janela deslizante
-        self.eye_closure_history = []  # Lista de timestamps de frames com olhos fechados
-        self.frame_history = []  # Lista de timestamps de todos os frames
+        self.perclos_window = PerclosWindow()
 
         # verbose flag
         self.verbose = False
@@ -190,37 +270,22 @@ class AttentionScorer:
         """
 
         tired = False  # set default value for the tired state of the driver
+        eye_closed = ear_score is not None and bool(
+            ear_score <= self.ear_thresh
+        )
 
-        # Adicionar timestamp atual ao histórico de frames
-        self.frame_history.append(t_now)
-
-        # Se olhos estão fechados, adicionar ao histórico
-        if (ear_score is not None) and (ear_score <= self.ear_thresh):
-            self.eye_closure_history.append(t_now)
-
-        # Limpar histórico antigo (mais de 60 segundos atrás)
+        # Janela deslizante: inclui o frame e descarta os de mais de 60
+        # segundos atrás
         cutoff_time = t_now - self.PERCLOS_TIME_PERIOD
-        self.frame_history = [
-            t for t in self.frame_history if t >= cutoff_time
-        ]
-        self.eye_closure_history = [
-            t for t in self.eye_closure_history if t >= cutoff_time
-        ]
-
-        # Calcular PERCLOS baseado na janela deslizante
-        if len(self.frame_history) > 0:
-            perclos_score = len(self.eye_closure_history) / len(
-                self.frame_history
-            )
-        else:
-            perclos_score = 0.0
+        self.perclos_window.add(t_now, eye_closed, cutoff_time)
+        perclos_score = self.perclos_window.perclos
 
         if perclos_score >= self.perclos_thresh:
             tired = True
 
         # Atualiza contadores acumulativos da sessão (para estatísticas finais)
         self.total_frames += 1
-        if (ear_score is not None) and (ear_score <= self.ear_thresh):
+        if eye_closed:
             self.total_closed_frames += 1
 
         return tired, perclos_score
@@ -0,0 +1,119 @@
+import time
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from focus_track_api.models import CriticalEvent, StudySession
+
+# Janela (s) em que um evento do mesmo tipo e nível é considerado duplicata
+EVENT_DUPLICATE_WINDOW = 30
+# Intervalo mínimo (s) entre gravações dos eventos no banco
+EVENT_FLUSH_INTERVAL = 10.0
+
+
+class CriticalEventBuffer:
+    """
+    Eventos críticos de uma sessão, mantidos em memória entre gravações.
+
+    A deduplicação usa o instante do último evento emitido de cada
+    (tipo, nível), sem consultar o banco. Os eventos pendentes são
+    inseridos em lote na tabela critical_events em `flush`, chamado
+    periodicamente pelo monitor e na finalização da sessão.
+    """
+
+    def __init__(self, flush_interval: float = EVENT_FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self.pending: list[dict] = []
+        self._last_emitted: dict[tuple[str, str], float] = {}
+        self._last_flush = time.monotonic()
+
+    def add(
+        self, event_type: str, level: str, score: float, timestamp: float
+    ) -> bool:
+        """Inclui o evento, exceto se for duplicata; retorna se incluiu"""
+        key = (event_type, level)
+        last_timestamp = self._last_emitted.get(key)
+        if (
+            last_timestamp is not None
+            and abs(timestamp - last_timestamp) < EVENT_DUPLICATE_WINDOW
+        ):
+            return False
+
+        self._last_emitted[key] = timestamp
+        self.pending.append({
+            'timestamp': timestamp,
+            'type': event_type,
+            'level': level,
+            'score': score,
+        })
+        return True
+
+    async def flush(
+        self,
+        study_session: StudySession,
+        session: AsyncSession,
+        force: bool = False,
+    ):
+        """
+        Insere os eventos pendentes se o intervalo passou (ou `force`).
+
+        Se a gravação falhar, a transação é desfeita (recarregando a sessão
+        de estudo, expirada pelo rollback) e o erro é repassado; os eventos
+        continuam pendentes para a próxima tentativa, que só ocorre após
+        outro intervalo, para não repetir o insert a cada frame.
+        """
+        due = time.monotonic() - self._last_flush >= self.flush_interval
+        if not (force or due) or not self.pending:
+            return
+
+        self._last_flush = time.monotonic()
+        try:
+            await session.execute(
+                insert(CriticalEvent),
+                [
+                    {
+                        'session_id': study_session.id,
+                        'user_id': study_session.user_id,
+                        **event,
+                    }
+                    for event in self.pending
+                ],
+            )
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            await session.refresh(study_session)
+            raise
+        self.pending.clear()
+
+
+async def get_critical_events(
+    session: AsyncSession,
+    user_id: UUID,
+    offset: int,
+    limit: int,
+    session_id: Optional[UUID] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+) -> list[CriticalEvent]:
+    """
+    Eventos do usuário em ordem cronológica, opcionalmente de uma sessão
+    e/ou do intervalo [start, end) de instantes epoch.
+    """
+    query = select(CriticalEvent).where(CriticalEvent.user_id == user_id)
+    if session_id is not None:
+        query = query.where(CriticalEvent.session_id == session_id)
+    if start is not None:
+        query = query.where(CriticalEvent.timestamp >= start)
+    if end is not None:
+        query = query.where(CriticalEvent.timestamp < end)
+
+    result = await session.execute(
+        query
+        .order_by(CriticalEvent.timestamp, CriticalEvent.id)
+        .offset(offset)
+        .limit(limit)
+    )
+    return result.scalars().all()
@@ -0,0 +1,381 @@
+import asyncio
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from focus_track_api.services.cv_worker import WORKER_READY, run_worker
+from focus_track_api.services.frame_pipeline import (
+    FrameAnalysis,
+    FramePipeline,
+    PipelineConfig,
+)
+from focus_track_api.settings import Settings
+
+settings = Settings()
+
+WORKER_JOIN_TIMEOUT = 2.0
+# Tempo máximo (s) para um processo ficar pronto ou abrir uma sessão
+WORKER_START_TIMEOUT = 60.0
+RESPONSE_POLL_INTERVAL = 0.5
+
+
+class CVWorkerError(Exception):
+    """Erro ocorrido dentro de um processo de inferência"""
+
+
+class CVWorkerTimeout(CVWorkerError):
+    """O processo de inferência não respondeu dentro do tempo limite"""
+
+
+class ThreadCVSession:
+    """
+    Referência a um FramePipeline hospedado no executor de visão computacional.
+
+    Os frames de uma mesma sessão são processados estritamente em ordem: o
+    lock garante que o FaceMesh da conexão nunca é usado por duas threads ao
+    mesmo tempo, preservando o estado de rastreamento entre frames.
+    """
+
+    def __init__(self, executor: ThreadPoolExecutor, pipeline: FramePipeline):
+        self._executor = executor
+        self._pipeline = pipeline
+        self._lock = asyncio.Lock()
+
+    async def analyse(self, frame_data: bytes) -> FrameAnalysis:
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            return await loop.run_in_executor(
+                self._executor, self._pipeline.process, frame_data
+            )
+
+    async def analyse_batch(self, frames: list[bytes]) -> list[FrameAnalysis]:
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            return await loop.run_in_executor(
+                self._executor, self._pipeline.process_batch, frames
+            )
+
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            await loop.run_in_executor(self._executor, self._pipeline.close)
+
+
+class ThreadCVExecutor:
+    """Pool limitado de threads onde roda todo o trabalho de CV por frame"""
+
+    def __init__(self, max_workers: int):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='cv-worker'
+        )
+
+    async def open_session(
+        self, config: Optional[PipelineConfig] = None
+    ) -> ThreadCVSession:
+        loop = asyncio.get_running_loop()
+        # A criação do FaceMesh carrega o modelo, também fora do event loop
+        pipeline = await loop.run_in_executor(
+            self._executor, FramePipeline, config or default_pipeline_config()
+        )
+        return ThreadCVSession(self._executor, pipeline)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class InferenceWorker:
+    """
+    Processo de inferência com suas filas de requisição e resposta.
+
+    Uma thread leitora consome as respostas do processo e resolve os futures
+    pendentes no event loop de quem fez a requisição. Em caso de timeout o
+    processo é reiniciado pelo watchdog (`restart`) sem afetar as conexões.
+    `ready` é sinalizado quando o processo termina a partida (importações e
+    pipelines das sessões fixadas nele), antes de contar o tempo dos frames.
+    """
+
+    def __init__(self, context, index: int):
+        self._context = context
+        self.index = index
+        self.sessions: dict[int, PipelineConfig] = {}
+        self._pending: dict[
+            int, tuple[asyncio.AbstractEventLoop, asyncio.Future]
+        ] = {}
+        self._pending_lock = threading.Lock()
+        self._restart_lock = threading.Lock()
+        self.generation = 0
+        self._start()
+
+    def _start(self):
+        self._requests = self._context.Queue()
+        self._responses = self._context.Queue()
+        self._stopped = threading.Event()
+        self.ready = threading.Event()
+        # Após um reinício, as sessões fixadas aqui continuam atendidas
+        self._process = self._context.Process(
+            target=run_worker,
+            args=(self._requests, self._responses, dict(self.sessions)),
+            name=f'cv-inference-{self.index}',
+            daemon=True,
+        )
+        self._process.start()
+        self._reader = threading.Thread(
+            target=self._read_responses,
+            args=(self._responses, self._stopped, self.ready),
+            name=f'cv-inference-reader-{self.index}',
+            daemon=True,
+        )
+        self._reader.start()
+
+    def _read_responses(
+        self,
+        responses,
+        stopped: threading.Event,
+        ready: threading.Event,
+    ):
+        while not stopped.is_set():
+            try:
+                request_id, ok, result = responses.get(
+                    timeout=RESPONSE_POLL_INTERVAL
+                )
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+
+            if request_id is None:
+                if result == WORKER_READY:
+                    ready.set()
+                continue
+
+            with self._pending_lock:
+                pending = self._pending.pop(request_id, None)
+            if pending is None:
+                continue
+
+            loop, future = pending
+            loop.call_soon_threadsafe(_resolve_future, future, ok, result)
+
+    def submit(
+        self,
+        session_id: int,
+        request_id: int,
+        payload: bytes | list[bytes] | PipelineConfig,
+        command: str = 'process',
+    ) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._pending_lock:
+            self._pending[request_id] = (loop, future)
+        self._requests.put((command, session_id, request_id, payload))
+        return future
+
+    def discard(self, request_id: int):
+        with self._pending_lock:
+            self._pending.pop(request_id, None)
+
+    async def wait_ready(self):
+        """Aguarda a partida do processo, fora do event loop"""
+        if self.ready.is_set():
+            return
+        if not await asyncio.to_thread(self.ready.wait, WORKER_START_TIMEOUT):
+            raise CVWorkerTimeout(
+                f'Processo de inferência {self.index} não ficou pronto'
+            )
+
+    def open_session(
+        self, session_id: int, request_id: int, config: PipelineConfig
+    ) -> asyncio.Future:
+        self.sessions[session_id] = config
+        return self.submit(session_id, request_id, config, 'open')
+
+    def close_session(self, session_id: int):
+        self.sessions.pop(session_id, None)
+        if self._process.is_alive():
+            self._requests.put(('close', session_id))
+
+    def _stop(self):
+        self._stopped.set()
+        if self._process.is_alive():
+            self._process.kill()
+        self._process.join(WORKER_JOIN_TIMEOUT)
+
+        with self._pending_lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for loop, future in pending:
+            loop.call_soon_threadsafe(
+                _resolve_future,
+                future,
+                False,
+                'Processo de inferência reiniciado',
+            )
+
+    def restart(self, generation: int):
+        # Vários frames podem expirar juntos: só o primeiro reinicia
+        with self._restart_lock:
+            if generation != self.generation:
+                return
+            print(
+                f'Watchdog - reiniciando processo de inferência {self.index}'
+            )
+            self._stop()
+            self._start()
+            self.generation += 1
+
+    def shutdown(self):
+        if self._process.is_alive():
+            self._requests.put(None)
+            self._process.join(WORKER_JOIN_TIMEOUT)
+        self._stop()
+
+
+def _resolve_future(future: asyncio.Future, ok: bool, result):
+    if future.done():
+        return
+    if ok:
+        future.set_result(result)
+    else:
+        future.set_exception(CVWorkerError(result))
+
+
+class ProcessCVSession:
+    """Sessão fixada a um único processo de inferência (afinidade)"""
+
+    def __init__(
+        self,
+        executor: 'ProcessCVExecutor',
+        worker: InferenceWorker,
+        session_id: int,
+    ):
+        self._executor = executor
+        self._worker = worker
+        self._session_id = session_id
+        self._lock = asyncio.Lock()
+
+    async def analyse(self, frame_data: bytes) -> FrameAnalysis:
+        async with self._lock:
+            return await self._executor.run(
+                self._worker, self._session_id, frame_data
+            )
+
+    async def analyse_batch(self, frames: list[bytes]) -> list[FrameAnalysis]:
+        async with self._lock:
+            return await self._executor.run(
+                self._worker, self._session_id, frames, batch=True
+            )
+
+    async def close(self):
+        self._worker.close_session(self._session_id)
+
+
+class ProcessCVExecutor:
+    """
+    Pool de processos de inferência, contornando o GIL.
+
+    Cada processo possui suas próprias instâncias de FaceMesh, EyeDetector e
+    HeadPoseEstimator. Uma sessão é atribuída ao processo com menos sessões
+    no momento da conexão e permanece nele até o fim, para que o estado de
+    rastreamento do FaceMesh sobreviva entre frames. Frames que excedem
+    `frame_timeout` disparam o reinício do processo travado; o tempo só
+    conta com o processo pronto e o pipeline da sessão já criado.
+    """
+
+    def __init__(self, workers: int, frame_timeout: float):
+        context = multiprocessing.get_context('spawn')
+        self._frame_timeout = frame_timeout
+        self._workers = [InferenceWorker(context, i) for i in range(workers)]
+        self._session_ids = itertools.count()
+        self._request_ids = itertools.count()
+
+    async def open_session(
+        self, config: Optional[PipelineConfig] = None
+    ) -> ProcessCVSession:
+        worker = min(self._workers, key=lambda w: len(w.sessions))
+        session_id = next(self._session_ids)
+        request_id = next(self._request_ids)
+        await worker.wait_ready()
+        # A criação do FaceMesh não conta no tempo limite dos frames
+        opened = worker.open_session(
+            session_id, request_id, config or default_pipeline_config()
+        )
+        try:
+            await asyncio.wait_for(opened, WORKER_START_TIMEOUT)
+        except BaseException:
+            worker.discard(request_id)
+            worker.close_session(session_id)
+            raise
+        return ProcessCVSession(self, worker, session_id)
+
+    async def run(
+        self,
+        worker: InferenceWorker,
+        session_id: int,
+        frame_data: bytes | list[bytes],
+        batch: bool = False,
+    ) -> FrameAnalysis | list[FrameAnalysis]:
+        # A partida do processo (após um reinício) não conta no tempo limite
+        await worker.wait_ready()
+        request_id = next(self._request_ids)
+        generation = worker.generation
+        command = 'batch' if batch else 'process'
+        # Um envelope tem o tempo limite de todos os seus frames
+        timeout = self._frame_timeout * (len(frame_data) if batch else 1)
+        future = worker.submit(session_id, request_id, frame_data, command)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            worker.discard(request_id)
+            await asyncio.to_thread(worker.restart, generation)
+            raise CVWorkerTimeout(
+                f'Frame excedeu o tempo limite de {timeout}s'
+            )
+
+    def shutdown(self):
+        for worker in self._workers:
+            worker.shutdown()
+
+
+CVSession = ThreadCVSession | ProcessCVSession
+
+
+def default_pipeline_config() -> PipelineConfig:
+    return PipelineConfig(
+        max_decode_width=settings.CV_MAX_DECODE_WIDTH,
+        tracking_interval=settings.CV_TRACKING_INTERVAL,
+        tracking_max_error=settings.CV_TRACKING_MAX_ERROR,
+        face_roi=settings.CV_FACE_ROI,
+        face_roi_padding=settings.CV_FACE_ROI_PADDING,
+        face_target_width=settings.CV_FACE_TARGET_WIDTH,
+        target_interocular=settings.CV_TARGET_INTEROCULAR,
+        pose_solver=settings.CV_POSE_SOLVER,
+        pose_warm_start=settings.CV_POSE_WARM_START,
+        pose_refine=settings.CV_POSE_REFINE,
+    )
+
+
+_cv_executor: Optional[ThreadCVExecutor | ProcessCVExecutor] = None
+
+
+def get_cv_executor() -> ThreadCVExecutor | ProcessCVExecutor:
+    global _cv_executor  # noqa: PLW0603
+    if _cv_executor is None:
+        if settings.CV_EXECUTOR_BACKEND == 'process':
+            _cv_executor = ProcessCVExecutor(
+                settings.CV_PROCESS_WORKERS or os.cpu_count() or 1,
+                settings.CV_FRAME_TIMEOUT,
+            )
+        else:
+            _cv_executor = ThreadCVExecutor(settings.CV_EXECUTOR_WORKERS)
+    return _cv_executor
+
+
+def shutdown_cv_executor():
+    global _cv_executor  # noqa: PLW0603
+    if _cv_executor is not None:
+        _cv_executor.shutdown()
+        _cv_executor = None
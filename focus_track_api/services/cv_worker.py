@@ -0,0 +1,91 @@
+from typing import Optional
+
+from focus_track_api.services.frame_pipeline import (
+    FramePipeline,
+    PipelineConfig,
+)
+
+# Resposta enviada assim que o processo termina as importações e recria
+# os pipelines das sessões recebidas na partida
+WORKER_READY = 'ready'
+
+
+def _open_pipeline(pipelines, session_id, config):
+    pipeline = pipelines.pop(session_id, None)
+    if pipeline is not None:
+        pipeline.close()
+    pipelines[session_id] = FramePipeline(config)
+
+
+def _handle_request(pipelines, command, session_id, payload):
+    if command == 'open':
+        _open_pipeline(pipelines, session_id, payload)
+        return None
+
+    pipeline = pipelines.get(session_id)
+    if pipeline is None:
+        raise LookupError(f'Sessão {session_id} não aberta')
+    if command == 'batch':
+        return pipeline.process_batch(payload)
+    return pipeline.process(payload)
+
+
+def run_worker(
+    requests,
+    responses,
+    sessions: Optional[dict[int, PipelineConfig]] = None,
+):
+    """
+    Loop principal de um processo de inferência.
+
+    Cada processo mantém um FramePipeline (FaceMesh, EyeDetector e
+    HeadPoseEstimator) por sessão atribuída a ele, criado ao receber o
+    'open' da sessão e confirmado com uma resposta ao request_id do 'open'.
+    Um processo reiniciado pelo watchdog recebe em `sessions` as sessões
+    fixadas nele e recria seus pipelines antes de avisar que está pronto,
+    perdendo apenas o estado de rastreamento do FaceMesh. Assim, nem a
+    partida do processo nem a criação do FaceMesh contam no tempo limite
+    dos frames.
+
+    Mensagens recebidas:
+        ('open', session_id, request_id, PipelineConfig)
+        ('process', session_id, request_id, frame_data)
+        ('batch', session_id, request_id, [frame_data, ...])
+        ('close', session_id)
+        None -> encerra o processo
+
+    Respostas enviadas:
+        (None, True, WORKER_READY) -> uma vez, ao ficar pronto
+        (request_id, ok, None | FrameAnalysis | [FrameAnalysis] | erro)
+    """
+    pipelines: dict[int, FramePipeline] = {}
+    for session_id, config in (sessions or {}).items():
+        try:
+            _open_pipeline(pipelines, session_id, config)
+        except Exception as e:
+            # Os frames da sessão passam a responder com erro
+            print(f'Erro ao recriar o pipeline da sessão {session_id}: {e}')
+    responses.put((None, True, WORKER_READY))
+
+    while True:
+        message = requests.get()
+        if message is None:
+            break
+
+        command, session_id, *args = message
+
+        if command == 'close':
+            pipeline = pipelines.pop(session_id, None)
+            if pipeline is not None:
+                pipeline.close()
+            continue
+
+        request_id, payload = args
+        try:
+            result = _handle_request(pipelines, command, session_id, payload)
+            responses.put((request_id, True, result))
+        except Exception as e:
+            responses.put((request_id, False, f'{type(e).__name__}: {e}'))
+
+    for pipeline in pipelines.values():
+        pipeline.close()
@@ -1,40 +1,101 @@
 import numpy as np
-from numpy import linalg as LA
 
 EYES_LMS_NUMS = [33, 133, 160, 144, 158, 153, 362, 263, 385, 380, 387, 373]
 LEFT_IRIS_NUM = 468
 RIGHT_IRIS_NUM = 473
 
+# landmarks gathered for the eye features: the 6 points of each eye (left
+# first, EYES_LMS_NUMS order) followed by the two iris centers
+EYE_FEATURE_LMS = np.array(EYES_LMS_NUMS + [LEFT_IRIS_NUM, RIGHT_IRIS_NUM])
+EYE_POINTS = 6
+EYES_SHAPE = (2, EYE_POINTS, 2)
+
+
+def eye_features(landmarks):
+    """
+    Computes the average EAR and Gaze Score of the two eyes in a few array operations
+
+    The eye points are consecutive pairs (corner, corner), (upper, lower), (upper, lower), so the three distances of
+    each eye come from a single strided difference. Works on one face (478, 3) or on a stack (N, 478, 3).
+
+    Parameters
+    ----------
+    landmarks: numpy array
+        478 mediapipe keypoints of the face, or a stack of them
+
+    Returns
+    --------
+    ear, gaze_score: numpy floats (or arrays of shape (N,) for a stack)
+    """
+    points = landmarks[..., EYE_FEATURE_LMS, :2]
+    eyes = points[..., : 2 * EYE_POINTS, :].reshape(
+        points.shape[:-2] + EYES_SHAPE
+    )
+    iris = points[..., 2 * EYE_POINTS :, :]
+
+    # (..., eye, [length, opening, opening])
+    distances = np.linalg.norm(
+        eyes[..., 0::2, :] - eyes[..., 1::2, :], axis=-1
+    )
+    ear = (distances[..., 1] + distances[..., 2]) / (2 * distances[..., 0])
+
+    # center of the eye bounding box
+    eye_center = (eyes.min(axis=-2) + eyes.max(axis=-2)) / 2
+    gaze_score = (
+        np.linalg.norm(iris - eye_center, axis=-1) / eye_center[..., 0]
+    )
+
+    return ear.mean(axis=-1), gaze_score.mean(axis=-1)
+
 
 class EyeDetector:
-    def __init__(self):
+    def __init__(self, debug=False):
         """
         Eye dector class that contains various method for eye aperture rate estimation and gaze score estimation
 
+        Parameters
+        ----------
+        debug: bool
+            Keeps the crop of each eye (eye_crops) of the last get_Gaze_Score call with a frame; otherwise no image
+            is sliced
+
         Methods
         ----------
-        - show_eye_keypoints: shows eye keypoints in the frame/image
+        - get_features: computes EAR and Gaze_Score of the face in a single pass
+        - get_features_batch: same as get_features for a stack of faces
         - get_EAR: computes EAR average score for the two eyes of the face
         - get_Gaze_Score: computes the Gaze_Score (normalized euclidean distance between center of eye and pupil)
             of the eyes of the face
         """
+        self.debug = debug
+        self.eye_crops = None
 
     @staticmethod
-    def _calc_EAR_eye(eye_pts):
+    def get_features(landmarks):
         """
-        Computer the EAR score for a single eyes given it's keypoints
-        :param eye_pts: numpy array of shape (6,2) containing the keypoints of an eye
-        :return: ear_eye
-            EAR of the eye
+        Computes the average EAR and Gaze Score of the face (see eye_features)
+
+        Parameters
+        ----------
+        landmarks: numpy array
+            List of 478 mediapipe keypoints of the face
+
+        Returns
+        --------
+        ear, gaze_score: float
         """
-        ear_eye = (
-            LA.norm(eye_pts[2] - eye_pts[3]) + LA.norm(eye_pts[4] - eye_pts[5])
-        ) / (2 * LA.norm(eye_pts[0] - eye_pts[1]))
+        return eye_features(landmarks)
+
+    @staticmethod
+    def get_features_batch(landmarks):
         """
-        EAR is computed as the mean of two measures of eye opening (see mediapipe face keypoints for the eye)
-        divided by the eye lenght
+        Computes the average EAR and Gaze Score of each face of a (N, 478, 3) stack
+
+        Returns
+        --------
+        ear, gaze_score: numpy arrays of shape (N,)
         """
-        return ear_eye
+        return eye_features(landmarks)
 
     def get_EAR(self, landmarks):
         """
@@ -42,8 +103,6 @@ class EyeDetector:
 
         Parameters
         ----------
-        frame: numpy array
-            Frame/image in which the eyes keypoints are found
         landmarks: landmarks: numpy array
             List of 478 mediapipe keypoints of the face
 
@@ -54,57 +113,8 @@ class EyeDetector:
             The EAR or Eye Aspect Ratio is computed as the eye opennes divided by the eye lenght
             Each eye has his scores and the two scores are averaged
         """
-
-        # numpy array for storing the keypoints positions of the left and right eyes
-        eye_pts_l = np.zeros(shape=(6, 2))
-        eye_pts_r = eye_pts_l.copy()
-
-        # get the face mesh keypoints
-        for i in range(len(EYES_LMS_NUMS) // 2):
-            # array of x,y coordinates for the left eye reference point
-            eye_pts_l[i] = landmarks[EYES_LMS_NUMS[i], :2]
-            # array of x,y coordinates for the right eye reference point
-            eye_pts_r[i] = landmarks[EYES_LMS_NUMS[i + 6], :2]
-
-        # computing the left eye EAR score
-        ear_left = self._calc_EAR_eye(eye_pts_l)
-        # computing the right eye EAR score
-        ear_right = self._calc_EAR_eye(eye_pts_r)
-
-        # computing the average EAR score
-        ear_avg = (ear_left + ear_right) / 2
-
-        return ear_avg
-
-    @staticmethod
-    def _calc_1eye_score(
-        landmarks, eye_lms_nums, eye_iris_num, frame_size, frame
-    ):
-        """Gets each eye score and its picture."""
-        iris = landmarks[eye_iris_num, :2]
-
-        eye_x_min = landmarks[eye_lms_nums, 0].min()
-        eye_y_min = landmarks[eye_lms_nums, 1].min()
-        eye_x_max = landmarks[eye_lms_nums, 0].max()
-        eye_y_max = landmarks[eye_lms_nums, 1].max()
-
-        eye_center = np.array((
-            (eye_x_min + eye_x_max) / 2,
-            (eye_y_min + eye_y_max) / 2,
-        ))
-
-        eye_gaze_score = LA.norm(iris - eye_center) / eye_center[0]
-
-        eye_x_min_frame = int(eye_x_min * frame_size[0])
-        eye_y_min_frame = int(eye_y_min * frame_size[1])
-        eye_x_max_frame = int(eye_x_max * frame_size[0])
-        eye_y_max_frame = int(eye_y_max * frame_size[1])
-
-        eye = frame[
-            eye_y_min_frame:eye_y_max_frame, eye_x_min_frame:eye_x_max_frame
-        ]
-
-        return eye_gaze_score, eye
+        ear, _ = eye_features(landmarks)
+        return ear
 
     def get_Gaze_Score(self, frame, landmarks, frame_size):
         """
@@ -115,7 +125,7 @@ class EyeDetector:
         Parameters
         ----------
         frame: numpy array
-            Frame/image in which the eyes keypoints are found
+            Frame/image in which the eyes keypoints are found; only cropped in debug mode
         landmarks: numpy array
             List of 478 face mesh keypoints of the face
 
@@ -126,15 +136,23 @@ class EyeDetector:
             If unsuccessful, returns None
 
         """
+        _, gaze_score = eye_features(landmarks)
 
-        left_gaze_score, _left_eye = self._calc_1eye_score(
-            landmarks, EYES_LMS_NUMS[:6], LEFT_IRIS_NUM, frame_size, frame
-        )
-        right_gaze_score, _right_eye = self._calc_1eye_score(
-            landmarks, EYES_LMS_NUMS[6:], RIGHT_IRIS_NUM, frame_size, frame
-        )
+        if self.debug and frame is not None:
+            self.eye_crops = self._crop_eyes(frame, landmarks, frame_size)
 
-        # computes the average gaze score for the 2 eyes
-        avg_gaze_score = (left_gaze_score + right_gaze_score) / 2
+        return gaze_score
 
-        return avg_gaze_score
+    @staticmethod
+    def _crop_eyes(frame, landmarks, frame_size):
+        """Crops the bounding box of each eye (left, right) out of the frame"""
+        crops = []
+        for eye_lms_nums in (EYES_LMS_NUMS[:6], EYES_LMS_NUMS[6:]):
+            eye_min = landmarks[eye_lms_nums, :2].min(axis=0) * frame_size
+            eye_max = landmarks[eye_lms_nums, :2].max(axis=0) * frame_size
+            (x_min, y_min), (x_max, y_max) = (
+                eye_min.astype(int),
+                eye_max.astype(int),
+            )
+            crops.append(frame[y_min:y_max, x_min:x_max])
+        return crops
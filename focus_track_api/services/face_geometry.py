@@ -2628,6 +2628,37 @@ def get_metric_landmarks(screen_landmarks, pcf):
     metric_landmarks: Metric landmarks as a np.ndarray.
     pose_transform_mat: Pose transformation matrix as a np.ndarray.
 
+    """
+    metric_landmarks, pose_transform_mat = get_pose_transform_mat(
+        screen_landmarks, pcf
+    )
+
+    inv_pose_transform_mat = np.linalg.inv(pose_transform_mat)
+    inv_pose_rotation = inv_pose_transform_mat[:3, :3]
+    inv_pose_translation = inv_pose_transform_mat[:3, 3]
+
+    metric_landmarks = (
+        inv_pose_rotation @ metric_landmarks + inv_pose_translation[:, None]
+    )
+
+    return metric_landmarks, pose_transform_mat
+
+
+def get_pose_transform_mat(screen_landmarks, pcf):
+    """
+    Runs the steps of get_metric_landmarks up to the weighted orthogonal Procrustes problem, without moving the
+    metric landmarks back to the canonical space.
+
+    Parameters:
+    -----------
+    screen_landmarks: Transposed face landmarks as a np.ndarray.
+    pcf: A Perspective Camera Frustum (PCF) object.
+
+    Returns
+    -------
+    metric_landmarks: Metric landmarks in the runtime (camera) space as a np.ndarray.
+    pose_transform_mat: 4x4 pose transformation matrix (scale * rotation and translation) from the canonical face
+        model to the runtime metric space.
     """
     screen_landmarks = project_xy(screen_landmarks, pcf)
     depth_offset = np.mean(screen_landmarks[2, :])
@@ -2657,14 +2688,6 @@ def get_metric_landmarks(screen_landmarks, pcf):
     )
     cpp_compare('pose_transform_mat', pose_transform_mat)
 
-    inv_pose_transform_mat = np.linalg.inv(pose_transform_mat)
-    inv_pose_rotation = inv_pose_transform_mat[:3, :3]
-    inv_pose_translation = inv_pose_transform_mat[:3, 3]
-
-    metric_landmarks = (
-        inv_pose_rotation @ metric_landmarks + inv_pose_translation[:, None]
-    )
-
     return metric_landmarks, pose_transform_mat
 
 
@@ -2688,7 +2711,7 @@ def project_xy(landmarks, pcf):
 
     Parameters:
     -----------
-    landmarks: Transposed face landmarks in a 3D space as a np.ndarray.
+    landmarks: Transposed face landmarks in a 3D space as a np.ndarray of shape (3, n) or a stack (N, 3, n).
     pcf: A Perspective Camera Frustum (PCF) object.
 
     Returns
@@ -2701,7 +2724,7 @@ def project_xy(landmarks, pcf):
     x_translation = pcf.left
     y_translation = pcf.bottom
 
-    landmarks[1, :] = 1.0 - landmarks[1, :]
+    landmarks[..., 1, :] = 1.0 - landmarks[..., 1, :]
 
     landmarks *= np.array([[x_scale, y_scale, x_scale]]).T
     landmarks += np.array([[x_translation, y_translation, 0]]).T
@@ -2724,7 +2747,7 @@ def change_handedness(landmarks):
     landmarks: Modified landmarks as a np.ndarray.
 
     """
-    landmarks[2, :] *= -1.0
+    landmarks[..., 2, :] *= -1.0
 
     return landmarks
 
@@ -2739,8 +2762,10 @@ def move_and_rescale_z(pcf, depth_offset, scale, landmarks):
     Parameters:
     -----------
     pcf: A Perspective Camera Frustum (PCF) object.
-    depth_offset: A value representing the offset of the depth values of the landmarks as a float.
-    scale: A value representing the scaling factor for the z-coordinate of the landmarks  as a float.
+    depth_offset: A value representing the offset of the depth values of the landmarks as a float (an (N, 1)
+        np.ndarray for a stack of landmarks).
+    scale: A value representing the scaling factor for the z-coordinate of the landmarks  as a float (an (N, 1)
+        np.ndarray for a stack of landmarks).
     landmarks: Landmarks in a 3D space as a np.ndarray.
 
     Returns
@@ -2748,7 +2773,9 @@ def move_and_rescale_z(pcf, depth_offset, scale, landmarks):
     landmarks: Modified landmarks as a np.ndarray.
 
     """
-    landmarks[2, :] = (landmarks[2, :] - depth_offset + pcf.near) / scale
+    landmarks[..., 2, :] = (
+        landmarks[..., 2, :] - depth_offset + pcf.near
+    ) / scale
 
     return landmarks
 
@@ -2771,8 +2798,9 @@ def unproject_xy(pcf, landmarks):
     landmarks: Modified landmarks as a np.ndarray.
 
     """
-    landmarks[0, :] = landmarks[0, :] * landmarks[2, :] / pcf.near
-    landmarks[1, :] = landmarks[1, :] * landmarks[2, :] / pcf.near
+    landmarks[..., :2, :] = (
+        landmarks[..., :2, :] * landmarks[..., 2:, :] / pcf.near
+    )
 
     return landmarks
 
@@ -3050,3 +3078,356 @@ def combine_transform_matrix(r_and_s, t):
     result[:3, :3] = r_and_s
     result[:3, 3] = t
     return result
+
+
+def metric_landmark_ids(extra_ids=()):
+    """
+    This function lists the landmarks kept by a MetricLandmarkContext: the landmarks of the Procrustes basis first,
+    in the basis order, followed by the extra landmarks that are not part of it.
+
+    Parameters:
+    -----------
+    extra_ids: Ids of other landmarks consumed downstream as an iterable of ints.
+
+    Returns
+    -------
+    landmark_ids: Landmark ids as a list of ints.
+
+    """
+    basis_ids = [idx for idx, _ in procrustes_landmark_basis]
+    return basis_ids + [idx for idx in extra_ids if idx not in basis_ids]
+
+
+class MetricLandmarkContext:
+    """
+    This class runs get_metric_landmarks and get_pose_transform_mat for one Perspective Camera Frustum (PCF) without
+    the per frame copies of the full landmark matrix.
+
+    Everything that does not depend on the frame is computed once: the projection of project_xy as a scale and an
+    offset per axis, the square root of the weights, the weighted and centred canonical sources (folded into the
+    matrix that turns the targets into the design matrix), the source centre of mass and the denominator of the
+    optimal scale. Per frame only the landmarks of metric_landmark_ids(extra_ids) are gathered into float32 work
+    buffers and every transform runs in place on them. The two scale estimates only need the singular values of the
+    design matrix, as the optimal scale is their sum (with the sign of the smallest one flipped for a reflection)
+    divided by the constant denominator. The log / cpp_compare debug hooks are not called.
+
+    The returned arrays are buffers of the context, overwritten by the next call.
+
+    Parameters:
+    -----------
+    pcf: A Perspective Camera Frustum (PCF) object.
+    extra_ids: Ids of landmarks consumed downstream besides the Procrustes basis as an iterable of ints.
+
+    """
+
+    def __init__(self, pcf, extra_ids=()):
+        self.pcf = pcf
+        self.landmark_ids = np.array(metric_landmark_ids(extra_ids))
+        self.n_weighted = len(procrustes_landmark_basis)
+        n_landmarks = len(self.landmark_ids)
+
+        x_scale = pcf.right - pcf.left
+        y_scale = pcf.top - pcf.bottom
+        self.x_scale = x_scale
+        # project_xy: x * x_scale + left, (1 - y) * y_scale + bottom, z * x_scale
+        self._projection_scale = np.array(
+            [[x_scale], [-y_scale], [x_scale]], dtype=np.float32
+        )
+        self._projection_offset = np.array(
+            [[pcf.left], [pcf.top], [0.0]], dtype=np.float32
+        )
+
+        weighted_ids = self.landmark_ids[: self.n_weighted]
+        sqrt_weights = extract_square_root(landmark_weights[weighted_ids])
+        sources = canonical_metric_landmarks[:, weighted_ids]
+        weights = sqrt_weights * sqrt_weights
+        total_weight = np.sum(weights)
+
+        weighted_sources = sources * sqrt_weights[None, :]
+        source_center_of_mass = sources @ weights / total_weight
+        centered_weighted_sources = (
+            weighted_sources - source_center_of_mass[:, None] * sqrt_weights
+        )
+        # design matrix = targets @ design_basis
+        self._design_basis = np.ascontiguousarray(
+            (centered_weighted_sources * sqrt_weights[None, :]).T,
+            dtype=np.float32,
+        )
+        self._scale_denominator = np.sum(
+            centered_weighted_sources * weighted_sources
+        )
+        # translation = targets @ translation_weights - scale * R @ center
+        self._translation_weights = (weights / total_weight).astype(np.float32)
+        self._source_center_of_mass = source_center_of_mass.astype(np.float32)
+
+        self._gathered = np.empty((n_landmarks, 3), dtype=np.float32)
+        self._screen = np.empty((3, n_landmarks), dtype=np.float32)
+        self._metric = np.empty((3, n_landmarks), dtype=np.float32)
+        self._canonical = np.empty((n_landmarks, 3), dtype=np.float32)
+        self._design = np.empty((3, 3), dtype=np.float32)
+        self._pose_transform_mat = np.eye(4, dtype=np.float32)
+
+    def pose_transform(self, landmarks):
+        """
+        This method is the equivalent of get_pose_transform_mat restricted to the landmarks of the context.
+
+        Parameters:
+        -----------
+        landmarks: Face landmarks (not transposed) as a np.ndarray of shape (n, 3).
+
+        Returns
+        -------
+        metric_landmarks: Metric landmarks in the runtime (camera) space as a np.ndarray of shape (3, k), in the
+            order of landmark_ids.
+        pose_transform_mat: 4x4 pose transformation matrix as a np.ndarray.
+
+        """
+        screen = self._screen
+        metric = self._metric
+        near = self.pcf.near
+
+        np.take(landmarks, self.landmark_ids, axis=0, out=self._gathered)
+        np.multiply(self._gathered.T, self._projection_scale, out=screen)
+        screen += self._projection_offset
+        # mean z of every landmark, as in get_metric_landmarks
+        depth_offset = self.x_scale * np.mean(landmarks[:, 2])
+
+        # change_handedness of the screen landmarks only flips the z row of
+        # the design matrix
+        self._design_matrix(screen)
+        self._design[2] *= -1.0
+        first_iteration_scale = self._estimate_scale()
+
+        self._move_and_unproject(depth_offset - near, first_iteration_scale)
+        self._design_matrix(metric)
+        second_iteration_scale = self._estimate_scale()
+
+        self._move_and_unproject(
+            depth_offset - near, first_iteration_scale * second_iteration_scale
+        )
+        design = self._design_matrix(metric)
+
+        u, _, vh = np.linalg.svd(design)
+        if np.linalg.det(u) * np.linalg.det(vh) < 0:
+            u[:, 2] *= -1.0
+        rotation = u @ vh
+        scale = np.sum(rotation * design) / self._scale_denominator
+        rotation_and_scale = scale * rotation
+
+        pose_transform_mat = self._pose_transform_mat
+        pose_transform_mat[:3, :3] = rotation_and_scale
+        pose_transform_mat[:3, 3] = (
+            metric[:, : self.n_weighted] @ self._translation_weights
+            - rotation_and_scale @ self._source_center_of_mass
+        )
+
+        return metric, pose_transform_mat
+
+    def metric_landmarks(self, landmarks):
+        """
+        This method is the equivalent of get_metric_landmarks restricted to the landmarks of the context: the metric
+        landmarks are moved back to the canonical face space with the inverse of the pose transformation.
+
+        Parameters:
+        -----------
+        landmarks: Face landmarks (not transposed) as a np.ndarray of shape (n, 3).
+
+        Returns
+        -------
+        metric_landmarks: Metric landmarks as a np.ndarray of shape (k, 3), in the order of landmark_ids.
+        pose_transform_mat: 4x4 pose transformation matrix as a np.ndarray.
+
+        """
+        metric, pose_transform_mat = self.pose_transform(landmarks)
+
+        # inverse of scale * R, t: R.T / scale, -R.T @ t / scale
+        metric -= pose_transform_mat[:3, 3:]
+        np.matmul(metric.T, pose_transform_mat[:3, :3], out=self._canonical)
+        self._canonical /= np.sum(pose_transform_mat[:3, 0] ** 2)
+
+        return self._canonical, pose_transform_mat
+
+    def _move_and_unproject(self, depth_shift, scale):
+        """move_and_rescale_z, unproject_xy and change_handedness of the screen landmarks into the metric buffer"""
+        screen = self._screen
+        metric = self._metric
+
+        np.subtract(screen[2], depth_shift, out=metric[2])
+        metric[2] /= scale
+        np.multiply(screen[:2], metric[2], out=metric[:2])
+        metric[:2] /= self.pcf.near
+        metric[2] *= -1.0
+
+    def _design_matrix(self, targets):
+        return np.matmul(
+            targets[:, : self.n_weighted], self._design_basis, out=self._design
+        )
+
+    def _estimate_scale(self):
+        """estimate_scale from the singular values of the current design matrix"""
+        singular_values = np.linalg.svd(self._design, compute_uv=False)
+        if np.linalg.det(self._design) < 0:
+            singular_values[2] *= -1.0
+        return np.sum(singular_values) / self._scale_denominator
+
+
+def get_metric_landmarks_batch(screen_landmarks, pcf):
+    """
+    This function is the batched version of get_metric_landmarks: it runs the same steps for a stack of frames at
+    once with batched matrix products and SVDs. The projection helpers work in place on the stack, the per frame
+    depth offsets and scales are (N, 1) columns and the weighted orthogonal problems are solved by
+    solve_weighted_orthogonal_problem_batch.
+
+    Parameters:
+    -----------
+    screen_landmarks: Stack of transposed face landmarks as a np.ndarray of shape (N, 3, n), modified in place.
+    pcf: A Perspective Camera Frustum (PCF) object.
+
+    Returns
+    -------
+    metric_landmarks: Metric landmarks as a np.ndarray of shape (N, 3, n).
+    pose_transform_mats: Pose transformation matrices as a np.ndarray of shape (N, 4, 4).
+
+    """
+    metric_landmarks, pose_transform_mats = get_pose_transform_mat_batch(
+        screen_landmarks, pcf
+    )
+
+    inv_pose_transform_mats = np.linalg.inv(pose_transform_mats)
+    metric_landmarks = (
+        inv_pose_transform_mats[:, :3, :3] @ metric_landmarks
+        + inv_pose_transform_mats[:, :3, 3:]
+    )
+
+    return metric_landmarks, pose_transform_mats
+
+
+def get_pose_transform_mat_batch(screen_landmarks, pcf):
+    """
+    This function is the batched version of get_pose_transform_mat.
+
+    Parameters:
+    -----------
+    screen_landmarks: Stack of transposed face landmarks as a np.ndarray of shape (N, 3, n), modified in place.
+    pcf: A Perspective Camera Frustum (PCF) object.
+
+    Returns
+    -------
+    metric_landmarks: Metric landmarks in the runtime (camera) space as a np.ndarray of shape (N, 3, n).
+    pose_transform_mats: Pose transformation matrices as a np.ndarray of shape (N, 4, 4).
+
+    """
+    screen_landmarks = project_xy(screen_landmarks, pcf)
+    depth_offset = np.mean(screen_landmarks[:, 2, :], axis=1, keepdims=True)
+
+    intermediate_landmarks = screen_landmarks.copy()
+    intermediate_landmarks = change_handedness(intermediate_landmarks)
+    first_iteration_scale = estimate_scale_batch(intermediate_landmarks)
+
+    intermediate_landmarks = screen_landmarks.copy()
+    intermediate_landmarks = move_and_rescale_z(
+        pcf, depth_offset, first_iteration_scale, intermediate_landmarks
+    )
+    intermediate_landmarks = unproject_xy(pcf, intermediate_landmarks)
+    intermediate_landmarks = change_handedness(intermediate_landmarks)
+    second_iteration_scale = estimate_scale_batch(intermediate_landmarks)
+
+    metric_landmarks = screen_landmarks
+    total_scale = first_iteration_scale * second_iteration_scale
+    metric_landmarks = move_and_rescale_z(
+        pcf, depth_offset, total_scale, metric_landmarks
+    )
+    metric_landmarks = unproject_xy(pcf, metric_landmarks)
+    metric_landmarks = change_handedness(metric_landmarks)
+
+    pose_transform_mats = solve_weighted_orthogonal_problem_batch(
+        canonical_metric_landmarks, metric_landmarks, landmark_weights
+    )
+
+    return metric_landmarks, pose_transform_mats
+
+
+def estimate_scale_batch(landmarks):
+    """
+    This function is the batched version of estimate_scale.
+
+    Parameters:
+    -----------
+    landmarks: Stack of landmarks in a 3D space as a np.ndarray of shape (N, 3, n).
+
+    Returns
+    -------
+    scale: Scale of each frame as a np.ndarray of shape (N, 1).
+
+    """
+    transform_mats = solve_weighted_orthogonal_problem_batch(
+        canonical_metric_landmarks, landmarks, landmark_weights
+    )
+
+    return np.linalg.norm(transform_mats[:, :, 0], axis=1, keepdims=True)
+
+
+def solve_weighted_orthogonal_problem_batch(
+    source_points, target_points, point_weights
+):
+    """
+    This function is the batched version of solve_weighted_orthogonal_problem: one source (the canonical model) and
+    a stack of targets. Only the points with a non zero weight take part in the problem, so the other columns are
+    dropped before the products, and the design matrices of all frames go through a single batched SVD.
+
+    Parameters:
+    -----------
+    source_points: Source points as a np.ndarray of shape (3, m).
+    target_points: Stack of target points as a np.ndarray of shape (N, 3, n), n >= m.
+    point_weights: Point weights as a np.ndarray of shape (m,).
+
+    Returns
+    -------
+    transform_mats: Transformation matrices as a np.ndarray of shape (N, 4, 4).
+
+    """
+    weighted_ids = np.flatnonzero(point_weights)
+    sqrt_weights = extract_square_root(point_weights[weighted_ids])
+    total_weight = np.sum(sqrt_weights * sqrt_weights)
+
+    weighted_sources = source_points[:, weighted_ids] * sqrt_weights[None, :]
+    weighted_targets = (
+        target_points[:, :, weighted_ids] * sqrt_weights[None, None, :]
+    )
+
+    source_center_of_mass = (
+        np.sum(weighted_sources * sqrt_weights[None, :], axis=1) / total_weight
+    )
+    centered_weighted_sources = weighted_sources - np.matmul(
+        source_center_of_mass[:, None], sqrt_weights[None, :]
+    )
+
+    design_matrices = weighted_targets @ centered_weighted_sources.T
+
+    u, _, vh = np.linalg.svd(design_matrices)
+    reflection = np.linalg.det(u) * np.linalg.det(vh) < 0
+    u[reflection, :, 2] *= -1.0
+    rotations = u @ vh
+
+    numerators = np.sum(
+        (rotations @ centered_weighted_sources) * weighted_targets,
+        axis=(1, 2),
+    )
+    denominator = np.sum(centered_weighted_sources * weighted_sources)
+    scales = numerators / denominator
+    rotations_and_scales = scales[:, None, None] * rotations
+
+    pointwise_diffs = weighted_targets - (
+        rotations_and_scales @ weighted_sources
+    )
+    translations = (
+        np.sum(pointwise_diffs * sqrt_weights[None, None, :], axis=2)
+        / total_weight
+    )
+
+    transform_mats = np.zeros((len(target_points), 4, 4))
+    transform_mats[:, :3, :3] = rotations_and_scales
+    transform_mats[:, :3, 3] = translations
+    transform_mats[:, 3, 3] = 1.0
+
+    return transform_mats
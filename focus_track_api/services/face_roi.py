@@ -0,0 +1,114 @@
+from typing import Optional
+
+import cv2
+import numpy as np
+
+# Recorte (x0, y0, x1, y1) em pixels da imagem decodificada
+Box = tuple[int, int, int, int]
+
+
+class FaceROI:
+    """
+    Região do frame entregue ao FaceMesh, a partir do rosto anterior.
+
+    O recorte é a caixa do rosto com `padding` (fração do maior lado do
+    rosto) em cada direção e permanece fixo enquanto o rosto continua bem
+    dentro dele, de modo que o FaceMesh recebe imagens do mesmo tamanho e o
+    seu rastreamento interno não é perturbado. Com `target_face_width` o
+    recorte ainda é reduzido para que o rosto tenha no máximo essa largura
+    em pixels.
+
+    Os landmarks do FaceMesh (normalizados no recorte) são convertidos de
+    volta para o frame inteiro com `to_frame`. Sem rosto anterior, ou após
+    perdê-lo, o frame inteiro é usado.
+    """
+
+    def __init__(self, padding: float = 0.5, target_face_width: int = 0):
+        self.padding = padding
+        self.target_face_width = target_face_width
+        self.box: Optional[Box] = None
+        self._image_shape: Optional[tuple[int, int]] = None
+        self._scale = 1.0
+        self._resized: Optional[np.ndarray] = None
+
+    def clear(self):
+        self.box = None
+
+    def crop(self, image: np.ndarray) -> tuple[np.ndarray, Optional[Box]]:
+        """Imagem a entregar ao FaceMesh e o recorte usado (None = inteira)"""
+        if image.shape[:2] != self._image_shape:
+            # Resolução processada mudou: o recorte em pixels não vale mais
+            self.clear()
+        if self.box is None:
+            return image, None
+
+        x0, y0, x1, y1 = self.box
+        crop = image[y0:y1, x0:x1]
+        if self._scale < 1.0:
+            size = (
+                max(round((x1 - x0) * self._scale), 1),
+                max(round((y1 - y0) * self._scale), 1),
+            )
+            shape = (size[1], size[0], *image.shape[2:])
+            if self._resized is None or self._resized.shape != shape:
+                self._resized = np.empty(shape, dtype=image.dtype)
+            cv2.resize(
+                crop, size, dst=self._resized, interpolation=cv2.INTER_AREA
+            )
+            crop = self._resized
+        return np.ascontiguousarray(crop), self.box
+
+    @staticmethod
+    def to_frame(
+        landmarks: np.ndarray, box: Optional[Box], image: np.ndarray
+    ) -> np.ndarray:
+        """Converte, in place, landmarks do recorte para o frame inteiro"""
+        if box is None:
+            return landmarks
+        x0, y0, x1, y1 = box
+        height, width = image.shape[:2]
+        landmarks[:, 0] = (landmarks[:, 0] * (x1 - x0) + x0) / width
+        landmarks[:, 1] = (landmarks[:, 1] * (y1 - y0) + y0) / height
+        # z do FaceMesh está na escala da largura da imagem recebida
+        landmarks[:, 2] *= (x1 - x0) / width
+        return landmarks
+
+    def update(self, landmarks: np.ndarray, image: np.ndarray):
+        """Ajusta o recorte ao rosto do frame (landmarks do frame inteiro)"""
+        height, width = image.shape[:2]
+        x0, y0 = landmarks[:, :2].min(axis=0) * (width, height)
+        x1, y1 = landmarks[:, :2].max(axis=0) * (width, height)
+        face_size = max(x1 - x0, y1 - y0, 1.0)
+        pad = self.padding * face_size
+
+        if image.shape[:2] != self._image_shape:
+            self.clear()
+        if self.box is not None:
+            bx0, by0, bx1, by1 = self.box
+            # Mantém o recorte enquanto sobra metade da margem em volta do
+            # rosto e ele não ficou pequeno demais para o recorte
+            inner = pad / 2
+            inside = (
+                x0 - bx0 >= inner
+                and y0 - by0 >= inner
+                and bx1 - x1 >= inner
+                and by1 - y1 >= inner
+            )
+            if inside and (bx1 - bx0) <= 2 * (face_size + 2 * pad):
+                return
+
+        box = (
+            max(int(x0 - pad), 0),
+            max(int(y0 - pad), 0),
+            min(int(np.ceil(x1 + pad)), width),
+            min(int(np.ceil(y1 + pad)), height),
+        )
+        if box[2] <= box[0] or box[3] <= box[1]:
+            self.clear()
+            return
+
+        self.box = box
+        self._image_shape = image.shape[:2]
+        self._scale = 1.0
+        if self.target_face_width > 0:
+            self._scale = min(self.target_face_width / face_size, 1.0)
@@ -0,0 +1,51 @@
+import asyncio
+from typing import Optional
+
+
+class LatestFrameSlot:
+    """
+    Caixa de um único frame entre a tarefa de recepção e o processamento.
+
+    Quando o cliente envia mais rápido do que conseguimos pontuar, o frame
+    pendente é substituído pelo mais recente (latest-frame-wins) e o
+    descartado é contabilizado. Assim a latência fica limitada ao tempo de
+    processamento de um frame, em vez de crescer com a fila do socket.
+    """
+
+    def __init__(self):
+        self._frame: Optional[bytes] = None
+        self._received_at = 0.0
+        self._coalesced = 0
+        self._error: Optional[BaseException] = None
+        self._ready = asyncio.Event()
+        self.total_dropped = 0
+
+    def put(self, frame: bytes, received_at: float):
+        if self._frame is not None:
+            self._coalesced += 1
+            self.total_dropped += 1
+        self._frame = frame
+        self._received_at = received_at
+        self._ready.set()
+
+    def close(self, error: BaseException):
+        """Encerra a caixa; `get` passa a levantar `error`"""
+        self._error = error
+        self._ready.set()
+
+    async def get(self) -> tuple[bytes, float, int]:
+        """Retorna (frame, instante de recepção, frames descartados antes dele)"""
+        while self._frame is None:
+            if self._error is not None:
+                raise self._error
+            self._ready.clear()
+            await self._ready.wait()
+
+        frame, received_at, coalesced = (
+            self._frame,
+            self._received_at,
+            self._coalesced,
+        )
+        self._frame = None
+        self._coalesced = 0
+        return frame, received_at, coalesced
@@ -0,0 +1,505 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from focus_track_api.services.eye_detector import EyeDetector
+from focus_track_api.services.face_roi import FaceROI
+from focus_track_api.services.landmark_tracker import (
+    LandmarkTracker,
+    tracked_landmarks,
+)
+from focus_track_api.services.monitor_protocol import (
+    PIXEL_FORMAT_RGB,
+    is_landmarks_message,
+    is_raw_frame,
+    parse_landmarks_message,
+    parse_raw_frame,
+)
+from focus_track_api.services.pose_estimation import HeadPoseEstimator
+from focus_track_api.utils.constants import LANDMARK_COUNT
+from focus_track_api.utils.utils import (
+    FACE_REGIONS_INDEX,
+    RegionsIndex,
+    clamp_landmarks,
+    extract_landmarks,
+    region_points,
+    select_regions,
+)
+
+
+def face_mesh():
+    return mp.solutions.face_mesh.FaceMesh(
+        max_num_faces=1,
+        static_image_mode=False,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5,
+        refine_landmarks=True,
+    )
+
+
+JPEG_SOI = b'\xff\xd8'
+JPEG_MARKER_PREFIX = 0xFF
+# Marcadores SOF (start of frame) que carregam as dimensões da imagem
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Cantos externos dos olhos, usados para medir o tamanho do rosto
+OUTER_EYE_CORNERS = (33, 263)
+# Fatores de redução suportados pelo decoder JPEG (escala no domínio DCT)
+REDUCED_GRAYSCALE_FLAGS = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+
+def jpeg_frame_size(data: bytes) -> tuple[int, int] | None:
+    """Lê (largura, altura) do cabeçalho JPEG sem decodificar a imagem"""
+    if not data.startswith(JPEG_SOI):
+        return None
+
+    i = len(JPEG_SOI)
+    while i + 9 <= len(data):
+        if data[i] != JPEG_MARKER_PREFIX:
+            return None
+        marker = data[i + 1]
+        if marker == JPEG_MARKER_PREFIX:
+            # Bytes de preenchimento entre marcadores
+            i += 1
+            continue
+        if marker in JPEG_SOF_MARKERS:
+            height = int.from_bytes(data[i + 5 : i + 7], 'big')
+            width = int.from_bytes(data[i + 7 : i + 9], 'big')
+            return width, height
+        i += 2 + int.from_bytes(data[i + 2 : i + 4], 'big')
+
+    return None
+
+
+def reduced_decode_factor(width: int, max_width: int) -> int:
+    """Menor fator de redução que deixa a largura decodificada <= max_width"""
+    if max_width <= 0:
+        return 1
+    for factor in REDUCED_GRAYSCALE_FLAGS:
+        if width / factor <= max_width:
+            return factor
+    return max(REDUCED_GRAYSCALE_FLAGS)
+
+
+class FrameDecoder:
+    """
+    Decodifica frames direto para tons de cinza.
+
+    O JPEG é decodificado uma única vez em escala de cinza (opcionalmente
+    reduzido no domínio DCT quando a largura excede `max_decode_width` ou
+    quando a sessão pede um `scale_factor`) e replicado para 3 canais em um
+    buffer reaproveitado entre frames da sessão, evitando as cópias de
+    `expand_dims` + `concatenate`.
+
+    Frames brutos (ver `monitor_protocol`) dispensam a decodificação: RGB é
+    usado diretamente como view sobre os bytes recebidos e cinza é apenas
+    replicado para o buffer de 3 canais. Com `scale_factor` > 1 eles são
+    reduzidos (INTER_AREA) para outro buffer reaproveitado.
+    """
+
+    def __init__(self, max_decode_width: int = 0):
+        self.max_decode_width = max_decode_width
+        self._rgb: Optional[np.ndarray] = None
+        self._scaled: Optional[np.ndarray] = None
+
+    def decode(
+        self, data: bytes, scale_factor: int = 1
+    ) -> tuple[np.ndarray, tuple[int, int]]:
+        """
+        Retorna a imagem de 3 canais (possivelmente reduzida) e o tamanho
+        original do frame, usado para as coordenadas em pixels.
+        """
+        if is_raw_frame(data):
+            return self._wrap_raw(data, scale_factor)
+
+        nparr = np.frombuffer(data, np.uint8)
+
+        frame_size = jpeg_frame_size(data)
+        factor = 1
+        if frame_size is not None:
+            factor = max(
+                reduced_decode_factor(frame_size[0], self.max_decode_width),
+                scale_factor,
+            )
+
+        gray = cv2.imdecode(nparr, REDUCED_GRAYSCALE_FLAGS[factor])
+        if gray is None:
+            raise ValueError('Frame inválido: falha ao decodificar imagem')
+        if frame_size is None:
+            frame_size = gray.shape[1], gray.shape[0]
+
+        return self._gray_to_rgb(gray), frame_size
+
+    def _wrap_raw(
+        self, data: bytes, scale_factor: int
+    ) -> tuple[np.ndarray, tuple[int, int]]:
+        image, pixel_format = parse_raw_frame(data)
+        frame_size = image.shape[1], image.shape[0]
+        if scale_factor > 1:
+            image = self._downscale(image, scale_factor)
+        if pixel_format == PIXEL_FORMAT_RGB:
+            return image, frame_size
+        return self._gray_to_rgb(image), frame_size
+
+    def _downscale(self, image: np.ndarray, factor: int) -> np.ndarray:
+        height, width = image.shape[:2]
+        size = max(width // factor, 1), max(height // factor, 1)
+        shape = (size[1], size[0], *image.shape[2:])
+        if self._scaled is None or self._scaled.shape != shape:
+            self._scaled = np.empty(shape, dtype=np.uint8)
+        cv2.resize(image, size, dst=self._scaled, interpolation=cv2.INTER_AREA)
+        return self._scaled
+
+    def _gray_to_rgb(self, gray: np.ndarray) -> np.ndarray:
+        if self._rgb is None or self._rgb.shape[:2] != gray.shape:
+            self._rgb = np.empty((*gray.shape, 3), dtype=np.uint8)
+        cv2.cvtColor(gray, cv2.COLOR_GRAY2RGB, dst=self._rgb)
+        return self._rgb
+
+
+def process_frame(data: bytes):
+    return FrameDecoder().decode(data)
+
+
+def get_face_landmarks(
+    face_mesh,
+    frame: np.ndarray,
+    frame_size: tuple[int, int] | None = None,
+    out: np.ndarray | None = None,
+    regions_index: Optional[RegionsIndex] = FACE_REGIONS_INDEX,
+) -> tuple[np.ndarray | None, np.ndarray] | None:
+    frame_size = frame_size or (frame.shape[1], frame.shape[0])
+    results = face_mesh.process(frame)
+    lms = results.multi_face_landmarks
+
+    if lms:
+        landmarks = extract_landmarks(lms, out)
+        return _regions_and_clamp(landmarks, frame_size, regions_index)
+
+    return None
+
+
+def _regions_and_clamp(
+    landmarks: np.ndarray,
+    frame_size: tuple[int, int],
+    regions_index: Optional[RegionsIndex] = FACE_REGIONS_INDEX,
+) -> tuple[np.ndarray | None, np.ndarray]:
+    # As regiões usam as coordenadas originais; as métricas, as limitadas.
+    # Sem índice (frame sem landmarks na resposta) nada é extraído.
+    points = None
+    if regions_index is not None:
+        points = region_points(landmarks, frame_size, regions_index)
+    return points, clamp_landmarks(landmarks)
+
+
+def enable_cv_optimizations():
+    if not cv2.useOptimized():
+        try:
+            cv2.setUseOptimized(True)
+        except Exception as ex:
+            print('OpenCV optimization could not be set to True.', ex)
+
+
+def init_cv_dependencies():
+    enable_cv_optimizations()
+
+    return (
+        face_mesh(),
+        EyeDetector(),
+        HeadPoseEstimator(),
+    )
+
+
+def _as_float(value) -> Optional[float]:
+    """Converte escalares/arrays de um elemento do NumPy em float"""
+    if value is None:
+        return None
+    return float(np.asarray(value).reshape(-1)[0])
+
+
+class ResolutionPolicy:
+    """
+    Escolhe, por sessão, o fator de redução dos frames a partir da distância
+    interocular medida (cantos externos dos olhos, em pixels do frame).
+
+    Usa o maior fator (1, 2, 4 ou 8) que mantém essa distância em pelo
+    menos `target_interocular` pixels na imagem processada: rostos pequenos
+    (longe da câmera) mantêm o detalhe e rostos grandes são reduzidos. A
+    redução só aumenta com folga (`REDUCE_MARGIN`) para não alternar entre
+    fatores a cada frame, e volta a 1 quando o rosto é perdido, para que a
+    nova detecção use o frame inteiro.
+    """
+
+    # Folga exigida para aumentar a redução
+    REDUCE_MARGIN = 1.25
+
+    def __init__(self, target_interocular: float = 0.0):
+        self.target_interocular = target_interocular
+        self.factor = 1
+
+    def reset(self):
+        self.factor = 1
+
+    def update(
+        self, landmarks: np.ndarray, frame_size: tuple[int, int]
+    ) -> int:
+        """Fator para os próximos frames, a partir dos landmarks do atual"""
+        if self.target_interocular <= 0:
+            return self.factor
+
+        left, right = landmarks[list(OUTER_EYE_CORNERS), :2]
+        distance = float(
+            np.linalg.norm((right - left) * np.asarray(frame_size))
+        )
+        if distance / self.factor < self.target_interocular:
+            # Rosto pequeno demais para o fator atual: recupera detalhe
+            self.factor = max(
+                (
+                    factor
+                    for factor in REDUCED_GRAYSCALE_FLAGS
+                    if distance / factor >= self.target_interocular
+                ),
+                default=1,
+            )
+        else:
+            self.factor = max(
+                (
+                    factor
+                    for factor in REDUCED_GRAYSCALE_FLAGS
+                    if factor > self.factor
+                    and distance / factor
+                    >= self.target_interocular * self.REDUCE_MARGIN
+                ),
+                default=self.factor,
+            )
+        return self.factor
+
+
+@dataclass(slots=True)
+class PipelineConfig:
+    """Configuração do pipeline de CV de uma sessão (enviada aos workers)"""
+
+    # Largura máxima decodificada; JPEGs maiores são reduzidos (0 = nunca)
+    max_decode_width: int = 0
+    # Regiões de landmarks extraídas para a resposta (None = todas)
+    regions: Optional[tuple[str, ...]] = None
+    # Extrai as regiões a cada N frames com rosto detectado
+    landmarks_every: int = 1
+    # FaceMesh completo a cada N frames; nos demais os landmarks são
+    # rastreados por fluxo óptico (1 = FaceMesh em todos os frames)
+    tracking_interval: int = 1
+    # Erro forward-backward máximo (px) de um ponto rastreado
+    tracking_max_error: float = 1.0
+    # Entrega ao FaceMesh apenas o recorte em volta do rosto anterior
+    face_roi: bool = False
+    # Margem do recorte, em frações do tamanho do rosto
+    face_roi_padding: float = 0.5
+    # Reduz o recorte para o rosto ter no máximo N px de largura (0 = não)
+    face_target_width: int = 0
+    # Distância interocular mínima (px) na imagem processada; define o
+    # fator de redução adaptativo da sessão (0 = resolução do cliente)
+    target_interocular: float = 0.0
+    # Solver da pose (ver POSE_SOLVERS), warm start a partir da
+    # pose do frame anterior e refinamento VVS de cada solução
+    pose_solver: str = 'iterative'
+    pose_warm_start: bool = False
+    pose_refine: bool = True
+
+
+@dataclass(slots=True)
+class FrameAnalysis:
+    """Resultado da etapa de visão computacional de um frame"""
+
+    face_detected: bool
+    # Pontos (N, 2) em pixels das regiões configuradas, na ordem de
+    # FACE_REGIONS; None nos frames sem landmarks na resposta
+    landmark_points: Optional[np.ndarray] = None
+    ear: Optional[float] = None
+    gaze: Optional[float] = None
+    roll: Optional[float] = None
+    pitch: Optional[float] = None
+    yaw: Optional[float] = None
+    # (largura, altura) da imagem efetivamente processada; None quando os
+    # landmarks vieram prontos do cliente
+    processing_size: Optional[tuple[int, int]] = None
+
+
+class FramePipeline:
+    """
+    Estado de visão computacional de uma sessão de monitoramento.
+
+    Cada conexão possui sua própria instância do FaceMesh (que mantém estado
+    de rastreamento entre frames), do EyeDetector e do HeadPoseEstimator.
+    Os métodos são síncronos e pesados em CPU: devem ser executados fora do
+    event loop e nunca concorrentemente para a mesma instância.
+
+    Clientes que rodam o FaceMesh localmente enviam os landmarks prontos
+    (ver `monitor_protocol`); nesse caso a decodificação e o FaceMesh são
+    pulados e o FaceMesh da sessão nem chega a ser criado.
+
+    Apenas as regiões pedidas pela conexão são extraídas, e somente nos
+    frames em que a resposta leva landmarks (`landmarks_every`).
+
+    Com `tracking_interval` > 1 o FaceMesh roda apenas a cada N frames de
+    imagem; nos intermediários o LandmarkTracker propaga os landmarks por
+    fluxo óptico, voltando ao FaceMesh assim que o rastreamento deriva.
+
+    Com `face_roi` o FaceMesh recebe só o recorte (FaceROI) em volta do
+    rosto do frame anterior; se o rosto não for encontrado no recorte, o
+    mesmo frame é reprocessado inteiro e o recorte é descartado.
+
+    Com `target_interocular` a resolução processada se adapta ao tamanho
+    do rosto (ResolutionPolicy). Landmarks, EAR e pose continuam nas
+    coordenadas do frame original (`frame_size`), de modo que a matriz da
+    câmera e o FaceGeometry não dependem do fator escolhido.
+    """
+
+    def __init__(self, config: Optional[PipelineConfig] = None):
+        enable_cv_optimizations()
+        self.config = config or PipelineConfig()
+        self._face_mesh = None
+        self.eye_detector = EyeDetector()
+        # Modo headless: nada é desenhado nos frames do servidor
+        self.head_pose = HeadPoseEstimator(
+            headless=True,
+            solver=self.config.pose_solver,
+            warm_start=self.config.pose_warm_start,
+            refine=self.config.pose_refine,
+        )
+        self.decoder = FrameDecoder(self.config.max_decode_width)
+        # Buffer (478, 3) float32 reaproveitado a cada frame
+        self._landmarks = np.empty((LANDMARK_COUNT, 3), dtype=np.float32)
+        self.regions_index = select_regions(self.config.regions)
+        self._faces = 0
+        self.tracker = LandmarkTracker(
+            tracked_landmarks(self.head_pose.model_lms_ids),
+            self.config.tracking_interval,
+            self.config.tracking_max_error,
+        )
+        self.face_roi = (
+            FaceROI(
+                self.config.face_roi_padding, self.config.face_target_width
+            )
+            if self.config.face_roi
+            else None
+        )
+        self.resolution = ResolutionPolicy(self.config.target_interocular)
+
+    @property
+    def face_mesh(self):
+        if self._face_mesh is None:
+            self._face_mesh = face_mesh()
+        return self._face_mesh
+
+    def process(self, frame_data: bytes) -> FrameAnalysis:
+        if is_landmarks_message(frame_data):
+            return self._process_landmarks(frame_data)
+
+        gray_image, frame_size = self.decoder.decode(
+            frame_data, self.resolution.factor
+        )
+        processing_size = gray_image.shape[1], gray_image.shape[0]
+        landmarks = self.tracker.track(gray_image, self._landmarks)
+        if landmarks is None:
+            landmarks = self._face_mesh_landmarks(gray_image)
+            if landmarks is None:
+                self.tracker.clear()
+                self.resolution.reset()
+                self.head_pose.reset()
+                return FrameAnalysis(
+                    face_detected=False, processing_size=processing_size
+                )
+            self.tracker.reset(gray_image, landmarks)
+        if self.face_roi is not None:
+            self.face_roi.update(landmarks, gray_image)
+        self.resolution.update(landmarks, frame_size)
+
+        landmark_points, landmarks = _regions_and_clamp(
+            landmarks, frame_size, self._frame_regions_index()
+        )
+        analysis = self._analyse_landmarks(
+            landmark_points, landmarks, gray_image, frame_size
+        )
+        analysis.processing_size = processing_size
+        return analysis
+
+    def _face_mesh_landmarks(
+        self, gray_image: np.ndarray
+    ) -> Optional[np.ndarray]:
+        """Landmarks do FaceMesh nas coordenadas do frame (None = sem rosto)"""
+        if self.face_roi is None:
+            lms = self.face_mesh.process(gray_image).multi_face_landmarks
+            return extract_landmarks(lms, self._landmarks) if lms else None
+
+        image, box = self.face_roi.crop(gray_image)
+        lms = self.face_mesh.process(image).multi_face_landmarks
+        if not lms and box is not None:
+            # Rosto perdido no recorte: tenta o frame inteiro
+            self.face_roi.clear()
+            box = None
+            lms = self.face_mesh.process(gray_image).multi_face_landmarks
+        if not lms:
+            return None
+        return self.face_roi.to_frame(
+            extract_landmarks(lms, self._landmarks), box, gray_image
+        )
+
+    def process_batch(self, frames: list[bytes]) -> list[FrameAnalysis]:
+        """Processa os frames de um envelope em ordem, em uma única chamada"""
+        return [self.process(frame_data) for frame_data in frames]
+
+    def _process_landmarks(self, frame_data: bytes) -> FrameAnalysis:
+        _, frame_size, client_landmarks = parse_landmarks_message(frame_data)
+        if client_landmarks is None:
+            self.head_pose.reset()
+            return FrameAnalysis(face_detected=False)
+
+        np.copyto(self._landmarks, client_landmarks)
+        landmark_points, landmarks = _regions_and_clamp(
+            self._landmarks, frame_size, self._frame_regions_index()
+        )
+
+        return self._analyse_landmarks(
+            landmark_points, landmarks, None, frame_size
+        )
+
+    def _frame_regions_index(self) -> Optional[RegionsIndex]:
+        """Índice das regiões a extrair neste frame (None = nenhuma)"""
+        send = self._faces % self.config.landmarks_every == 0
+        self._faces += 1
+        if not send or not self.regions_index.regions:
+            return None
+        return self.regions_index
+
+    def _analyse_landmarks(
+        self,
+        landmark_points: Optional[np.ndarray],
+        landmarks: np.ndarray,
+        gray_image: Optional[np.ndarray],
+        frame_size: tuple[int, int],
+    ) -> FrameAnalysis:
+        ear, gaze = self.eye_detector.get_features(landmarks)
+        _, roll, pitch, yaw = self.head_pose.get_pose(
+            frame=gray_image, landmarks=landmarks, frame_size=frame_size
+        )
+
+        return FrameAnalysis(
+            face_detected=True,
+            landmark_points=landmark_points,
+            ear=_as_float(ear),
+            gaze=_as_float(gaze),
+            roll=_as_float(roll),
+            pitch=_as_float(pitch),
+            yaw=_as_float(yaw),
+        )
+
+    def close(self):
+        if self._face_mesh is not None:
+            self._face_mesh.close()
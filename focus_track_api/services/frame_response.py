@@ -0,0 +1,165 @@
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+from focus_track_api.schemas.monitor import MonitorOptions
+from focus_track_api.services.monitor_protocol import (
+    RESPONSE_ENCODING_DELTA,
+    RESPONSE_ENCODING_JSON,
+    LandmarkDeltaStream,
+    encode_batch_response,
+    encode_frame_response,
+)
+from focus_track_api.utils.constants import FACE_REGIONS
+from focus_track_api.utils.utils import RegionsIndex, select_regions
+
+# Coordenadas no JSON com precisão de centésimo de pixel
+JSON_POINT_FORMAT = '{"x":%.2f,"y":%.2f}'
+
+
+@dataclass(slots=True)
+class FrameResult:
+    """
+    Resultado de um frame pontuado, preenchido uma única vez e serializado
+    direto para texto (JSON) ou bytes, sem passar pelo Pydantic.
+    """
+
+    fatigue_score: float
+    distraction_score: float
+    attention_score: float
+    time_on_screen: float
+    # Pontos (N, 2) em pixels das regiões enviadas; None = sem landmarks
+    landmark_points: Optional[np.ndarray] = None
+    # Campos da sessão de estudo; session_status None = sem sessão
+    session_status: Optional[str] = None
+    total_paused_time: float = 0.0
+    paused_at: Optional[datetime] = None
+    frames_coalesced: int = 0
+
+
+def landmarks_json_template(regions_index: RegionsIndex) -> str:
+    """
+    Template %-format do objeto `landmarks` para as regiões do índice.
+
+    Os pontos são preenchidos de uma vez com `template % tuple(coords)`;
+    regiões fora do índice aparecem como null, como no FaceLandmarks.
+    """
+    regions = []
+    for region in FACE_REGIONS:
+        bounds = regions_index.slices.get(region)
+        if bounds is None:
+            regions.append(f'"{region}":null')
+            continue
+        start, stop = bounds
+        points = ','.join([JSON_POINT_FORMAT] * (stop - start))
+        regions.append(f'"{region}":[{points}]')
+    return '{' + ','.join(regions) + '}'
+
+
+def encode_frame_json(result: FrameResult, landmarks_template: str) -> str:
+    """Serializa o resultado no mesmo formato do antigo FrameMetrics"""
+    landmarks = 'null'
+    if result.landmark_points is not None:
+        landmarks = landmarks_template % tuple(
+            result.landmark_points.ravel().tolist()
+        )
+
+    text = (
+        '{"landmarks":%s,"attention_metrics":{"fatigue_score":%r,'
+        '"distraction_score":%r,"attention_score":%r,"time_on_screen":%r}'
+        % (
+            landmarks,
+            float(result.fatigue_score),
+            float(result.distraction_score),
+            float(result.attention_score),
+            float(result.time_on_screen),
+        )
+    )
+    if result.session_status is not None:
+        paused_at = (
+            json.dumps(result.paused_at.isoformat())
+            if result.paused_at
+            else 'null'
+        )
+        text += (
+            ',"session_status":%s,"total_paused_time":%r,"paused_at":%s'
+            % (
+                json.dumps(result.session_status),
+                float(result.total_paused_time),
+                paused_at,
+            )
+        )
+    return text + ',"frames_coalesced":%d}' % result.frames_coalesced
+
+
+class FrameResponder:
+    """
+    Serializa os resultados dos frames de uma conexão conforme as
+    MonitorOptions negociadas: codificação, regiões de landmarks e, no modo
+    delta, o estado dos keyframes do cliente.
+    """
+
+    def __init__(
+        self,
+        options: Optional[MonitorOptions] = None,
+        keyframe_interval: int = 30,
+        delta_tolerance: float = 0.5,
+    ):
+        self.options = options or MonitorOptions()
+        self.regions_index = select_regions(self.options.landmark_regions)
+        self._landmarks_template = landmarks_json_template(self.regions_index)
+        self.delta_stream = (
+            LandmarkDeltaStream(
+                keyframe_interval, delta_tolerance, self.regions_index
+            )
+            if self.options.encoding == RESPONSE_ENCODING_DELTA
+            else None
+        )
+
+    def request_resync(self):
+        if self.delta_stream is not None:
+            self.delta_stream.request_resync()
+
+    def respond(self, result: FrameResult) -> str | bytes:
+        """Texto JSON ou bytes (ver docs/monitor-protocol.md)"""
+        if self.options.encoding == RESPONSE_ENCODING_JSON:
+            return encode_frame_json(result, self._landmarks_template)
+
+        fields = (
+            result.landmark_points,
+            result.fatigue_score,
+            result.distraction_score,
+            result.attention_score,
+            result.time_on_screen,
+            result.session_status,
+            result.total_paused_time,
+            result.paused_at.timestamp() if result.paused_at else None,
+            result.frames_coalesced,
+        )
+        if self.delta_stream is not None:
+            return self.delta_stream.encode(*fields)
+        return encode_frame_response(*fields, self.regions_index.mask)
+
+    def respond_batch(
+        self, responses: list[str | bytes | dict], frames_coalesced: int = 0
+    ) -> str | bytes:
+        """
+        Agrupa as respostas dos frames de um envelope em uma única mensagem;
+        erros de frames individuais (dict) vão como JSON dentro do lote.
+        """
+        responses = [
+            json.dumps(response) if isinstance(response, dict) else response
+            for response in responses
+        ]
+        if self.options.encoding == RESPONSE_ENCODING_JSON:
+            return '{"batch":[%s],"frames_coalesced":%d}' % (
+                ','.join(responses),
+                frames_coalesced,
+            )
+        return encode_batch_response(responses, frames_coalesced)
+
+
+DEFAULT_RESPONDER = FrameResponder()
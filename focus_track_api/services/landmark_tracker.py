@@ -0,0 +1,170 @@
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from focus_track_api.services.eye_detector import (
+    EYES_LMS_NUMS,
+    LEFT_IRIS_NUM,
+    RIGHT_IRIS_NUM,
+)
+from focus_track_api.services.monitor_protocol import GRAY_IMAGE_NDIM
+from focus_track_api.utils.constants import LEFT_IRIS, RIGHT_IRIS
+
+# Janela e níveis da pirâmide do Lucas-Kanade
+LK_PARAMS = {
+    'winSize': (15, 15),
+    'maxLevel': 2,
+    'criteria': (
+        cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT,
+        20,
+        0.03,
+    ),
+}
+# Margem (px) em torno dos pontos rastreados: o fluxo é calculado apenas
+# nesse recorte, e não no frame inteiro (janela x 2^níveis cobre o
+# deslocamento máximo que a pirâmide consegue recuperar)
+ROI_MARGIN = 15 * 2**2
+
+
+def tracked_landmarks(pose_landmarks) -> np.ndarray:
+    """
+    Landmarks rastreados individualmente: olhos (EAR), íris (gaze) e os
+    pontos usados na estimativa de pose.
+    """
+    return np.unique(
+        np.concatenate([
+            np.asarray(EYES_LMS_NUMS),
+            np.asarray([LEFT_IRIS_NUM, RIGHT_IRIS_NUM]),
+            np.asarray(LEFT_IRIS),
+            np.asarray(RIGHT_IRIS),
+            np.asarray(pose_landmarks),
+        ]).astype(np.intp)
+    )
+
+
+class LandmarkTracker:
+    """
+    Propaga os landmarks do FaceMesh entre execuções completas com fluxo
+    óptico esparso (Lucas-Kanade piramidal) sobre o frame em cinza.
+
+    Os pontos de `indices` são rastreados individualmente; os demais
+    acompanham a transformação de similaridade estimada a partir deles (a
+    profundidade `z` segue a escala). O FaceMesh volta a rodar a cada
+    `interval` frames ou assim que o rastreamento perde a confiança: menos
+    de `min_tracked` dos pontos encontrados com erro forward-backward de
+    até `max_error` pixels.
+    """
+
+    def __init__(
+        self,
+        indices: np.ndarray,
+        interval: int = 1,
+        max_error: float = 1.0,
+        min_tracked: float = 0.9,
+    ):
+        self.indices = indices
+        self.interval = interval
+        self.max_error = max_error
+        self.min_tracked = min_tracked
+        self._gray = None
+        self._points: Optional[np.ndarray] = None
+        self._z: Optional[np.ndarray] = None
+        self._age = 0
+        # Contadores para medir o ganho (frames rastreados x FaceMesh)
+        self.tracked_frames = 0
+        self.drift_resets = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 1
+
+    def clear(self):
+        self._gray = None
+        self._points = None
+
+    def reset(self, image: np.ndarray, landmarks: np.ndarray):
+        """Novo ponto de partida após uma execução completa do FaceMesh"""
+        if not self.enabled:
+            return
+        size = np.array(image.shape[1::-1], dtype=np.float32)
+        self._gray = _gray(image)
+        self._points = landmarks[:, :2] * size
+        self._z = landmarks[:, 2].copy()
+        self._age = 0
+
+    def track(
+        self, image: np.ndarray, out: np.ndarray
+    ) -> Optional[np.ndarray]:
+        """
+        Landmarks normalizados do frame em `out`, ou None quando o FaceMesh
+        deve rodar (intervalo atingido, sem estado, mudança de resolução ou
+        perda de confiança).
+        """
+        if (
+            self._points is None
+            or self._age + 1 >= self.interval
+            or self._gray.shape != image.shape[:2]
+        ):
+            # A resolução processada pode mudar entre frames
+            return None
+
+        gray = _gray(image)
+        previous = self._points[self.indices]
+        roi, origin = _roi(previous, gray.shape)
+        previous_roi = self._gray[roi]
+        current_roi = gray[roi]
+        current, status, _ = cv2.calcOpticalFlowPyrLK(
+            previous_roi, current_roi, previous - origin, None, **LK_PARAMS
+        )
+        back, back_status, _ = cv2.calcOpticalFlowPyrLK(
+            current_roi, previous_roi, current, None, **LK_PARAMS
+        )
+        current += origin
+        back += origin
+        error = np.linalg.norm(back - previous, axis=1)
+        good = (status.ravel() == 1) & (back_status.ravel() == 1)
+        good &= error <= self.max_error
+
+        transform = None
+        if good.mean() >= self.min_tracked:
+            transform, _ = cv2.estimateAffinePartial2D(
+                previous[good], current[good]
+            )
+        if transform is None:
+            # Perda de confiança (oclusão, movimento brusco, piscada longa)
+            self.drift_resets += 1
+            self.clear()
+            return None
+
+        points = self._points @ transform[:, :2].T + transform[:, 2]
+        points[self.indices[good]] = current[good]
+        self._z *= np.sqrt(abs(np.linalg.det(transform[:, :2])))
+
+        self._gray = gray
+        self._points = points.astype(np.float32)
+        self._age += 1
+        self.tracked_frames += 1
+
+        size = np.array(image.shape[1::-1], dtype=np.float32)
+        out[:, :2] = self._points / size
+        out[:, 2] = self._z
+        return out
+
+
+def _gray(image: np.ndarray) -> np.ndarray:
+    # Cópia: o FrameDecoder reaproveita o buffer da imagem entre frames
+    if image.ndim == GRAY_IMAGE_NDIM:
+        return image.copy()
+    return cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+
+
+def _roi(
+    points: np.ndarray, shape: tuple[int, ...]
+) -> tuple[tuple[slice, slice], np.ndarray]:
+    """Recorte do frame em volta dos pontos e a origem do recorte em px"""
+    x0, y0 = np.maximum(points.min(axis=0) - ROI_MARGIN, 0).astype(int)
+    x1, y1 = (points.max(axis=0) + ROI_MARGIN).astype(int)
+    x1, y1 = min(x1, shape[1]), min(y1, shape[0])
+    origin = np.array((x0, y0), dtype=np.float32)
+    return (slice(y0, y1), slice(x0, x1)), origin
@@ -0,0 +1,589 @@
+import math
+import struct
+
+import numpy as np
+
+from focus_track_api.utils.constants import LANDMARK_COUNT
+from focus_track_api.utils.utils import FACE_REGIONS_INDEX, RegionsIndex
+
+# Frame bruto: cabeçalho fixo seguido dos pixels empacotados (row-major)
+RAW_FRAME_MAGIC = b'FTRW'
+RAW_FRAME_HEADER = struct.Struct('<4sHHB3x')  # magic, largura, altura, formato
+PIXEL_FORMAT_GRAY = 0
+PIXEL_FORMAT_RGB = 1
+PIXEL_FORMAT_CHANNELS = {PIXEL_FORMAT_GRAY: 1, PIXEL_FORMAT_RGB: 3}
+GRAY_IMAGE_NDIM = 2
+
+# Landmarks calculados no cliente: cabeçalho fixo seguido de N x 3 float32
+# normalizados (x, y, z do FaceMesh); N = 0 indica rosto não detectado
+LANDMARKS_MAGIC = b'FTLM'
+LANDMARKS_HEADER = struct.Struct('<4sdHH')  # magic, captura (s), larg., alt.
+
+# Envelope com vários frames: cabeçalho seguido de N entradas, cada uma com
+# instante de captura, tamanho e um frame em qualquer formato acima
+ENVELOPE_MAGIC = b'FTEV'
+ENVELOPE_HEADER = struct.Struct('<4sH2x')  # magic, quantidade de frames
+ENVELOPE_ENTRY = struct.Struct('<dI')  # captura (s, relógio do cliente), bytes
+MAX_ENVELOPE_FRAMES = 64
+
+# Codificação das respostas, negociada pelo parâmetro `encoding` da URL
+RESPONSE_ENCODING_JSON = 'json'
+RESPONSE_ENCODING_BINARY = 'binary'
+RESPONSE_ENCODING_DELTA = 'delta'
+
+# Resposta binária: cabeçalho fixo com as métricas seguido de N x 2 int16
+# (x, y em quartos de pixel) na ordem de FACE_REGIONS
+FRAME_RESPONSE_MAGIC = b'FTFR'
+FRAME_RESPONSE_VERSION = 1
+# magic, versão, status, frames_coalesced, fadiga, distração, atenção,
+# time_on_screen, total_paused_time, paused_at (epoch s), N e a máscara das
+# regiões presentes (bit i = i-ésima região de FACE_REGIONS; 0 sem pontos)
+FRAME_RESPONSE_HEADER = struct.Struct('<4sBBHfffffdHH')
+LANDMARK_SUBPIXELS = 4
+INT16_MAX = np.iinfo(np.int16).max
+SESSION_STATUS_CODES = {
+    None: 0,
+    'waiting': 1,
+    'active': 2,
+    'paused': 3,
+    'finished': 4,
+}
+SESSION_STATUS_NAMES = {
+    code: status for status, code in SESSION_STATUS_CODES.items()
+}
+
+# Resposta delta: mesmo cabeçalho da resposta binária, mas o último campo é
+# a máscara das regiões enviadas; seguem int8 (dx, dy) em quartos de pixel
+# apenas para os pontos dessas regiões. Keyframes usam o formato FTFR.
+FRAME_DELTA_MAGIC = b'FTFD'
+INT8_MAX = np.iinfo(np.int8).max
+# Mensagem de texto do cliente pedindo um keyframe
+RESYNC_MESSAGE_TYPE = 'resync'
+
+# Resposta binária de um envelope: cabeçalho seguido de N entradas, cada uma
+# com o tipo e o tamanho da resposta do frame correspondente
+FRAME_BATCH_MAGIC = b'FTBT'
+FRAME_BATCH_HEADER = struct.Struct('<4sHH')  # magic, N, frames_coalesced
+FRAME_BATCH_ENTRY = struct.Struct('<B3xI')  # tipo, bytes
+BATCH_ENTRY_BINARY = 0  # resposta FTFR/FTFD
+BATCH_ENTRY_JSON = 1  # texto JSON UTF-8 (erros do frame)
+
+
+def is_raw_frame(data: bytes) -> bool:
+    return data[: len(RAW_FRAME_MAGIC)] == RAW_FRAME_MAGIC
+
+
+def parse_raw_frame(data: bytes) -> tuple[np.ndarray, int]:
+    """
+    Interpreta um frame bruto sem copiar os pixels.
+
+    Retorna a imagem como view sobre o buffer recebido ((altura, largura) para
+    cinza ou (altura, largura, 3) para RGB, somente leitura) e o formato.
+    """
+    if len(data) < RAW_FRAME_HEADER.size:
+        raise ValueError('Frame bruto inválido: cabeçalho incompleto')
+
+    _, width, height, pixel_format = RAW_FRAME_HEADER.unpack_from(data)
+    channels = PIXEL_FORMAT_CHANNELS.get(pixel_format)
+    if channels is None:
+        raise ValueError(f'Formato de pixel desconhecido: {pixel_format}')
+
+    expected = width * height * channels
+    if len(data) - RAW_FRAME_HEADER.size != expected:
+        raise ValueError(
+            f'Frame bruto inválido: esperados {expected} bytes de pixels'
+        )
+
+    pixels = np.frombuffer(
+        data, dtype=np.uint8, count=expected, offset=RAW_FRAME_HEADER.size
+    )
+    if pixel_format == PIXEL_FORMAT_GRAY:
+        return pixels.reshape(height, width), pixel_format
+    return pixels.reshape(height, width, channels), pixel_format
+
+
+def encode_raw_frame(image: np.ndarray) -> bytes:
+    """Monta um frame bruto a partir de uma imagem cinza ou RGB (uint8)"""
+    height, width = image.shape[:2]
+    pixel_format = (
+        PIXEL_FORMAT_GRAY
+        if image.ndim == GRAY_IMAGE_NDIM
+        else PIXEL_FORMAT_RGB
+    )
+    header = RAW_FRAME_HEADER.pack(
+        RAW_FRAME_MAGIC, width, height, pixel_format
+    )
+    return header + np.ascontiguousarray(image, dtype=np.uint8).tobytes()
+
+
+def is_landmarks_message(data: bytes) -> bool:
+    return data[: len(LANDMARKS_MAGIC)] == LANDMARKS_MAGIC
+
+
+def landmarks_capture_time(data: bytes) -> float | None:
+    """Instante de captura (relógio do cliente) de uma mensagem de landmarks"""
+    if not is_landmarks_message(data) or len(data) < LANDMARKS_HEADER.size:
+        return None
+    return LANDMARKS_HEADER.unpack_from(data)[1]
+
+
+def parse_landmarks_message(
+    data: bytes,
+) -> tuple[float, tuple[int, int], np.ndarray | None]:
+    """
+    Retorna (instante de captura, (largura, altura), landmarks).
+
+    Os landmarks são uma view (478, 3) float32 somente leitura sobre o buffer
+    recebido, ou None quando o cliente não detectou rosto.
+    """
+    if len(data) < LANDMARKS_HEADER.size:
+        raise ValueError(
+            'Mensagem de landmarks inválida: cabeçalho incompleto'
+        )
+
+    _, captured_at, width, height = LANDMARKS_HEADER.unpack_from(data)
+    payload_size = len(data) - LANDMARKS_HEADER.size
+    if payload_size == 0:
+        return captured_at, (width, height), None
+
+    expected = LANDMARK_COUNT * 3 * np.dtype(np.float32).itemsize
+    if payload_size != expected:
+        raise ValueError(
+            f'Mensagem de landmarks inválida: esperados {expected} bytes'
+        )
+
+    landmarks = np.frombuffer(
+        data,
+        dtype='<f4',
+        count=LANDMARK_COUNT * 3,
+        offset=LANDMARKS_HEADER.size,
+    ).reshape(LANDMARK_COUNT, 3)
+    return captured_at, (width, height), landmarks
+
+
+def encode_landmarks_message(
+    landmarks: np.ndarray | None,
+    captured_at: float,
+    frame_size: tuple[int, int],
+) -> bytes:
+    """Monta uma mensagem de landmarks (None = rosto não detectado)"""
+    header = LANDMARKS_HEADER.pack(LANDMARKS_MAGIC, captured_at, *frame_size)
+    if landmarks is None:
+        return header
+    return header + np.ascontiguousarray(landmarks, dtype='<f4').tobytes()
+
+
+def is_envelope(data: bytes) -> bool:
+    return data[: len(ENVELOPE_MAGIC)] == ENVELOPE_MAGIC
+
+
+def parse_envelope(data: bytes) -> list[tuple[float, bytes]]:
+    """Retorna os (instante de captura, frame) do envelope, em ordem"""
+    if len(data) < ENVELOPE_HEADER.size:
+        raise ValueError('Envelope inválido: cabeçalho incompleto')
+
+    _, count = ENVELOPE_HEADER.unpack_from(data)
+    if not 0 < count <= MAX_ENVELOPE_FRAMES:
+        raise ValueError(
+            f'Envelope inválido: de 1 a {MAX_ENVELOPE_FRAMES} frames'
+        )
+
+    frames = []
+    offset = ENVELOPE_HEADER.size
+    for _ in range(count):
+        if offset + ENVELOPE_ENTRY.size > len(data):
+            raise ValueError('Envelope inválido: entrada incompleta')
+        captured_at, size = ENVELOPE_ENTRY.unpack_from(data, offset)
+        offset += ENVELOPE_ENTRY.size
+        if offset + size > len(data):
+            raise ValueError('Envelope inválido: frame incompleto')
+        frames.append((captured_at, data[offset : offset + size]))
+        offset += size
+
+    if offset != len(data):
+        raise ValueError('Envelope inválido: bytes excedentes')
+    return frames
+
+
+def encode_envelope(frames: list[tuple[float, bytes]]) -> bytes:
+    """Monta um envelope a partir de (instante de captura, frame)"""
+    parts = [ENVELOPE_HEADER.pack(ENVELOPE_MAGIC, len(frames))]
+    for captured_at, frame in frames:
+        parts.extend((ENVELOPE_ENTRY.pack(captured_at, len(frame)), frame))
+    return b''.join(parts)
+
+
+def split_frames(data: bytes) -> list[tuple[float | None, bytes]]:
+    """
+    Frames de uma mensagem do cliente com seus instantes de captura.
+
+    Envelopes resultam em todas as suas entradas (o instante da entrada
+    prevalece sobre o de mensagens de landmarks internas); as demais
+    mensagens resultam em um único frame, com o instante de captura das
+    mensagens de landmarks ou None (usa-se o instante de recepção).
+    """
+    if is_envelope(data):
+        return parse_envelope(data)
+    return [(landmarks_capture_time(data), data)]
+
+
+def encode_batch_response(
+    responses: list[bytes | str], frames_coalesced: int = 0
+) -> bytes:
+    """Agrupa as respostas dos frames de um envelope em uma mensagem"""
+    parts = [
+        FRAME_BATCH_HEADER.pack(
+            FRAME_BATCH_MAGIC, len(responses), min(frames_coalesced, 0xFFFF)
+        )
+    ]
+    for response in responses:
+        kind, body = BATCH_ENTRY_BINARY, response
+        if isinstance(response, str):
+            kind, body = BATCH_ENTRY_JSON, response.encode()
+        parts.extend((FRAME_BATCH_ENTRY.pack(kind, len(body)), body))
+    return b''.join(parts)
+
+
+def decode_batch_response(data: bytes) -> tuple[list[bytes | str], int]:
+    """Inverso de `encode_batch_response`: (respostas, frames_coalesced)"""
+    magic, count, frames_coalesced = FRAME_BATCH_HEADER.unpack_from(data)
+    if magic != FRAME_BATCH_MAGIC:
+        raise ValueError('Resposta em lote inválida')
+
+    responses = []
+    offset = FRAME_BATCH_HEADER.size
+    for _ in range(count):
+        kind, size = FRAME_BATCH_ENTRY.unpack_from(data, offset)
+        offset += FRAME_BATCH_ENTRY.size
+        response = data[offset : offset + size]
+        offset += size
+        responses.append(
+            response.decode() if kind == BATCH_ENTRY_JSON else response
+        )
+    return responses, frames_coalesced
+
+
+def quantise_points(points: np.ndarray | None) -> np.ndarray:
+    """Pontos (N, 2) em pixels -> int16 em quartos de pixel (None = vazio)"""
+    if points is None:
+        return np.empty((0, 2), dtype='<i2')
+    quantised = np.rint(
+        np.asarray(points, dtype=np.float32) * LANDMARK_SUBPIXELS
+    )
+    np.clip(quantised, -INT16_MAX, INT16_MAX, out=quantised)
+    return quantised.astype('<i2')
+
+
+def _frame_header(
+    magic: bytes,
+    points_field: int,
+    fatigue_score: float,
+    distraction_score: float,
+    attention_score: float,
+    time_on_screen: float,
+    session_status: str | None,
+    total_paused_time: float,
+    paused_at: float | None,
+    frames_coalesced: int,
+    regions_mask: int = 0,
+) -> bytes:
+    return FRAME_RESPONSE_HEADER.pack(
+        magic,
+        FRAME_RESPONSE_VERSION,
+        SESSION_STATUS_CODES.get(session_status, 0),
+        min(frames_coalesced, 0xFFFF),
+        fatigue_score,
+        distraction_score,
+        attention_score,
+        time_on_screen,
+        total_paused_time,
+        math.nan if paused_at is None else paused_at,
+        points_field,
+        regions_mask,
+    )
+
+
+def encode_frame_response(
+    landmark_points: np.ndarray,
+    fatigue_score: float,
+    distraction_score: float,
+    attention_score: float,
+    time_on_screen: float,
+    session_status: str | None = None,
+    total_paused_time: float = 0.0,
+    paused_at: float | None = None,
+    frames_coalesced: int = 0,
+    regions_mask: int = FACE_REGIONS_INDEX.mask,
+) -> bytes:
+    """
+    Monta a resposta binária de um frame processado.
+
+    `landmark_points` são as coordenadas (N, 2) em pixels das regiões
+    enviadas, concatenadas na ordem de FACE_REGIONS (None = frame sem
+    landmarks); são quantizadas em int16 com precisão de 1/4 de pixel.
+    `regions_mask` identifica essas regiões (RegionsIndex.mask) para que o
+    cliente decodifique qualquer seleção. `paused_at` é um epoch em
+    segundos.
+    """
+    quantised = quantise_points(landmark_points)
+    if landmark_points is None:
+        regions_mask = 0
+    header = _frame_header(
+        FRAME_RESPONSE_MAGIC,
+        len(quantised),
+        fatigue_score,
+        distraction_score,
+        attention_score,
+        time_on_screen,
+        session_status,
+        total_paused_time,
+        paused_at,
+        frames_coalesced,
+        regions_mask,
+    )
+    return header + quantised.tobytes()
+
+
+def _decode_header(data: bytes) -> tuple[bytes, int, dict]:
+    (
+        magic,
+        version,
+        status,
+        frames_coalesced,
+        fatigue_score,
+        distraction_score,
+        attention_score,
+        time_on_screen,
+        total_paused_time,
+        paused_at,
+        points_field,
+        regions_mask,
+    ) = FRAME_RESPONSE_HEADER.unpack_from(data)
+    if version != FRAME_RESPONSE_VERSION:
+        raise ValueError('Resposta binária inválida')
+
+    return (
+        magic,
+        points_field,
+        {
+            'fatigue_score': fatigue_score,
+            'distraction_score': distraction_score,
+            'attention_score': attention_score,
+            'time_on_screen': time_on_screen,
+            'session_status': SESSION_STATUS_NAMES.get(status),
+            'total_paused_time': total_paused_time,
+            'paused_at': None if math.isnan(paused_at) else paused_at,
+            'frames_coalesced': frames_coalesced,
+            'regions_mask': regions_mask,
+        },
+    )
+
+
+def decode_frame_response(data: bytes) -> dict:
+    """Inverso de `encode_frame_response` (referência para os clientes)"""
+    magic, count, response = _decode_header(data)
+    if magic != FRAME_RESPONSE_MAGIC:
+        raise ValueError('Resposta binária inválida')
+
+    points = np.frombuffer(
+        data, dtype='<i2', count=count * 2, offset=FRAME_RESPONSE_HEADER.size
+    ).reshape(count, 2)
+    response['landmark_points'] = (
+        points.astype(np.float32) / LANDMARK_SUBPIXELS
+    )
+    return response
+
+
+class LandmarkDeltaStream:
+    """
+    Codificador das respostas do modo delta de uma conexão.
+
+    Mantém o estado quantizado que o cliente reconstruiu e envia, a cada
+    frame, apenas as regiões que se moveram além de `tolerance` pixels, como
+    deltas int8 em relação a esse estado (sem acúmulo de erro). Um keyframe
+    completo (FTFR) é enviado no primeiro frame, a cada `keyframe_interval`
+    frames, quando algum delta não cabe em int8 e quando o cliente pede
+    resincronização.
+    """
+
+    def __init__(
+        self,
+        keyframe_interval: int = 30,
+        tolerance: float = 0.5,
+        regions_index: RegionsIndex = FACE_REGIONS_INDEX,
+    ):
+        self.keyframe_interval = keyframe_interval
+        self.tolerance = round(tolerance * LANDMARK_SUBPIXELS)
+        bounds = list(regions_index.slices.values())
+        self._region_starts = np.array([start for start, _ in bounds])
+        self._region_sizes = np.array([stop - start for start, stop in bounds])
+        self._regions_mask = regions_index.mask
+        self._state: np.ndarray | None = None
+        self._since_keyframe = 0
+        self._resync = True
+
+    def request_resync(self):
+        """O próximo frame será enviado como keyframe"""
+        self._resync = True
+
+    def encode(
+        self,
+        landmark_points: np.ndarray,
+        fatigue_score: float,
+        distraction_score: float,
+        attention_score: float,
+        time_on_screen: float,
+        session_status: str | None = None,
+        total_paused_time: float = 0.0,
+        paused_at: float | None = None,
+        frames_coalesced: int = 0,
+    ) -> bytes:
+        metrics = (
+            fatigue_score,
+            distraction_score,
+            attention_score,
+            time_on_screen,
+            session_status,
+            total_paused_time,
+            paused_at,
+            frames_coalesced,
+        )
+        if landmark_points is None:
+            # Frame sem landmarks: o cliente mantém os pontos anteriores
+            if self._state is None:
+                return encode_frame_response(None, *metrics, 0)
+            return _frame_header(FRAME_DELTA_MAGIC, 0, *metrics)
+
+        quantised = quantise_points(landmark_points)
+        deltas = None
+        if not self._needs_keyframe(quantised):
+            deltas = quantised.astype(np.int32) - self._state
+            region_moved = np.maximum.reduceat(
+                np.abs(deltas).max(axis=1), self._region_starts
+            )
+            if region_moved.max(initial=0) > INT8_MAX:
+                deltas = None
+
+        if deltas is None:
+            self._state = quantised.astype(np.int32)
+            self._since_keyframe = 0
+            self._resync = False
+            return (
+                _frame_header(
+                    FRAME_RESPONSE_MAGIC,
+                    len(quantised),
+                    *metrics,
+                    self._regions_mask,
+                )
+                + quantised.tobytes()
+            )
+
+        self._since_keyframe += 1
+        sent_regions = region_moved > self.tolerance
+        rows = np.repeat(sent_regions, self._region_sizes)
+        sent = deltas[rows]
+        self._state[rows] += sent
+
+        mask = int(np.dot(sent_regions, 1 << np.arange(len(sent_regions))))
+        header = _frame_header(FRAME_DELTA_MAGIC, mask, *metrics)
+        return header + sent.astype(np.int8).tobytes()
+
+    def _needs_keyframe(self, quantised: np.ndarray) -> bool:
+        return (
+            self._resync
+            or self._state is None
+            or len(self._state) != len(quantised)
+            or self._since_keyframe + 1 >= self.keyframe_interval
+        )
+
+
+def apply_frame_delta(
+    data: bytes,
+    points: np.ndarray | None,
+    regions_index: RegionsIndex = FACE_REGIONS_INDEX,
+) -> dict:
+    """
+    Decodifica uma resposta do modo delta (keyframe ou delta) a partir dos
+    pontos reconstruídos anteriormente (referência para os clientes).
+    """
+    if data[: len(FRAME_RESPONSE_MAGIC)] == FRAME_RESPONSE_MAGIC:
+        return decode_frame_response(data)
+
+    magic, mask, response = _decode_header(data)
+    if magic != FRAME_DELTA_MAGIC or points is None:
+        raise ValueError('Resposta delta inválida')
+
+    points = points.copy()
+    offset = FRAME_RESPONSE_HEADER.size
+    for bit, (start, stop) in enumerate(regions_index.slices.values()):
+        if not mask & (1 << bit):
+            continue
+        count = (stop - start) * 2
+        deltas = np.frombuffer(data, dtype=np.int8, count=count, offset=offset)
+        points[start:stop] += deltas.reshape(-1, 2) / LANDMARK_SUBPIXELS
+        offset += count
+
+    response['landmark_points'] = points
+    return response
+
+
+# Quanto (s) o instante de captura convertido pode passar do instante de
+# recepção: cobre um envelope de MAX_ENVELOPE_FRAMES a taxas baixas, cujos
+# frames seguintes ao primeiro caem depois da recepção
+CLIENT_CLOCK_TOLERANCE = 10.0
+
+
+class ClientClock:
+    """
+    Converte instantes de captura do cliente para o relógio do servidor.
+
+    O deslocamento é fixado na primeira amostra, de modo que os intervalos
+    entre capturas (usados pelo AttentionScorer) são os do cliente, sem o
+    jitter da rede.
+    """
+
+    def __init__(self):
+        self._offset: float | None = None
+
+    def to_server_time(self, captured_at: float, received_at: float) -> float:
+        if self._offset is None:
+            self._offset = received_at - captured_at
+        return captured_at + self._offset
+
+
+class FrameTimer:
+    """
+    Instante (relógio do servidor) e FPS de cada frame pontuado.
+
+    Frames com instante de captura usam o relógio do cliente (ClientClock);
+    os demais, o instante de recepção da mensagem. O instante nunca volta:
+    um frame anterior ao último (jitter da captura, ou frames com e sem
+    instante de captura na mesma conexão) recebe o instante do último,
+    mantendo a sequência não decrescente esperada pelo AttentionScorer.
+    Também nunca passa de `CLIENT_CLOCK_TOLERANCE` além do instante de
+    recepção, para que um relógio de cliente adiantado (ou um instante
+    inválido) não empurre o scorer, o PERCLOS e a linha do tempo para um
+    futuro arbitrário.
+    """
+
+    def __init__(self, t_start: float):
+        self.client_clock = ClientClock()
+        self._prev_time = t_start
+        self.fps = 0.0
+
+    def tick(
+        self, received_at: float, captured_at: float | None = None
+    ) -> tuple[float, float]:
+        """Retorna (t_now, fps) do próximo frame"""
+        t_now = received_at
+        if captured_at is not None:
+            t_now = self.client_clock.to_server_time(captured_at, received_at)
+            # Limite primeiro: min descarta NaN e infinitos
+            t_now = min(received_at + CLIENT_CLOCK_TOLERANCE, t_now)
+        t_now = max(t_now, self._prev_time)
+
+        elapsed_time = t_now - self._prev_time
+        self._prev_time = t_now
+        if elapsed_time > 0:
+            self.fps = round(1 / elapsed_time, 3)
+        return t_now, self.fps
@@ -3,17 +3,50 @@ import numpy as np
 
 from focus_track_api.services.face_geometry import (
     FaceGeometry,
-    get_metric_landmarks,
-    procrustes_landmark_basis,
+    MetricLandmarkContext,
+    metric_landmark_ids,
 )
 from focus_track_api.utils.utils import rot_mat_to_euler
 
+# solvePnP flags of the available solvers; 'procrustes' skips solvePnP and
+# takes the pose from the transform solved for the metric landmarks
+PROCRUSTES_SOLVER = 'procrustes'
+POSE_SOLVERS = {
+    'iterative': cv2.SOLVEPNP_ITERATIVE,
+    'sqpnp': cv2.SOLVEPNP_SQPNP,
+    PROCRUSTES_SOLVER: None,
+}
+# MediaPipe metric space (y up, z towards the viewer) -> OpenCV camera space
+METRIC_TO_CAMERA = np.diag([1.0, -1.0, -1.0])
+# (x, y, z) -> (z, x, y) permutation that get_pose applies to the rotation
+# vector before the Euler conversion, as a rotation matrix
+RVEC_PERMUTATION = np.array([
+    [0.0, 0.0, 1.0],
+    [1.0, 0.0, 0.0],
+    [0.0, 1.0, 0.0],
+])
+
 
 class HeadPoseEstimator:
-    def __init__(self):
+    def __init__(
+        self, headless=False, solver='iterative', warm_start=False, refine=True
+    ):
         """
         Class for estimating the head pose using the image/frame, face mesh landmarks, and camera parameters.
 
+        Parameters
+        ----------
+        headless : bool
+            Production mode: the nose axes are never projected nor drawn, even with show_axis set.
+        solver : str
+            Key of POSE_SOLVERS used when there is no previous pose ('iterative' or 'sqpnp'), or 'procrustes' to
+            take the pose from the Procrustes transform of the metric landmarks without any solvePnP.
+        warm_start : bool
+            Starts the iterative solver from the previous frame rvec/tvec (useExtrinsicGuess), falling back
+            to a cold solve when it fails. The previous pose is dropped by reset().
+        refine : bool
+            Refines every solution with solvePnPRefineVVS.
+
         Attributes
         ----------
         show_axis : bool
@@ -44,12 +77,25 @@ class HeadPoseEstimator:
             Get the camera parameters for pose estimation.
         """
 
+        if solver not in POSE_SOLVERS:
+            raise ValueError(f'Unknown pose solver: {solver}')
+
         self.show_axis = False
+        self.headless = headless
+        self.solver = solver
+        self.warm_start = warm_start
+        self.refine = refine
+        self._rvec = None
+        self._tvec = None
         self.camera_matrix = None
         self.dist_coeffs = None
         self.focal_length = None
 
         self.pcf_calculated = False
+        # frame size the camera parameters were computed for; the default
+        # camera matrix is derived from it and rebuilt when it changes
+        self.frame_size = None
+        self._default_camera_matrix = False
 
         self.model_lms_ids = self._get_model_lms_ids()
 
@@ -60,12 +106,8 @@ class HeadPoseEstimator:
     @staticmethod
     def _get_model_lms_ids():
         JAW_LMS_NUMS = [61, 291, 199]
-        model_lms_ids = JAW_LMS_NUMS + [
-            key for key, _ in procrustes_landmark_basis
-        ]
-        model_lms_ids.sort()
-
-        return model_lms_ids
+        # Procrustes basis first, in the column order of MetricLandmarkContext
+        return metric_landmark_ids(JAW_LMS_NUMS)
 
     def get_pose(self, frame, landmarks, frame_size):
         """
@@ -89,44 +131,36 @@ class HeadPoseEstimator:
         tvec = None
         model_img_lms = None
         eulers = None
-        metric_lms = None
 
-        if not self.pcf_calculated:
+        frame_size = tuple(frame_size)
+        if not self.pcf_calculated or frame_size != self.frame_size:
             self._get_camera_parameters(frame_size)
 
+        if self.solver == PROCRUSTES_SOLVER:
+            return self._procrustes_pose(frame, landmarks, frame_size)
+
         model_img_lms = (
             np.clip(landmarks[self.model_lms_ids, :2], 0.0, 1.0) * frame_size
         )
 
-        metric_lms = get_metric_landmarks(landmarks.T.copy(), self.pcf)[0].T
+        model_metric_lms, _ = self.metric_context.metric_landmarks(landmarks)
 
-        model_metric_lms = metric_lms[self.model_lms_ids, :]
-
-        (solve_pnp_success, rvec, tvec) = cv2.solvePnP(
-            model_metric_lms,
-            model_img_lms,
-            self.camera_matrix,
-            self.dist_coeffs,
-            flags=cv2.SOLVEPNP_ITERATIVE,
+        (solve_pnp_success, rvec, tvec) = self._solve_pnp(
+            model_metric_lms, model_img_lms
         )
-        """
-        The OpenCV Solve PnP method computes the rotation and translation vectors with respect to the camera coordinate
-        system of the image_points referred to the 3d head model_points. It takes into account the camera matrix and
-        the distortion coefficients.
-        The method used is iterative (cv2.SOLVEPNP_ITERATIVE)
-        An alternative method can be the cv2.SOLVEPNP_SQPNP
-        """
-        tvec = tvec.round(2)
 
         if solve_pnp_success:
-            rvec, tvec = cv2.solvePnPRefineVVS(
-                model_metric_lms,
-                model_img_lms,
-                self.camera_matrix,
-                self.dist_coeffs,
-                rvec,
-                tvec,
-            )
+            if self.refine:
+                rvec, tvec = cv2.solvePnPRefineVVS(
+                    model_metric_lms,
+                    model_img_lms,
+                    self.camera_matrix,
+                    self.dist_coeffs,
+                    rvec,
+                    tvec,
+                )
+            if self.warm_start:
+                self._rvec, self._tvec = rvec, tvec
 
             rvec1 = np.array([rvec[2, 0], rvec[0, 0], rvec[1, 0]]).reshape((
                 3,
@@ -149,13 +183,83 @@ class HeadPoseEstimator:
             euler_angles = -cv2.decomposeProjectionMatrix(P)[6] -> extracting euler angles for yaw pitch and roll from the projection matrix
             """
 
-            self._draw_nose_axes(frame, rvec, tvec, model_img_lms)
+            if self.show_axis and not self.headless:
+                self._draw_nose_axes(frame, rvec, tvec, model_img_lms)
 
             return frame, eulers[0], eulers[1], eulers[2]
 
         else:
+            self.reset()
             return None, None, None, None
 
+    def _procrustes_pose(self, frame, landmarks, frame_size):
+        """
+        Head pose from the weighted orthogonal Procrustes transform (canonical face model -> metric space) that
+        MetricLandmarkContext already solves, with no second solve.
+
+        The rotation is brought to the OpenCV camera space and goes through the same rotation vector permutation
+        and rot_mat_to_euler conversion as the solvePnP path, so both modes report the same angles.
+        """
+        _, pose_transform_mat = self.metric_context.pose_transform(landmarks)
+        scale = np.linalg.norm(pose_transform_mat[:3, 0])
+        rmat = METRIC_TO_CAMERA @ (pose_transform_mat[:3, :3] / scale)
+
+        eulers = rot_mat_to_euler(
+            RVEC_PERMUTATION @ rmat @ RVEC_PERMUTATION.T
+        ).reshape((-1, 1))
+
+        if self.show_axis and not self.headless:
+            rvec, _ = cv2.Rodrigues(rmat)
+            tvec = (METRIC_TO_CAMERA @ pose_transform_mat[:3, 3]).reshape((
+                3,
+                1,
+            ))
+            model_img_lms = (
+                np.clip(landmarks[self.model_lms_ids, :2], 0.0, 1.0)
+                * frame_size
+            )
+            self._draw_nose_axes(frame, rvec, tvec, model_img_lms)
+
+        return frame, eulers[0], eulers[1], eulers[2]
+
+    def reset(self):
+        """Drops the previous pose, e.g. when the face is lost"""
+        self._rvec = None
+        self._tvec = None
+
+    def _solve_pnp(self, model_metric_lms, model_img_lms):
+        """
+        The OpenCV Solve PnP method computes the rotation and translation vectors with respect to the camera coordinate
+        system of the image_points referred to the 3d head model_points. It takes into account the camera matrix and
+        the distortion coefficients.
+        With warm_start the iterative method (cv2.SOLVEPNP_ITERATIVE) starts from the previous pose, which converges in
+        a few iterations for consecutive frames; otherwise the configured solver runs from scratch (cv2.SOLVEPNP_SQPNP
+        is a cheaper global solver than the iterative one). Both paths round tvec the same way, so the pose does not
+        depend on which one ran.
+        """
+        if self._rvec is not None:
+            (success, rvec, tvec) = cv2.solvePnP(
+                model_metric_lms,
+                model_img_lms,
+                self.camera_matrix,
+                self.dist_coeffs,
+                self._rvec.copy(),
+                self._tvec.copy(),
+                useExtrinsicGuess=True,
+                flags=cv2.SOLVEPNP_ITERATIVE,
+            )
+            if success:
+                return success, rvec, tvec.round(2)
+
+        (success, rvec, tvec) = cv2.solvePnP(
+            model_metric_lms,
+            model_img_lms,
+            self.camera_matrix,
+            self.dist_coeffs,
+            flags=POSE_SOLVERS[self.solver],
+        )
+        return success, rvec, tvec.round(2)
+
     def _draw_nose_axes(self, frame, rvec, tvec, model_img_lms):
         (nose_axes_point2D, _) = cv2.projectPoints(
             self.NOSE_AXES_POINTS,
@@ -177,7 +281,7 @@ class HeadPoseEstimator:
     def _get_camera_parameters(self, frame_size):
         fr_w = frame_size[0]
         fr_h = frame_size[1]
-        if self.camera_matrix is None:
+        if self.camera_matrix is None or self._default_camera_matrix:
             fr_center = (fr_w // 2, fr_h // 2)
             focal_length = fr_w
             self.camera_matrix = np.array(
@@ -189,6 +293,7 @@ class HeadPoseEstimator:
                 dtype='double',
             )
             self.focal_length = focal_length
+            self._default_camera_matrix = True
         else:
             self.focal_length = self.camera_matrix[0, 0]
         if self.dist_coeffs is None:
@@ -197,5 +302,11 @@ class HeadPoseEstimator:
         self.pcf = FaceGeometry(
             frame_height=fr_h, frame_width=fr_w, fy=self.focal_length
         )
+        self.metric_context = MetricLandmarkContext(
+            self.pcf, self.model_lms_ids
+        )
 
+        self.frame_size = frame_size
         self.pcf_calculated = True
+        # the previous pose belongs to the old camera
+        self.reset()
@@ -0,0 +1,161 @@
+from collections import Counter
+from math import ceil
+
+from focus_track_api.services.critical_events import CriticalEventBuffer
+from focus_track_api.services.session_timeline import SessionTimeline
+
+# Faixa dos scores da sessão (0 a 100) e largura dos bins do histograma
+SCORE_RANGE = (0.0, 100.0)
+SCORE_BIN_WIDTH = 0.1
+# Quantis do attention_score expostos no resumo da sessão
+ATTENTION_QUANTILES = {
+    'attention_p50': 0.5,
+    'attention_p90': 0.9,
+    'attention_p99': 0.99,
+}
+
+
+class RunningStats:
+    """
+    Contagem, soma, mínimo e máximo de um score, sem guardar a série.
+
+    A soma é compensada (Neumaier), como a do sum() do Python, para que a
+    média de sessões longas não acumule erro de arredondamento.
+    """
+
+    __slots__ = ('_compensation', 'count', 'maximum', 'minimum', 'total')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self._compensation = 0.0
+        self.minimum = float('inf')
+        self.maximum = float('-inf')
+
+    def add(self, value):
+        self.count += 1
+        total = self.total + value
+        if abs(self.total) >= abs(value):
+            self._compensation += (self.total - total) + value
+        else:
+            self._compensation += (value - total) + self.total
+        self.total = total
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+
+    @property
+    def mean(self):
+        if not self.count:
+            return 0.0
+        return (self.total + self._compensation) / self.count
+
+
+class ScoreHistogram:
+    """
+    Sketch de quantis de tamanho fixo para scores de 0 a 100.
+
+    Cada score incrementa o bin de largura SCORE_BIN_WIDTH que o contém;
+    o quantil é o centro do bin onde a contagem acumulada atinge o posto
+    pedido (limitado ao mínimo/máximo observados), com erro de no máximo
+    meio bin. Valores fora da faixa caem nos bins das pontas.
+    """
+
+    __slots__ = ('bins', 'low', 'stats', 'width')
+
+    def __init__(self, score_range=SCORE_RANGE, width=SCORE_BIN_WIDTH):
+        self.low, high = score_range
+        self.width = width
+        self.bins = [0] * round((high - self.low) / width)
+        self.stats = RunningStats()
+
+    def add(self, value):
+        index = int((value - self.low) / self.width)
+        self.bins[min(max(index, 0), len(self.bins) - 1)] += 1
+        self.stats.add(value)
+
+    def quantile(self, q):
+        if not self.stats.count:
+            return 0.0
+        rank = max(ceil(q * self.stats.count), 1)
+        cumulative = 0
+        for index, count in enumerate(self.bins):
+            cumulative += count
+            if cumulative >= rank:
+                break
+        center = self.low + (index + 0.5) * self.width
+        return min(max(center, self.stats.minimum), self.stats.maximum)
+
+
+class SessionMetrics:
+    """
+    Métricas acumuladas de uma sessão de monitoramento.
+
+    Os scores de cada frame não são guardados: média, máximo e contagens
+    são acumulados a cada update e os quantis do attention_score vêm de
+    um histograma de tamanho fixo, de modo que a memória não cresce com a
+    duração da sessão. Com o instante do frame, os scores também entram
+    na linha do tempo da sessão (médias por bucket de tempo). Os eventos
+    críticos ficam em memória e são gravados em lote no banco.
+    """
+
+    def __init__(self):
+        self.attention = ScoreHistogram()
+        self.fatigue = RunningStats()
+        self.distraction = RunningStats()
+        self.timeline = SessionTimeline()
+        self.critical_events = CriticalEventBuffer()
+        self.distraction_threshold = 60
+
+        self.frames_total = 0
+        self.frames_distracted = 0
+        self.max_fatigue = 0
+        self.max_distraction = 0
+
+        # Frames por resolução (largura, altura) processada pelo pipeline
+        self.processing_sizes = Counter()
+
+    def update(self, fatigue, distraction, attention, t_now=None):
+        if t_now is not None:
+            self.timeline.add(t_now, attention, fatigue, distraction)
+        self.attention.add(attention)
+        self.fatigue.add(fatigue)
+        self.distraction.add(distraction)
+
+        self.max_fatigue = max(self.max_fatigue, fatigue)
+        self.max_distraction = max(self.max_distraction, distraction)
+
+        self.frames_total += 1
+        if distraction > self.distraction_threshold:
+            self.frames_distracted += 1
+
+    def record_processing_size(self, size):
+        if size is not None:
+            self.processing_sizes[size] += 1
+
+    def processing_resolutions(self):
+        """Frames por resolução processada, da mais usada à menos usada"""
+        return {
+            f'{width}x{height}': frames
+            for (width, height), frames in self.processing_sizes.most_common()
+        }
+
+    def summary(self):
+        distraction_rate = (
+            (self.frames_distracted / self.frames_total) * 100
+            if self.frames_total > 0
+            else 0.0
+        )
+
+        return {
+            'average_attention_score': self.attention.stats.mean,
+            'average_fatigue': self.fatigue.mean,
+            'average_distraction': self.distraction.mean,
+            'distraction_rate': distraction_rate,
+            'max_fatigue': self.max_fatigue,
+            'max_distraction': self.max_distraction,
+            **{
+                key: self.attention.quantile(q)
+                for key, q in ATTENTION_QUANTILES.items()
+            },
+            'processing_resolutions': self.processing_resolutions(),
+        }
@@ -0,0 +1,162 @@
+import struct
+from typing import Optional
+
+import numpy as np
+
+# Largura (s) de cada bucket da linha do tempo da sessão
+TIMELINE_BUCKET_SECONDS = 1.0
+# Capacidade inicial: 1 hora de buckets de 1 s (dobra se a sessão passar)
+TIMELINE_CAPACITY = 3600
+# Limite de buckets: 24 horas de buckets de 1 s; frames além dele (relógio
+# do cliente muito adiantado) são descartados da linha do tempo
+TIMELINE_MAX_BUCKETS = 24 * 3600
+# Colunas da linha do tempo, na ordem do blob
+TIMELINE_COLUMNS = ('attention', 'fatigue', 'distraction')
+
+# Blob: magic, largura do bucket (float32) e número de buckets (uint32),
+# seguidos de uma coluna float16 por score (NaN = bucket sem frames)
+TIMELINE_MAGIC = b'FTL1'
+TIMELINE_HEADER = struct.Struct('<4sfI')
+TIMELINE_DTYPE = np.dtype('<f2')
+# Mínimo de pontos do LTTB (primeiro, último e um intermediário)
+LTTB_MIN_POINTS = 3
+
+
+class SessionTimeline:
+    """
+    Médias dos scores da sessão em buckets de tempo fixos.
+
+    Cada frame soma seus scores no bucket do seu instante (relativo ao
+    primeiro frame), em arrays pré-alocados; nenhuma série por frame é
+    guardada. Os arrays crescem até `max_buckets`: frames depois disso são
+    descartados, para que um instante muito adiantado enviado pelo cliente
+    não aloque memória sem limite. Na finalização, `to_bytes` gera o blob
+    colunar persistido na sessão, lido de volta por `timeline_from_bytes`.
+    """
+
+    def __init__(
+        self,
+        bucket_seconds: float = TIMELINE_BUCKET_SECONDS,
+        capacity: int = TIMELINE_CAPACITY,
+        max_buckets: int = TIMELINE_MAX_BUCKETS,
+    ):
+        self.bucket_seconds = bucket_seconds
+        self.max_buckets = max_buckets
+        self.t_start: Optional[float] = None
+        self.size = 0
+        capacity = min(capacity, max_buckets)
+        self._sums = np.zeros((capacity, len(TIMELINE_COLUMNS)))
+        self._counts = np.zeros(capacity, dtype=np.uint32)
+
+    def add(self, t_now: float, attention, fatigue, distraction):
+        if self.t_start is None:
+            self.t_start = t_now
+        offset = (t_now - self.t_start) / self.bucket_seconds
+        # Também descarta instantes NaN ou infinitos
+        if not offset < self.max_buckets:
+            return
+        index = int(max(offset, 0.0))
+        if index >= len(self._counts):
+            self._grow(index + 1)
+
+        sums = self._sums[index]
+        sums[0] += attention
+        sums[1] += fatigue
+        sums[2] += distraction
+        self._counts[index] += 1
+        self.size = max(self.size, index + 1)
+
+    def _grow(self, minimum: int):
+        capacity = min(max(2 * len(self._counts), minimum), self.max_buckets)
+        sums = np.zeros((capacity, len(TIMELINE_COLUMNS)))
+        sums[: self.size] = self._sums[: self.size]
+        counts = np.zeros(capacity, dtype=np.uint32)
+        counts[: self.size] = self._counts[: self.size]
+        self._sums, self._counts = sums, counts
+
+    def means(self) -> np.ndarray:
+        """Médias (buckets, colunas); NaN nos buckets sem frames"""
+        counts = self._counts[: self.size, None]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(
+                counts > 0, self._sums[: self.size] / counts, np.nan
+            )
+
+    def to_bytes(self) -> bytes:
+        header = TIMELINE_HEADER.pack(
+            TIMELINE_MAGIC, self.bucket_seconds, self.size
+        )
+        columns = np.ascontiguousarray(self.means().T, dtype=TIMELINE_DTYPE)
+        return header + columns.tobytes()
+
+
+def timeline_from_bytes(blob: bytes) -> tuple[float, np.ndarray]:
+    """Lê o blob de `SessionTimeline.to_bytes`: (largura, médias)"""
+    magic, bucket_seconds, size = TIMELINE_HEADER.unpack_from(blob)
+    if magic != TIMELINE_MAGIC:
+        raise ValueError('Linha do tempo em formato desconhecido')
+    columns = np.frombuffer(
+        blob,
+        dtype=TIMELINE_DTYPE,
+        count=size * len(TIMELINE_COLUMNS),
+        offset=TIMELINE_HEADER.size,
+    )
+    means = columns.reshape(len(TIMELINE_COLUMNS), size).T
+    return bucket_seconds, means.astype(np.float64)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Índices dos pontos escolhidos pelo Largest-Triangle-Three-Buckets.
+
+    Mantém o primeiro e o último ponto e, em cada um dos `threshold - 2`
+    grupos intermediários, o ponto que forma o maior triângulo com o ponto
+    escolhido no grupo anterior e a média do grupo seguinte, preservando
+    picos e vales da série.
+    """
+    n = len(x)
+    if threshold >= n or threshold < LTTB_MIN_POINTS:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    indices = np.empty(threshold, dtype=int)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    selected = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        area = np.abs(
+            (x[selected] - avg_x) * (y[start:end] - y[selected])
+            - (x[selected] - x[start:end]) * (avg_y - y[selected])
+        )
+        selected = start + int(np.argmax(area))
+        indices[i + 1] = selected
+
+    return indices
+
+
+def timeline_points(
+    blob: bytes, max_points: Optional[int] = None
+) -> tuple[float, np.ndarray, np.ndarray]:
+    """
+    Pontos da linha do tempo persistida: (largura, instantes em s, médias).
+
+    Buckets sem frames são omitidos. Com `max_points`, a série é reduzida
+    por LTTB sobre o attention_score e as demais colunas seguem os mesmos
+    buckets.
+    """
+    bucket_seconds, means = timeline_from_bytes(blob)
+    filled = np.flatnonzero(~np.isnan(means[:, 0]))
+    times = filled * bucket_seconds
+    means = means[filled]
+
+    if max_points is not None:
+        keep = lttb_indices(times, means[:, 0], max_points)
+        times, means = times[keep], means[keep]
+
+    return bucket_seconds, times, means
@@ -54,6 +54,19 @@ async def get_study_session(
     return result.scalar_one_or_none()
 
 
+async def get_study_session_timeline(
+    session: AsyncSession, session_id: UUID
+) -> Optional[tuple[UUID, Optional[bytes]]]:
+    """(user_id, blob da linha do tempo) da sessão, sem carregar o resto"""
+    result = await session.execute(
+        select(StudySession.user_id, StudySession.attention_timeline).where(
+            StudySession.id == session_id
+        )
+    )
+    row = result.one_or_none()
+    return None if row is None else tuple(row)
+
+
 async def end_study_session(
     study_session_id: UUID,
     session_data: StudySessionCreate,
@@ -10,3 +10,39 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+
+    # Backend de visão computacional: 'thread' ou 'process'
+    CV_EXECUTOR_BACKEND: str = 'thread'
+    # Número de threads dedicadas ao processamento de visão computacional
+    CV_EXECUTOR_WORKERS: int = 2
+    # Número de processos de inferência (0 = um por núcleo)
+    CV_PROCESS_WORKERS: int = 0
+    # Tempo máximo (s) de processamento de um frame antes do watchdog agir
+    CV_FRAME_TIMEOUT: float = 2.0
+    # Largura máxima de decodificação; JPEGs maiores são reduzidos (0 = nunca)
+    CV_MAX_DECODE_WIDTH: int = 0
+    # FaceMesh completo a cada N frames, rastreando os landmarks por fluxo
+    # óptico nos intermediários (1 = FaceMesh em todos os frames)
+    CV_TRACKING_INTERVAL: int = 1
+    # Erro forward-backward máximo (px) antes de voltar ao FaceMesh
+    CV_TRACKING_MAX_ERROR: float = 1.0
+    # Entrega ao FaceMesh só o recorte em volta do rosto do frame anterior
+    CV_FACE_ROI: bool = False
+    # Margem do recorte em frações do tamanho do rosto
+    CV_FACE_ROI_PADDING: float = 0.5
+    # Reduz o recorte para o rosto ter no máximo N px de largura (0 = não)
+    CV_FACE_TARGET_WIDTH: int = 0
+    # Distância interocular mínima (px) na imagem processada; reduz frames
+    # com rostos grandes por sessão (0 = resolução enviada pelo cliente)
+    CV_TARGET_INTEROCULAR: float = 0.0
+    # Pose da cabeça: solver do solvePnP ('iterative' ou 'sqpnp') ou
+    # 'procrustes' (sem solvePnP, ainda não validado com landmarks reais),
+    # warm start a partir da pose anterior e refinamento VVS
+    CV_POSE_SOLVER: str = 'iterative'
+    CV_POSE_WARM_START: bool = False
+    CV_POSE_REFINE: bool = True
+
+    # Modo delta do monitoramento: frames entre keyframes completos
+    MONITOR_KEYFRAME_INTERVAL: int = 30
+    # Movimento mínimo (px) para uma região ser reenviada no modo delta
+    MONITOR_DELTA_TOLERANCE: float = 0.5
@@ -1,3 +1,6 @@
+# Quantidade de landmarks do FaceMesh com refine_landmarks (íris incluídas)
+LANDMARK_COUNT = 478
+
 EYES_LMS_NUMS = [33, 133, 160, 144, 158, 153, 362, 263, 385, 380, 387, 373]
 LEFT_IRIS_NUM = 468
 RIGHT_IRIS_NUM = 473
@@ -127,3 +130,17 @@ FACE_BOUNDARY = [
     109,
 ]
 POSE = [33, 263, 1, 61, 291, 199]
+
+# Regiões enviadas ao cliente, na ordem usada pelos payloads de resposta
+FACE_REGIONS = {
+    'face_boundary': FACE_BOUNDARY,
+    'left_eyebrow': LEFT_EYEBROW,
+    'right_eyebrow': RIGHT_EYEBROW,
+    'left_eye': LEFT_EYE,
+    'right_eye': RIGHT_EYE,
+    'left_iris': LEFT_IRIS,
+    'right_iris': RIGHT_IRIS,
+    'nose': NOSE,
+    'inner_lips': INNER_LIP,
+    'outer_lips': OUTER_LIP,
+}
@@ -3,6 +3,60 @@ import json
 import cv2
 import numpy as np
 
+from focus_track_api.utils.constants import FACE_REGIONS
+
+
+class RegionsIndex:
+    """
+    Concatenated landmark indices of a set of regions and the slice of each
+    region inside the gathered array, so every region is extracted with one
+    fancy index per frame. `mask` has bit i set for the i-th region of
+    FACE_REGIONS that is present
+    """
+
+    def __init__(self, regions):
+        self.regions = dict(regions)
+        self.index = (
+            np.concatenate([
+                np.asarray(indices, dtype=np.intp)
+                for indices in self.regions.values()
+            ])
+            if self.regions
+            else np.empty(0, dtype=np.intp)
+        )
+        self.slices = {}
+        start = 0
+        for region, indices in self.regions.items():
+            self.slices[region] = (start, start + len(indices))
+            start += len(indices)
+        self.mask = sum(
+            1 << bit
+            for bit, region in enumerate(FACE_REGIONS)
+            if region in self.regions
+        )
+
+
+FACE_REGIONS_INDEX = RegionsIndex(FACE_REGIONS)
+
+
+def select_regions(regions=None):
+    """
+    RegionsIndex of a subset of FACE_REGIONS, kept in FACE_REGIONS order
+
+    :param regions: iterable of region names, None for every region
+    :return: RegionsIndex (the shared FACE_REGIONS_INDEX when all regions)
+    """
+    if regions is None:
+        return FACE_REGIONS_INDEX
+    regions = set(regions)
+    if regions == FACE_REGIONS.keys():
+        return FACE_REGIONS_INDEX
+    return RegionsIndex({
+        region: indices
+        for region, indices in FACE_REGIONS.items()
+        if region in regions
+    })
+
 
 def load_camera_parameters(file_path):
     try:
@@ -37,27 +91,93 @@ def resize(frame, scale_percent):
     return resized
 
 
-def get_landmarks(lms):
-    surface = 0
-    for lms0 in lms:
-        landmarks = [
-            np.array([point.x, point.y, point.z]) for point in lms0.landmark
-        ]
+def _face_surface(points):
+    """Area of the clamped x, y bounding box of a face, in normalised units"""
+    xs = [min(max(point.x, 0.0), 1.0) for point in points]
+    ys = [min(max(point.y, 0.0), 1.0) for point in points]
+    return (max(xs) - min(xs)) * (max(ys) - min(ys))
+
+
+def extract_landmarks(lms, out=None):
+    """
+    Writes the landmarks of the biggest detected face into a float32 array
+
+    The coordinates are assigned column by column straight into `out`, with
+    no intermediate landmark array per frame.
+
+    :param lms: mediapipe multi_face_landmarks
+    :param out: optional preallocated (N, 3) float32 array, reused per frame
+    :return: (N, 3) array of normalised x, y, z landmarks (not clamped)
+    """
+    if len(lms) == 1:
+        points = lms[0].landmark
+    else:
+        points = max((face.landmark for face in lms), key=_face_surface)
+
+    count = len(points)
+    if out is None or out.shape[0] != count:
+        out = np.empty((count, 3), dtype=np.float32)
+    out[:, 0] = [point.x for point in points]
+    out[:, 1] = [point.y for point in points]
+    out[:, 2] = [point.z for point in points]
+
+    return out
 
-        landmarks = np.array(landmarks)
 
-        landmarks[landmarks[:, 0] < 0.0, 0] = 0.0
-        landmarks[landmarks[:, 0] > 1.0, 0] = 1.0
-        landmarks[landmarks[:, 1] < 0.0, 1] = 0.0
-        landmarks[landmarks[:, 1] > 1.0, 1] = 1.0
+def clamp_landmarks(landmarks):
+    """
+    Clamps the normalised x, y coordinates to the frame, in place
+
+    :param landmarks: (N, 3) array of normalised landmarks
+    :return: the same array
+    """
+    np.clip(landmarks[:, :2], 0.0, 1.0, out=landmarks[:, :2])
+    return landmarks
+
+
+def get_landmarks(lms, out=None):
+    return clamp_landmarks(extract_landmarks(lms, out))
+
+
+def region_points(landmarks, frame_size, regions_index=FACE_REGIONS_INDEX):
+    """
+    Pixel coordinates of the landmarks of every region with a single fancy
+    index, concatenated in the order of the regions index
+
+    :param landmarks: (N, 3) array of normalised landmarks
+    :param frame_size: (width, height) of the frame
+    :param regions_index: precomputed RegionsIndex of the regions to extract
+    :return: (K, 2) float32 array of x, y pixel coordinates
+    """
+    return landmarks[regions_index.index, :2] * np.asarray(
+        frame_size, dtype=np.float32
+    )
+
 
-        dx = landmarks[:, 0].max() - landmarks[:, 0].min()
-        dy = landmarks[:, 1].max() - landmarks[:, 1].min()
-        new_surface = dx * dy
-        if new_surface > surface:
-            biggest_face = landmarks
+def split_regions(points, regions_index=FACE_REGIONS_INDEX):
+    """
+    Splits the concatenated points returned by region_points per region
+
+    :return: dict region -> (k, 2) array (views over points)
+    """
+    return {
+        region: points[start:stop]
+        for region, (start, stop) in regions_index.slices.items()
+    }
 
-    return biggest_face
+
+def landmark_regions(landmarks, frame_size, regions_index=FACE_REGIONS_INDEX):
+    """
+    Pixel coordinates of every face region with a single fancy index
+
+    :param landmarks: (N, 3) array of normalised landmarks
+    :param frame_size: (width, height) of the frame
+    :param regions_index: precomputed RegionsIndex of the regions to extract
+    :return: dict region -> (k, 2) array (views over one gathered buffer)
+    """
+    return split_regions(
+        region_points(landmarks, frame_size, regions_index), regions_index
+    )
 
 
 def get_face_area(face):
@@ -0,0 +1,33 @@
+"""add attention quantiles to study_sessions
+
+Revision ID: 5b2e9d4a7c13
+Revises: cfc6172cef23
+Create Date: 2026-10-17 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2e9d4a7c13'
+down_revision: Union[str, Sequence[str], None] = 'cfc6172cef23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for column in ('attention_p50', 'attention_p90', 'attention_p99'):
+        op.add_column(
+            'study_sessions',
+            sa.Column(column, sa.Float(), server_default='0', nullable=False),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in ('attention_p99', 'attention_p90', 'attention_p50'):
+        op.drop_column('study_sessions', column)
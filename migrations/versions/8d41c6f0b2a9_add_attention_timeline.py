@@ -0,0 +1,31 @@
+"""add attention timeline to study_sessions
+
+Revision ID: 8d41c6f0b2a9
+Revises: 5b2e9d4a7c13
+Create Date: 2026-10-17 11:03:27.902115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41c6f0b2a9'
+down_revision: Union[str, Sequence[str], None] = '5b2e9d4a7c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'study_sessions',
+        sa.Column('attention_timeline', sa.LargeBinary(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('study_sessions', 'attention_timeline')
@@ -0,0 +1,158 @@
+"""move critical events to their own table
+
+Revision ID: c3a7e5f19d42
+Revises: 8d41c6f0b2a9
+Create Date: 2026-10-17 15:42:10.518734
+
+"""
+import json
+import uuid
+from datetime import datetime, time, timedelta, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a7e5f19d42'
+down_revision: Union[str, Sequence[str], None] = '8d41c6f0b2a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Mensagens dos eventos no JSON antigo, recriadas no downgrade
+EVENT_MESSAGES = {
+    'distraction': 'Alta distração detectada',
+    'fatigue': 'Fadiga detectada',
+    'attention': 'Atenção muito baixa',
+}
+# Eventos mantidos por sessão no JSON antigo
+MAX_EVENTS_PER_SESSION = 50
+
+study_sessions = sa.table(
+    'study_sessions',
+    sa.column('id', sa.UUID()),
+    sa.column('user_id', sa.UUID()),
+    sa.column('start_time', sa.DateTime()),
+    sa.column('critical_events', sa.Text()),
+)
+critical_events = sa.table(
+    'critical_events',
+    sa.column('id', sa.UUID()),
+    sa.column('session_id', sa.UUID()),
+    sa.column('user_id', sa.UUID()),
+    sa.column('timestamp', sa.Float()),
+    sa.column('type', sa.String()),
+    sa.column('level', sa.String()),
+    sa.column('score', sa.Float()),
+)
+
+
+def _event_timestamps(start_time, events):
+    """
+    Instantes epoch dos eventos do JSON antigo, que só guardava HH:MM:SS
+    (UTC): a data vem do início da sessão e avança um dia a cada volta do
+    relógio, já que os eventos estão em ordem cronológica.
+    """
+    start_time = start_time.replace(tzinfo=timezone.utc, microsecond=0)
+    previous = start_time
+    for event in events:
+        clock = time.fromisoformat(event['time'])
+        event_time = datetime.combine(
+            previous.date(), clock, tzinfo=timezone.utc
+        )
+        if event_time < previous:
+            event_time += timedelta(days=1)
+        previous = event_time
+        yield event_time.timestamp()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('critical_events',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('session_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('timestamp', sa.Float(), nullable=False),
+    sa.Column('type', sa.String(), nullable=False),
+    sa.Column('level', sa.String(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['session_id'], ['study_sessions.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_critical_events_user_id_timestamp', 'critical_events', ['user_id', 'timestamp'])
+    op.create_index('ix_critical_events_session_id_timestamp', 'critical_events', ['session_id', 'timestamp'])
+
+    connection = op.get_bind()
+    sessions = connection.execute(
+        sa.select(
+            study_sessions.c.id,
+            study_sessions.c.user_id,
+            study_sessions.c.start_time,
+            study_sessions.c.critical_events,
+        ).where(study_sessions.c.critical_events.is_not(None))
+    )
+    for session_id, user_id, start_time, events_json in sessions:
+        try:
+            events = json.loads(events_json)
+            timestamps = list(_event_timestamps(start_time, events))
+        except (ValueError, KeyError, TypeError):
+            continue
+        rows = [
+            {
+                'id': uuid.uuid4(),
+                'session_id': session_id,
+                'user_id': user_id,
+                'timestamp': timestamp,
+                'type': event['type'],
+                'level': event['level'],
+                'score': event['score'],
+            }
+            for event, timestamp in zip(events, timestamps)
+        ]
+        if rows:
+            op.bulk_insert(critical_events, rows)
+
+    op.drop_column('study_sessions', 'critical_events')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column(
+        'study_sessions',
+        sa.Column('critical_events', sa.Text(), nullable=True),
+    )
+
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.select(
+            critical_events.c.session_id,
+            critical_events.c.timestamp,
+            critical_events.c.type,
+            critical_events.c.level,
+            critical_events.c.score,
+        ).order_by(critical_events.c.session_id, critical_events.c.timestamp)
+    )
+    events_by_session = {}
+    for session_id, timestamp, event_type, level, score in rows:
+        event_time = datetime.fromtimestamp(timestamp, timezone.utc)
+        events_by_session.setdefault(session_id, []).append({
+            'time': event_time.strftime('%H:%M:%S'),
+            'type': event_type,
+            'level': level,
+            'score': score,
+            'message': EVENT_MESSAGES.get(event_type, ''),
+        })
+    for session_id, events in events_by_session.items():
+        connection.execute(
+            study_sessions.update()
+            .where(study_sessions.c.id == session_id)
+            .values(
+                critical_events=json.dumps(events[-MAX_EVENTS_PER_SESSION:])
+            )
+        )
+
+    op.drop_index('ix_critical_events_session_id_timestamp', table_name='critical_events')
+    op.drop_index('ix_critical_events_user_id_timestamp', table_name='critical_events')
+    op.drop_table('critical_events')
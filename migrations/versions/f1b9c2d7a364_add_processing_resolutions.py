@@ -0,0 +1,31 @@
+"""add processing resolutions to study_sessions
+
+Revision ID: f1b9c2d7a364
+Revises: c3a7e5f19d42
+Create Date: 2026-10-17 17:08:51.230416
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b9c2d7a364'
+down_revision: Union[str, Sequence[str], None] = 'c3a7e5f19d42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'study_sessions',
+        sa.Column('processing_resolutions', sa.JSON(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('study_sessions', 'processing_resolutions')
@@ -0,0 +1,38 @@
+import cv2
+import numpy as np
+
+from focus_track_api.services.face_geometry import canonical_metric_landmarks
+
+FRAME_SIZE = (640, 480)
+FACE_DEPTH = 60.0
+LEFT_EYE_CORNERS = [33, 133]
+RIGHT_EYE_CORNERS = [362, 263]
+IRIS_POINTS = 5
+
+
+def make_landmarks(
+    yaw=0.0, pitch=0.0, roll=0.0, frame_size=FRAME_SIZE, offset=(0.0, 0.0)
+):
+    """
+    Gera 478 landmarks normalizados sintéticos (como os do FaceMesh) a
+    partir do modelo canônico rotacionado e projetado por uma câmera pinhole.
+    """
+    width, height = frame_size
+    rotation, _ = cv2.Rodrigues(np.radians([pitch, yaw, roll]))
+    points = rotation @ canonical_metric_landmarks
+
+    depth = FACE_DEPTH - points[2]
+    focal = width
+    x = 0.5 + offset[0] + focal * points[0] / depth / width
+    y = 0.5 + offset[1] - focal * points[1] / depth / height
+    z = -focal * points[2] / FACE_DEPTH / width
+    face = np.stack([x, y, z], axis=1)
+
+    left_iris = face[LEFT_EYE_CORNERS].mean(axis=0)
+    right_iris = face[RIGHT_EYE_CORNERS].mean(axis=0)
+    iris = np.vstack([
+        np.repeat(left_iris[None], IRIS_POINTS, axis=0),
+        np.repeat(right_iris[None], IRIS_POINTS, axis=0),
+    ])
+
+    return np.vstack([face, iris])
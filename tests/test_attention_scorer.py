@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from focus_track_api.services.attention_scorer import (
+    AttentionScorer,
+    PerclosWindow,
+)
+
+FRAMES = 5000
+FPS = 30.0
+# Pausa (s) maior que a janela do PERCLOS, esvaziando o histórico
+LONG_GAP = 90.0
+SMALL_CAPACITY = 4
+# Fração de frames sem rosto (EAR ausente)
+MISSING_FACE_RATE = 0.05
+
+
+class ListPerclos:
+    """PERCLOS com listas reconstruídas a cada frame (cálculo original)"""
+
+    def __init__(self, ear_thresh, period):
+        self.ear_thresh = ear_thresh
+        self.period = period
+        self.frame_history = []
+        self.eye_closure_history = []
+
+    def get_PERCLOS(self, t_now, ear_score):
+        self.frame_history.append(t_now)
+        if (ear_score is not None) and (ear_score <= self.ear_thresh):
+            self.eye_closure_history.append(t_now)
+        cutoff_time = t_now - self.period
+        self.frame_history = [
+            t for t in self.frame_history if t >= cutoff_time
+        ]
+        self.eye_closure_history = [
+            t for t in self.eye_closure_history if t >= cutoff_time
+        ]
+        if len(self.frame_history) > 0:
+            return len(self.eye_closure_history) / len(self.frame_history)
+        return 0.0
+
+
+def _score_stream():
+    """Sequência com fps variável, rajadas, rostos ausentes e uma pausa"""
+    rng = np.random.default_rng(0)
+    t_now = 0.0
+    for i in range(FRAMES):
+        t_now += rng.choice([0.0, 1 / FPS, 1 / (2 * FPS), 0.5])
+        if i == FRAMES // 2:
+            t_now += LONG_GAP
+        ear = (
+            None
+            if rng.random() < MISSING_FACE_RATE
+            else float(rng.uniform(0.05, 0.35))
+        )
+        yield t_now, ear
+
+
+def test_perclos_matches_list_implementation():
+    """Testa que o buffer circular reproduz o PERCLOS das listas"""
+    scorer = AttentionScorer(t_now=0.0)
+    reference = ListPerclos(scorer.ear_thresh, scorer.PERCLOS_TIME_PERIOD)
+
+    for t_now, ear in _score_stream():
+        _, perclos = scorer.get_PERCLOS(t_now, FPS, ear)
+        assert perclos == reference.get_PERCLOS(t_now, ear)
+
+    assert scorer.perclos_window.frames == len(reference.frame_history)
+
+
+def test_perclos_window_grows_when_full():
+    """Testa que a janela dobra a capacidade sem perder a ordem"""
+    window = PerclosWindow(capacity=SMALL_CAPACITY)
+
+    for i in range(3 * SMALL_CAPACITY):
+        window.add(float(i), i % 2 == 0, cutoff_time=0.0)
+
+    assert window.frames == 3 * SMALL_CAPACITY
+    assert window.perclos == pytest.approx(0.5)
+
+    window.add(100.0, True, cutoff_time=3 * SMALL_CAPACITY - 1)
+    assert (window.frames, window.closed_frames) == (2, 1)
+
+
+def test_scorer_state_is_slot_based():
+    """Testa que o scorer não aloca __dict__ por sessão"""
+    scorer = AttentionScorer(t_now=0.0)
+
+    assert not hasattr(scorer, '__dict__')
+    with pytest.raises(AttributeError):
+        scorer.frame_history = []
@@ -0,0 +1,218 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from focus_track_api.routers import study_session as study_session_router
+from focus_track_api.services.attention import (
+    check_critical_events,
+    flush_critical_events,
+)
+from focus_track_api.services.critical_events import (
+    EVENT_DUPLICATE_WINDOW,
+    CriticalEventBuffer,
+)
+
+START = 1_735_775_990.0
+LOW_ATTENTION = 10.0
+FRAMES = 100
+FLUSHED_EVENTS = 2
+
+
+class FakeSession:
+    """Sessão do banco que guarda as linhas inseridas e conta os commits"""
+
+    def __init__(self, fail=False):
+        self.rows = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.refreshed = []
+        self.fail = fail
+
+    async def execute(self, statement, rows):
+        if self.fail:
+            raise ConnectionError('banco indisponível')
+        self.rows.extend(rows)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+    async def refresh(self, instance):
+        self.refreshed.append(instance)
+
+
+def _study_session():
+    return SimpleNamespace(id=uuid.uuid4(), user_id=uuid.uuid4())
+
+
+def test_duplicates_within_window_are_dropped():
+    """Testa a deduplicação por (tipo, nível) na janela de 30 s"""
+    buffer = CriticalEventBuffer()
+    half_window = EVENT_DUPLICATE_WINDOW / 2
+
+    assert buffer.add('attention', 'critical', 0.0, START)
+    assert not buffer.add('attention', 'critical', 0.0, START + half_window)
+    assert buffer.add('fatigue', 'medium', 0.0, START + half_window)
+    assert buffer.add(
+        'attention', 'critical', 0.0, START + EVENT_DUPLICATE_WINDOW
+    )
+
+    assert [event['type'] for event in buffer.pending] == [
+        'attention',
+        'fatigue',
+        'attention',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_flush_inserts_pending_events_when_due():
+    """Testa que o flush insere em lote só após o intervalo (ou forçado)"""
+    study_session = _study_session()
+    session = FakeSession()
+
+    buffer = CriticalEventBuffer()
+    buffer.add('attention', 'critical', LOW_ATTENTION, START)
+    buffer.add('fatigue', 'medium', 0.0, START)
+    await buffer.flush(study_session, session)
+    assert session.commits == 0
+
+    await buffer.flush(study_session, session, force=True)
+    assert session.commits == 1
+    assert session.rows[0] == {
+        'session_id': study_session.id,
+        'user_id': study_session.user_id,
+        'timestamp': START,
+        'type': 'attention',
+        'level': 'critical',
+        'score': LOW_ATTENTION,
+    }
+    assert len(session.rows) == FLUSHED_EVENTS
+    assert not buffer.pending
+
+    # Sem eventos novos não há gravação, mesmo com o intervalo vencido
+    buffer.flush_interval = 0
+    await buffer.flush(study_session, session)
+    assert session.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_rolls_back_and_keeps_events():
+    """Testa que uma falha desfaz a transação e adia a nova tentativa"""
+    study_session = _study_session()
+    session = FakeSession(fail=True)
+    buffer = CriticalEventBuffer()
+    buffer.add('attention', 'critical', LOW_ATTENTION, START)
+
+    await flush_critical_events(buffer, study_session, session, force=True)
+    assert session.rollbacks == 1
+    assert session.refreshed == [study_session]
+
+    # A próxima tentativa só ocorre após outro intervalo, não a cada frame
+    for _ in range(FRAMES):
+        await check_critical_events(
+            study_session, session, buffer, 0.0, 0.0, LOW_ATTENTION
+        )
+    assert session.rollbacks == 1
+    assert len(buffer.pending) == FLUSHED_EVENTS
+
+    session.fail = False
+    await buffer.flush(study_session, session, force=True)
+    assert len(session.rows) == FLUSHED_EVENTS
+    assert not buffer.pending
+
+
+@pytest.mark.asyncio
+async def test_check_critical_events_batches_commits():
+    """Testa que frames com atenção baixa não geram um commit cada"""
+    session = FakeSession()
+    buffer = CriticalEventBuffer(flush_interval=0)
+
+    for _ in range(FRAMES):
+        await check_critical_events(
+            _study_session(), session, buffer, 0.0, 0.0, LOW_ATTENTION
+        )
+
+    assert [row['type'] for row in session.rows] == ['attention']
+    assert session.commits == 1
+
+
+class FakeWebSocket:
+    """WebSocket com token que nunca recebe mensagens"""
+
+    query_params = {'token': 'token'}
+
+    async def accept(self):
+        pass
+
+    async def close(self, code=None, reason=None):
+        pass
+
+    @staticmethod
+    async def receive():
+        await asyncio.Event().wait()
+
+
+class FakeCVSession:
+    closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+def _patch_monitor(monkeypatch, session, study_session, cv_session):
+    async def fake_get_session():
+        yield session
+
+    async def fake_get_user(session, token):
+        return SimpleNamespace(id=study_session.user_id)
+
+    async def fake_start_study_session(session, user):
+        return study_session
+
+    async def fake_open_session(config):
+        return cv_session
+
+    async def failing_serve_next_frame(
+        websocket, slot, timer, cv, scorer, metrics, *args
+    ):
+        metrics.critical_events.add(
+            'attention', 'critical', LOW_ATTENTION, START
+        )
+        raise TimeoutError('executor de CV sem resposta')
+
+    for name, fake in [
+        ('get_session', fake_get_session),
+        ('get_current_user_socket', fake_get_user),
+        ('start_study_session', fake_start_study_session),
+        ('_serve_next_frame', failing_serve_next_frame),
+        (
+            'get_cv_executor',
+            lambda: SimpleNamespace(open_session=fake_open_session),
+        ),
+    ]:
+        monkeypatch.setattr(study_session_router, name, fake)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('fail', [False, True])
+async def test_monitor_error_exit_flushes_buffered_events(monkeypatch, fail):
+    """Testa que um erro no loop do monitor não descarta os eventos"""
+    session = FakeSession(fail=fail)
+    study_session = _study_session()
+    study_session.start_time = None
+    cv_session = FakeCVSession()
+    _patch_monitor(monkeypatch, session, study_session, cv_session)
+
+    # Uma falha na gravação não esconde o erro original
+    with pytest.raises(TimeoutError):
+        await study_session_router.monitor_session(FakeWebSocket())
+
+    assert cv_session.closed
+    if fail:
+        assert session.rollbacks == 1
+    else:
+        assert [row['type'] for row in session.rows] == ['attention']
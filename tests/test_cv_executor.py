@@ -0,0 +1,227 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from focus_track_api.services import cv_executor, cv_worker
+from focus_track_api.services.cv_executor import (
+    CVWorkerTimeout,
+    ProcessCVExecutor,
+    ThreadCVExecutor,
+    get_cv_executor,
+)
+from focus_track_api.services.cv_worker import run_worker
+
+POOL_SIZE = 2
+SESSIONS = 5
+FRAMES = 3
+CPU_COUNT = 6
+FRAME_TIMEOUT = 0.5
+# Duração (s) de um frame lento do pipeline falso
+SLOW_FRAME = 0.05
+# Limite (s) de cada chamada nos testes com processos reais, para que um
+# processo travado falhe o teste em vez de travá-lo
+TEST_TIMEOUT = 30.0
+HANG_FRAME = b'hang'
+CRASH_FRAME = b'crash'
+
+
+class ThreadPipeline:
+    """FramePipeline que registra a concorrência e a ordem das chamadas"""
+
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+    calls = []
+
+    def __init__(self, config):
+        self.config = config
+
+    @classmethod
+    def reset(cls):
+        cls.running = cls.max_running = 0
+        cls.calls = []
+
+    def process(self, frame_data):
+        cls = type(self)
+        with cls.lock:
+            cls.running += 1
+            cls.max_running = max(cls.max_running, cls.running)
+        time.sleep(SLOW_FRAME)
+        with cls.lock:
+            cls.running -= 1
+            cls.calls.append(('process', frame_data))
+        return frame_data
+
+    def process_batch(self, frames):
+        return [self.process(frame) for frame in frames]
+
+    def close(self):
+        self.calls.append(('close', None))
+
+
+@pytest.fixture
+def thread_executor(monkeypatch):
+    ThreadPipeline.reset()
+    monkeypatch.setattr(cv_executor, 'FramePipeline', ThreadPipeline)
+    executor = ThreadCVExecutor(POOL_SIZE)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_thread_executor_respects_pool_size(thread_executor):
+    """Testa que as sessões nunca usam mais threads que o pool"""
+    sessions = [await thread_executor.open_session() for _ in range(SESSIONS)]
+
+    await asyncio.gather(
+        *(session.analyse(b'frame') for session in sessions for _ in range(2))
+    )
+
+    assert ThreadPipeline.max_running == POOL_SIZE
+
+
+@pytest.mark.asyncio
+async def test_thread_session_closes_after_pending_frames(thread_executor):
+    """Testa que o close espera os frames da sessão, que rodam em ordem"""
+    session = await thread_executor.open_session()
+
+    frames = [
+        asyncio.create_task(session.analyse(bytes([i]))) for i in range(FRAMES)
+    ]
+    await asyncio.sleep(0)
+    await session.close()
+
+    assert [await frame for frame in frames] == [
+        bytes([i]) for i in range(FRAMES)
+    ]
+    assert ThreadPipeline.calls == [
+        *(('process', bytes([i])) for i in range(FRAMES)),
+        ('close', None),
+    ]
+    assert ThreadPipeline.max_running == 1
+
+
+@pytest.fixture
+def fresh_executor(monkeypatch):
+    monkeypatch.setattr(cv_executor, '_cv_executor', None)
+    yield cv_executor.settings
+    cv_executor.shutdown_cv_executor()
+
+
+def test_get_cv_executor_thread_backend(monkeypatch, fresh_executor):
+    """Testa o backend de threads, com o tamanho do pool das settings"""
+    monkeypatch.setattr(fresh_executor, 'CV_EXECUTOR_BACKEND', 'thread')
+    monkeypatch.setattr(fresh_executor, 'CV_EXECUTOR_WORKERS', POOL_SIZE)
+
+    executor = get_cv_executor()
+
+    assert isinstance(executor, ThreadCVExecutor)
+    assert executor._executor._max_workers == POOL_SIZE
+    assert get_cv_executor() is executor
+
+
+@pytest.mark.parametrize(
+    ('workers', 'expected'), [(POOL_SIZE, POOL_SIZE), (0, CPU_COUNT)]
+)
+def test_get_cv_executor_process_backend(
+    monkeypatch, fresh_executor, workers, expected
+):
+    """Testa o backend de processos (0 processos = um por núcleo)"""
+    created = []
+
+    class FakeProcessExecutor:
+        def __init__(self, workers, frame_timeout):
+            created.append((workers, frame_timeout))
+
+        def shutdown(self):
+            pass
+
+    monkeypatch.setattr(cv_executor, 'ProcessCVExecutor', FakeProcessExecutor)
+    monkeypatch.setattr(cv_executor.os, 'cpu_count', lambda: CPU_COUNT)
+    monkeypatch.setattr(fresh_executor, 'CV_EXECUTOR_BACKEND', 'process')
+    monkeypatch.setattr(fresh_executor, 'CV_PROCESS_WORKERS', workers)
+    monkeypatch.setattr(fresh_executor, 'CV_FRAME_TIMEOUT', FRAME_TIMEOUT)
+
+    assert isinstance(get_cv_executor(), FakeProcessExecutor)
+    assert created == [(expected, FRAME_TIMEOUT)]
+
+
+class ProcessPipeline:
+    """FramePipeline do processo de inferência: responde com o pid"""
+
+    def __init__(self, config):
+        self.config = config
+
+    @staticmethod
+    def process(frame_data):
+        if frame_data == HANG_FRAME:
+            time.sleep(3600)
+        if frame_data == CRASH_FRAME:
+            os._exit(1)
+        return os.getpid(), frame_data
+
+    def process_batch(self, frames):
+        return [self.process(frame) for frame in frames]
+
+    def close(self):
+        pass
+
+
+def _run_fake_worker(requests, responses, sessions):
+    """run_worker real, com o pipeline falso (MediaPipe fora do processo)"""
+    cv_worker.FramePipeline = ProcessPipeline
+    run_worker(requests, responses, sessions)
+
+
+@pytest.fixture
+def process_executor(monkeypatch):
+    monkeypatch.setattr(cv_executor, 'run_worker', _run_fake_worker)
+    executor = ProcessCVExecutor(POOL_SIZE, FRAME_TIMEOUT)
+    yield executor
+    executor.shutdown()
+
+
+async def _open(executor):
+    return await asyncio.wait_for(executor.open_session(), TEST_TIMEOUT)
+
+
+async def _analyse(session, frame_data=b'frame'):
+    return await asyncio.wait_for(session.analyse(frame_data), TEST_TIMEOUT)
+
+
+@pytest.mark.asyncio
+async def test_process_sessions_keep_their_worker(process_executor):
+    """Testa que os frames de uma sessão vão sempre ao mesmo processo"""
+    sessions = [await _open(process_executor) for _ in range(POOL_SIZE)]
+
+    pids = {session: set() for session in sessions}
+    for _ in range(FRAMES):
+        for session in sessions:
+            pid, _ = await _analyse(session)
+            pids[session].add(pid)
+
+    assert [pids[session] for session in sessions] == [
+        {session._worker._process.pid} for session in sessions
+    ]
+    assert len(set.union(*pids.values())) == POOL_SIZE
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('frame_data', [HANG_FRAME, CRASH_FRAME])
+async def test_stuck_worker_is_restarted(process_executor, frame_data):
+    """Testa que um processo travado ou morto expira e é reiniciado"""
+    session = await _open(process_executor)
+    worker = session._worker
+    pid, _ = await _analyse(session)
+
+    with pytest.raises(CVWorkerTimeout):
+        await _analyse(session, frame_data)
+
+    # O reinício recria o pipeline da sessão no novo processo
+    new_pid, echoed = await _analyse(session)
+    assert worker.generation == 1
+    assert new_pid != pid
+    assert echoed == b'frame'
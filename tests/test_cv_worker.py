@@ -0,0 +1,68 @@
+import queue
+
+from focus_track_api.services import cv_worker
+from focus_track_api.services.cv_worker import WORKER_READY, run_worker
+
+RESTORED_SESSION = 7
+NEW_SESSION = 8
+OPEN_REQUEST = 1
+FRAME_REQUEST = 2
+UNKNOWN_REQUEST = 3
+
+
+class FakePipeline:
+    """FramePipeline que registra a criação e ecoa os frames"""
+
+    created = []
+
+    def __init__(self, config):
+        self.created.append(config)
+
+    @staticmethod
+    def process(frame_data):
+        return ('analysis', frame_data)
+
+    def process_batch(self, frames):
+        return [self.process(frame) for frame in frames]
+
+    def close(self):
+        pass
+
+
+def _run(monkeypatch, messages, sessions=None):
+    FakePipeline.created = []
+    monkeypatch.setattr(cv_worker, 'FramePipeline', FakePipeline)
+    requests, responses = queue.Queue(), queue.Queue()
+    for message in [*messages, None]:
+        requests.put(message)
+    run_worker(requests, responses, sessions)
+    return [responses.get_nowait() for _ in range(responses.qsize())]
+
+
+def test_worker_builds_pipelines_before_ready(monkeypatch):
+    """Testa que as sessões da partida são recriadas antes do aviso"""
+    responses = _run(monkeypatch, [], {RESTORED_SESSION: 'config'})
+
+    assert FakePipeline.created == ['config']
+    assert responses == [(None, True, WORKER_READY)]
+
+
+def test_worker_opens_pipeline_on_open(monkeypatch):
+    """Testa que o pipeline é criado no 'open' e confirmado ao cliente"""
+    responses = _run(
+        monkeypatch,
+        [
+            ('open', NEW_SESSION, OPEN_REQUEST, 'config'),
+            ('process', NEW_SESSION, FRAME_REQUEST, b'frame'),
+            ('process', RESTORED_SESSION, UNKNOWN_REQUEST, b'frame'),
+        ],
+    )
+
+    assert FakePipeline.created == ['config']
+    assert responses[:3] == [
+        (None, True, WORKER_READY),
+        (OPEN_REQUEST, True, None),
+        (FRAME_REQUEST, True, ('analysis', b'frame')),
+    ]
+    request_id, ok, _ = responses[3]
+    assert (request_id, ok) == (UNKNOWN_REQUEST, False)
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from focus_track_api.services.eye_detector import (
+    EYES_LMS_NUMS,
+    LEFT_IRIS_NUM,
+    RIGHT_IRIS_NUM,
+    EyeDetector,
+)
+from tests.landmarks import FRAME_SIZE, make_landmarks
+
+POSES = [(0.0, 0.0, 0.0), (20.0, -10.0, 5.0), (-30.0, 15.0, -10.0)]
+EYES = 2
+
+
+def _reference(landmarks):
+    """EAR e gaze ponto a ponto, como no cálculo original por olho"""
+    ears, gazes = [], []
+    for eye, iris in zip(
+        (EYES_LMS_NUMS[:6], EYES_LMS_NUMS[6:]),
+        (LEFT_IRIS_NUM, RIGHT_IRIS_NUM),
+    ):
+        pts = landmarks[eye, :2]
+        ears.append(
+            (np.linalg.norm(pts[2] - pts[3]) + np.linalg.norm(pts[4] - pts[5]))
+            / (2 * np.linalg.norm(pts[0] - pts[1]))
+        )
+        center = (pts.min(axis=0) + pts.max(axis=0)) / 2
+        gazes.append(np.linalg.norm(landmarks[iris, :2] - center) / center[0])
+    return np.mean(ears), np.mean(gazes)
+
+
+@pytest.mark.parametrize('pose', POSES)
+def test_features_match_per_eye_reference(pose):
+    """Testa EAR e gaze vetorizados contra o cálculo por olho"""
+    landmarks = make_landmarks(*pose)
+
+    ear, gaze = EyeDetector().get_features(landmarks)
+
+    assert (ear, gaze) == pytest.approx(_reference(landmarks))
+
+
+def test_features_batch_matches_single_face():
+    """Testa que o lote (N, 478, 3) repete o resultado de cada rosto"""
+    stack = np.stack([make_landmarks(*pose) for pose in POSES])
+
+    ears, gazes = EyeDetector().get_features_batch(stack)
+
+    assert ears.shape == gazes.shape == (len(POSES),)
+    for i, landmarks in enumerate(stack):
+        assert (ears[i], gazes[i]) == pytest.approx(_reference(landmarks))
+
+
+def test_gaze_crops_eyes_only_in_debug():
+    """Testa que o frame só é recortado com a flag de debug"""
+    width, height = FRAME_SIZE
+    frame = np.zeros((height, width), dtype=np.uint8)
+    landmarks = make_landmarks()
+
+    detector = EyeDetector()
+    detector.get_Gaze_Score(frame, landmarks, FRAME_SIZE)
+    assert detector.eye_crops is None
+
+    debug_detector = EyeDetector(debug=True)
+    debug_detector.get_Gaze_Score(frame, landmarks, FRAME_SIZE)
+    assert len(debug_detector.eye_crops) == EYES
+    assert all(crop.size > 0 for crop in debug_detector.eye_crops)
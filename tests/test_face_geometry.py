@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from focus_track_api.services.face_geometry import (
+    FaceGeometry,
+    MetricLandmarkContext,
+    get_metric_landmarks,
+    get_metric_landmarks_batch,
+    get_pose_transform_mat,
+)
+from tests.landmarks import FRAME_SIZE, make_landmarks
+
+JAW_LANDMARKS = [61, 291, 199]
+POSES = [(0.0, 0.0, 0.0), (20.0, -10.0, 5.0), (-30.0, 15.0, -10.0)]
+# Tolerância dos buffers float32 em relação à referência float64 (cm)
+METRIC_TOLERANCE = 1e-4
+BATCH_TOLERANCE = 1e-9
+
+
+def _context():
+    width, height = FRAME_SIZE
+    pcf = FaceGeometry(frame_height=height, frame_width=width, fy=width)
+    return pcf, MetricLandmarkContext(pcf, JAW_LANDMARKS)
+
+
+@pytest.mark.parametrize('pose', POSES)
+def test_context_matches_get_metric_landmarks(pose):
+    """Testa o contexto pré-calculado contra get_metric_landmarks"""
+    pcf, context = _context()
+    landmarks = make_landmarks(*pose)
+
+    expected, expected_transform = get_metric_landmarks(
+        landmarks.T.copy(), pcf
+    )
+    metric, transform = context.metric_landmarks(landmarks)
+
+    assert metric == pytest.approx(
+        expected.T[context.landmark_ids], abs=METRIC_TOLERANCE
+    )
+    assert transform == pytest.approx(expected_transform, abs=METRIC_TOLERANCE)
+
+
+@pytest.mark.parametrize('pose', POSES)
+def test_context_matches_get_pose_transform_mat(pose):
+    """Testa os landmarks no espaço da câmera contra a referência"""
+    pcf, context = _context()
+    landmarks = make_landmarks(*pose).astype(np.float32)
+
+    expected, _ = get_pose_transform_mat(landmarks.T.astype(float), pcf)
+    metric, _ = context.pose_transform(landmarks)
+
+    assert metric == pytest.approx(
+        expected[:, context.landmark_ids], abs=METRIC_TOLERANCE
+    )
+
+
+def test_context_keeps_basis_first_and_extra_landmarks():
+    """Testa a ordem dos landmarks mantidos pelo contexto"""
+    _, context = _context()
+
+    assert list(context.landmark_ids[-len(JAW_LANDMARKS) :]) == JAW_LANDMARKS
+    assert len(set(context.landmark_ids)) == len(context.landmark_ids)
+
+
+def test_batch_matches_single_frame():
+    """Testa que o lote reproduz get_metric_landmarks frame a frame"""
+    pcf, _ = _context()
+    stack = np.stack([make_landmarks(*pose).T for pose in POSES])
+
+    metric, transforms = get_metric_landmarks_batch(stack.copy(), pcf)
+
+    for i, frame in enumerate(stack):
+        expected, expected_transform = get_metric_landmarks(frame.copy(), pcf)
+        assert metric[i] == pytest.approx(expected, abs=BATCH_TOLERANCE)
+        assert transforms[i] == pytest.approx(
+            expected_transform, abs=BATCH_TOLERANCE
+        )
+
+
+def test_batch_handles_reflected_design_matrix():
+    """Testa o lote com um frame espelhado (correção de reflexão do SVD)"""
+    pcf, _ = _context()
+    mirrored = make_landmarks().T.copy()
+    mirrored[0] = 1.0 - mirrored[0]
+    stack = np.stack([make_landmarks().T, mirrored])
+
+    _, transforms = get_metric_landmarks_batch(stack.copy(), pcf)
+
+    _, expected_transform = get_metric_landmarks(mirrored.copy(), pcf)
+    assert transforms[1] == pytest.approx(
+        expected_transform, abs=BATCH_TOLERANCE
+    )
+    assert np.linalg.det(transforms[:, :3, :3]) == pytest.approx(
+        np.linalg.norm(transforms[:, :3, 0], axis=1) ** 3
+    )
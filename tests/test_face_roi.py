@@ -0,0 +1,132 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from focus_track_api.services.face_roi import FaceROI
+from focus_track_api.services.frame_pipeline import (
+    FramePipeline,
+    PipelineConfig,
+)
+from focus_track_api.services.monitor_protocol import encode_raw_frame
+from tests.landmarks import FRAME_SIZE, make_landmarks
+
+SMALL_MOVE = 0.005
+LARGE_MOVE = 0.2
+TARGET_FACE_WIDTH = 64
+FRAMES = 3
+
+
+def _image():
+    width, height = FRAME_SIZE
+    return np.zeros((height, width, 3), dtype=np.uint8)
+
+
+def _face_roi(**kwargs):
+    roi = FaceROI(**kwargs)
+    roi.update(make_landmarks().astype(np.float32), _image())
+    return roi
+
+
+def test_update_crops_around_face():
+    """Testa que o recorte envolve o rosto com a margem pedida"""
+    landmarks = make_landmarks()
+    roi = _face_roi()
+
+    x0, y0, x1, y1 = roi.box
+    width, height = FRAME_SIZE
+    assert x0 < landmarks[:, 0].min() * width
+    assert y0 < landmarks[:, 1].min() * height
+    assert x1 > landmarks[:, 0].max() * width
+    assert y1 > landmarks[:, 1].max() * height
+    assert (x1 - x0) < width
+
+
+def test_update_keeps_box_for_small_moves():
+    """Testa que o recorte só muda quando o rosto se aproxima da borda"""
+    roi = _face_roi()
+    box = roi.box
+
+    roi.update(make_landmarks(offset=(SMALL_MOVE, 0.0)), _image())
+    assert roi.box == box
+
+    roi.update(make_landmarks(offset=(LARGE_MOVE, 0.0)), _image())
+    assert roi.box != box
+
+
+def test_to_frame_maps_crop_coordinates():
+    """Testa a conversão dos landmarks do recorte para o frame inteiro"""
+    roi = _face_roi()
+    x0, y0, x1, y1 = roi.box
+    image, box = roi.crop(_image())
+    corners = np.array([[0.0, 0.0, 0.1], [1.0, 1.0, 0.1]], dtype=np.float32)
+
+    mapped = roi.to_frame(corners, box, _image())
+
+    assert image.shape[:2] == (y1 - y0, x1 - x0)
+    assert mapped[:, :2] * FRAME_SIZE == pytest.approx(
+        np.array([[x0, y0], [x1, y1]])
+    )
+    assert mapped[0, 2] == pytest.approx(0.1 * (x1 - x0) / FRAME_SIZE[0])
+
+
+def test_crop_downscales_to_target_face_width():
+    """Testa a redução do recorte até a largura alvo do rosto"""
+    roi = _face_roi(target_face_width=TARGET_FACE_WIDTH)
+    x0, _, x1, _ = roi.box
+
+    image, _ = roi.crop(_image())
+
+    assert image.shape[1] < x1 - x0
+
+
+class FakeFaceMesh:
+    """FaceMesh falso; com crop_found=False não acha o rosto nos recortes"""
+
+    def __init__(self, landmarks, full_size=FRAME_SIZE, crop_found=True):
+        self.landmarks = landmarks
+        self.full_size = full_size
+        self.crop_found = crop_found
+        self.sizes = []
+
+    def process(self, image):
+        size = image.shape[1], image.shape[0]
+        self.sizes.append(size)
+        if size != self.full_size and not self.crop_found:
+            return SimpleNamespace(multi_face_landmarks=None)
+        points = [
+            SimpleNamespace(x=x, y=y, z=z)
+            for x, y, z in self.landmarks.tolist()
+        ]
+        return SimpleNamespace(
+            multi_face_landmarks=[SimpleNamespace(landmark=points)]
+        )
+
+
+def test_frame_pipeline_runs_face_mesh_on_crop():
+    """Testa que, após o primeiro frame, o FaceMesh recebe só o recorte"""
+    pipeline = FramePipeline(PipelineConfig(face_roi=True))
+    pipeline._face_mesh = face_mesh = FakeFaceMesh(make_landmarks())
+    frame = encode_raw_frame(_image()[..., 0])
+
+    for _ in range(FRAMES):
+        pipeline.process(frame)
+
+    assert face_mesh.sizes[0] == FRAME_SIZE
+    assert all(np.less(size, FRAME_SIZE).all() for size in face_mesh.sizes[1:])
+
+
+def test_frame_pipeline_retries_full_frame_when_face_is_lost():
+    """Testa que o rosto perdido no recorte é buscado no frame inteiro"""
+    pipeline = FramePipeline(PipelineConfig(face_roi=True))
+    pipeline._face_mesh = face_mesh = FakeFaceMesh(
+        make_landmarks(), crop_found=False
+    )
+    frame = encode_raw_frame(_image()[..., 0])
+
+    pipeline.process(frame)
+    analysis = pipeline.process(frame)
+
+    assert analysis.face_detected
+    assert np.less(face_mesh.sizes[1], FRAME_SIZE).all()
+    assert face_mesh.sizes[2] == FRAME_SIZE
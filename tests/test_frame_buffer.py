@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+from fastapi import WebSocketDisconnect
+
+from focus_track_api.services.frame_buffer import LatestFrameSlot
+
+FRAMES_SENT = 5
+
+
+@pytest.mark.asyncio
+async def test_latest_frame_slot_returns_newest_frame():
+    """Testa que apenas o frame mais recente é entregue"""
+    slot = LatestFrameSlot()
+
+    for i in range(FRAMES_SENT):
+        slot.put(bytes([i]), float(i))
+
+    frame, received_at, coalesced = await slot.get()
+
+    assert frame == bytes([FRAMES_SENT - 1])
+    assert received_at == float(FRAMES_SENT - 1)
+    assert coalesced == FRAMES_SENT - 1
+    assert slot.total_dropped == FRAMES_SENT - 1
+
+
+@pytest.mark.asyncio
+async def test_latest_frame_slot_resets_coalesced_count():
+    """Testa que a contagem de frames descartados é por resposta"""
+    slot = LatestFrameSlot()
+
+    slot.put(b'a', 0.0)
+    slot.put(b'b', 1.0)
+    await slot.get()
+    slot.put(b'c', 2.0)
+
+    frame, _, coalesced = await slot.get()
+
+    assert frame == b'c'
+    assert coalesced == 0
+    assert slot.total_dropped == 1
+
+
+@pytest.mark.asyncio
+async def test_latest_frame_slot_waits_for_frame():
+    """Testa que get aguarda até um frame chegar"""
+    slot = LatestFrameSlot()
+
+    pending = asyncio.create_task(slot.get())
+    await asyncio.sleep(0)
+    assert not pending.done()
+
+    slot.put(b'frame', 1.0)
+    frame, _, _ = await pending
+
+    assert frame == b'frame'
+
+
+@pytest.mark.asyncio
+async def test_latest_frame_slot_raises_after_close():
+    """Testa que o erro da recepção é propagado após o fechamento"""
+    slot = LatestFrameSlot()
+    slot.close(WebSocketDisconnect())
+
+    with pytest.raises(WebSocketDisconnect):
+        await slot.get()
@@ -0,0 +1,186 @@
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+from focus_track_api.services.frame_pipeline import (
+    FrameDecoder,
+    FramePipeline,
+    PipelineConfig,
+    ResolutionPolicy,
+    jpeg_frame_size,
+    reduced_decode_factor,
+)
+from focus_track_api.services.monitor_protocol import encode_raw_frame
+from focus_track_api.services.pose_estimation import HeadPoseEstimator
+from focus_track_api.services.session_metrics import SessionMetrics
+from focus_track_api.settings import Settings
+from tests.landmarks import make_landmarks
+
+FRAME_WIDTH = 1280
+FRAME_HEIGHT = 720
+MAX_DECODE_WIDTH = 640
+HALF_SIZE_FACTOR = 2
+MAX_REDUCTION_FACTOR = 8
+# Distância interocular alvo; o rosto sintético tem ~200 px em 1280x720
+TARGET_INTEROCULAR = 40
+LARGE_FACE_FACTOR = 4
+SMALL_FACE_SIZE = (640, 480)
+
+
+def _encode(width=FRAME_WIDTH, height=FRAME_HEIGHT, ext='.jpg'):
+    img = np.full((height, width, 3), 127, dtype=np.uint8)
+    _, encoded = cv2.imencode(ext, img)
+    return encoded.tobytes()
+
+
+def test_jpeg_frame_size_reads_header():
+    """Testa a leitura das dimensões do cabeçalho JPEG"""
+    assert jpeg_frame_size(_encode()) == (FRAME_WIDTH, FRAME_HEIGHT)
+
+
+def test_jpeg_frame_size_ignores_other_formats():
+    """Testa que formatos que não são JPEG retornam None"""
+    assert jpeg_frame_size(_encode(ext='.png')) is None
+
+
+def test_reduced_decode_factor():
+    """Testa a escolha do fator de redução da decodificação"""
+    assert reduced_decode_factor(FRAME_WIDTH, 0) == 1
+    assert (
+        reduced_decode_factor(FRAME_WIDTH, MAX_DECODE_WIDTH)
+        == HALF_SIZE_FACTOR
+    )
+    assert (
+        reduced_decode_factor(FRAME_WIDTH * 100, MAX_DECODE_WIDTH)
+        == MAX_REDUCTION_FACTOR
+    )
+
+
+def test_frame_decoder_decodes_to_three_channel_gray():
+    """Testa que o frame é decodificado em cinza replicado em 3 canais"""
+    decoder = FrameDecoder()
+
+    image, frame_size = decoder.decode(_encode())
+
+    assert frame_size == (FRAME_WIDTH, FRAME_HEIGHT)
+    assert image.shape == (FRAME_HEIGHT, FRAME_WIDTH, 3)
+    assert np.array_equal(image[..., 0], image[..., 2])
+
+
+def test_frame_decoder_reduced_decode_keeps_original_size():
+    """Testa que a decodificação reduzida preserva o tamanho original"""
+    decoder = FrameDecoder(max_decode_width=MAX_DECODE_WIDTH)
+
+    image, frame_size = decoder.decode(_encode())
+
+    assert frame_size == (FRAME_WIDTH, FRAME_HEIGHT)
+    assert image.shape == (FRAME_HEIGHT // 2, FRAME_WIDTH // 2, 3)
+
+
+def test_frame_decoder_reuses_output_buffer():
+    """Testa que o buffer de saída é reaproveitado entre frames"""
+    decoder = FrameDecoder()
+    data = _encode()
+
+    first, _ = decoder.decode(data)
+    second, _ = decoder.decode(data)
+
+    assert first is second
+
+
+def test_frame_decoder_applies_session_scale_factor():
+    """Testa a redução pedida pela sessão em JPEGs e frames brutos"""
+    decoder = FrameDecoder()
+    raw = encode_raw_frame(np.zeros((FRAME_HEIGHT, FRAME_WIDTH), np.uint8))
+
+    image, frame_size = decoder.decode(_encode(), HALF_SIZE_FACTOR)
+    raw_image, raw_size = decoder.decode(raw, HALF_SIZE_FACTOR)
+
+    assert frame_size == raw_size == (FRAME_WIDTH, FRAME_HEIGHT)
+    assert image.shape == (FRAME_HEIGHT // 2, FRAME_WIDTH // 2, 3)
+    assert raw_image.shape == image.shape
+
+
+def test_resolution_policy_follows_face_size():
+    """Testa que rostos grandes são reduzidos e rostos pequenos não"""
+    frame_size = (FRAME_WIDTH, FRAME_HEIGHT)
+    policy = ResolutionPolicy(TARGET_INTEROCULAR)
+
+    factor = policy.update(make_landmarks(frame_size=frame_size), frame_size)
+    assert factor == LARGE_FACE_FACTOR
+
+    # Rosto com metade do tamanho: a redução volta a preservar o alvo
+    small = make_landmarks()
+    small[:, :2] = 0.5 + (small[:, :2] - 0.5) / HALF_SIZE_FACTOR
+    assert policy.update(small, frame_size) == HALF_SIZE_FACTOR
+
+    policy.reset()
+    assert policy.factor == 1
+
+
+def test_resolution_policy_disabled_by_default():
+    """Testa que sem alvo a resolução do cliente é mantida"""
+    frame_size = (FRAME_WIDTH, FRAME_HEIGHT)
+    policy = ResolutionPolicy()
+
+    assert (
+        policy.update(make_landmarks(frame_size=frame_size), frame_size) == 1
+    )
+
+
+def test_frame_pipeline_reports_adaptive_processing_size():
+    """Testa que o pipeline reduz os frames seguintes e informa o tamanho"""
+    frame_size = (FRAME_WIDTH, FRAME_HEIGHT)
+    landmarks = make_landmarks(frame_size=frame_size)
+    points = [SimpleNamespace(x=x, y=y, z=z) for x, y, z in landmarks.tolist()]
+    result = SimpleNamespace(
+        multi_face_landmarks=[SimpleNamespace(landmark=points)]
+    )
+    pipeline = FramePipeline(
+        PipelineConfig(target_interocular=TARGET_INTEROCULAR)
+    )
+    pipeline._face_mesh = SimpleNamespace(process=lambda image: result)
+    metrics = SessionMetrics()
+
+    for _ in range(2):
+        analysis = pipeline.process(_encode())
+        metrics.record_processing_size(analysis.processing_size)
+
+    reduced = (
+        FRAME_WIDTH // LARGE_FACE_FACTOR,
+        FRAME_HEIGHT // LARGE_FACE_FACTOR,
+    )
+    assert analysis.processing_size == reduced
+    assert analysis.yaw is not None
+    resolutions = {
+        f'{FRAME_WIDTH}x{FRAME_HEIGHT}': 1,
+        f'{reduced[0]}x{reduced[1]}': 1,
+    }
+    assert metrics.processing_resolutions() == resolutions
+    assert metrics.summary()['processing_resolutions'] == resolutions
+
+
+def test_head_pose_camera_follows_frame_size():
+    """Testa que a câmera é recalculada quando o tamanho do frame muda"""
+    estimator = HeadPoseEstimator()
+    frame_size = (FRAME_WIDTH, FRAME_HEIGHT)
+
+    estimator.get_pose(None, make_landmarks(), SMALL_FACE_SIZE)
+    _, _, _, yaw = estimator.get_pose(
+        None, make_landmarks(frame_size=frame_size), frame_size
+    )
+
+    assert estimator.camera_matrix[0, 2] == FRAME_WIDTH // 2
+    assert estimator.pcf.frame_width == FRAME_WIDTH
+    assert abs(yaw.item()) < 1.0
+
+
+def test_pose_defaults_match_settings():
+    """Testa que PipelineConfig e Settings usam a mesma pose padrão"""
+    config = PipelineConfig()
+    fields = Settings.model_fields
+
+    assert config.pose_solver == fields['CV_POSE_SOLVER'].default
+    assert config.pose_warm_start == fields['CV_POSE_WARM_START'].default
+    assert config.pose_refine == fields['CV_POSE_REFINE'].default
@@ -0,0 +1,185 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from focus_track_api.schemas.attention import (
+    AttentionMetrics,
+    FaceLandmarks,
+    FrameMetrics,
+    Point2D,
+)
+from focus_track_api.schemas.monitor import MonitorOptions
+from focus_track_api.services.frame_response import FrameResponder, FrameResult
+from focus_track_api.services.monitor_protocol import (
+    FRAME_RESPONSE_HEADER,
+    decode_batch_response,
+    decode_frame_response,
+)
+from focus_track_api.utils.constants import FACE_REGIONS
+from focus_track_api.utils.utils import region_points, split_regions
+from tests.landmarks import FRAME_SIZE, make_landmarks
+
+FATIGUE_SCORE = 12.5
+DISTRACTION_SCORE = 40.0
+ATTENTION_SCORE = 80.25
+TIME_ON_SCREEN = 93.5
+PAUSED_TIME = 4.0
+FRAMES_COALESCED = 2
+PAUSED_AT = datetime(2025, 1, 1, 12, 30, tzinfo=timezone.utc)
+EYE_REGIONS = ('left_iris', 'left_eye')
+# Precisão das coordenadas no JSON (centésimo de pixel)
+JSON_PRECISION = 0.005
+
+
+def _result(landmark_points=None, **kwargs):
+    return FrameResult(
+        fatigue_score=FATIGUE_SCORE,
+        distraction_score=DISTRACTION_SCORE,
+        attention_score=ATTENTION_SCORE,
+        time_on_screen=TIME_ON_SCREEN,
+        landmark_points=landmark_points,
+        **kwargs,
+    )
+
+
+def _pydantic_payload(points):
+    """Payload montado pelo caminho antigo, com FrameMetrics"""
+    return FrameMetrics(
+        landmarks=FaceLandmarks(**{
+            region: [Point2D(x=x, y=y) for x, y in coords.tolist()]
+            for region, coords in split_regions(points).items()
+        }),
+        attention_metrics=AttentionMetrics(
+            fatigue_score=FATIGUE_SCORE,
+            distraction_score=DISTRACTION_SCORE,
+            attention_score=ATTENTION_SCORE,
+            time_on_screen=TIME_ON_SCREEN,
+        ),
+    ).model_dump()
+
+
+def test_json_matches_frame_metrics_schema():
+    """Testa que o encoder JSON gera o mesmo documento do FrameMetrics"""
+    points = region_points(make_landmarks(), FRAME_SIZE)
+
+    payload = json.loads(FrameResponder().respond(_result(points)))
+    expected = _pydantic_payload(points)
+
+    assert payload['attention_metrics'] == expected['attention_metrics']
+    assert payload['frames_coalesced'] == 0
+    assert 'session_status' not in payload
+    for region, expected_points in expected['landmarks'].items():
+        assert payload['landmarks'][region] == [
+            {
+                'x': pytest.approx(point['x'], abs=JSON_PRECISION),
+                'y': pytest.approx(point['y'], abs=JSON_PRECISION),
+            }
+            for point in expected_points
+        ]
+
+
+def test_json_includes_session_fields():
+    """Testa os campos de status da sessão no JSON"""
+    result = _result(
+        session_status='paused',
+        total_paused_time=PAUSED_TIME,
+        paused_at=PAUSED_AT,
+        frames_coalesced=FRAMES_COALESCED,
+    )
+
+    payload = json.loads(FrameResponder().respond(result))
+
+    assert payload['landmarks'] is None
+    assert payload['session_status'] == 'paused'
+    assert payload['total_paused_time'] == PAUSED_TIME
+    assert payload['paused_at'] == PAUSED_AT.isoformat()
+    assert payload['frames_coalesced'] == FRAMES_COALESCED
+
+
+def test_json_only_selected_regions():
+    """Testa que o JSON traz apenas as regiões pedidas"""
+    responder = FrameResponder(MonitorOptions(regions=EYE_REGIONS))
+    points = region_points(
+        make_landmarks(), FRAME_SIZE, responder.regions_index
+    )
+
+    payload = json.loads(responder.respond(_result(points)))
+
+    assert payload['landmarks']['left_eye'] is not None
+    assert payload['landmarks']['face_boundary'] is None
+
+
+def test_binary_response_from_result():
+    """Testa a resposta binária montada a partir do FrameResult"""
+    responder = FrameResponder(MonitorOptions(encoding='binary'))
+    result = _result(session_status='paused', paused_at=PAUSED_AT)
+
+    decoded = decode_frame_response(responder.respond(result))
+
+    assert decoded['session_status'] == 'paused'
+    assert decoded['paused_at'] == PAUSED_AT.timestamp()
+
+
+def test_binary_response_carries_regions_mask():
+    """Testa a máscara das regiões enviadas no cabeçalho binário"""
+    responder = FrameResponder(
+        MonitorOptions(encoding='binary', regions=EYE_REGIONS)
+    )
+    points = region_points(
+        make_landmarks(), FRAME_SIZE, responder.regions_index
+    )
+
+    decoded = decode_frame_response(responder.respond(_result(points)))
+    without_landmarks = decode_frame_response(responder.respond(_result()))
+
+    names = list(FACE_REGIONS)
+    assert decoded['regions_mask'] == sum(
+        1 << names.index(region) for region in EYE_REGIONS
+    )
+    assert len(decoded['landmark_points']) == len(points)
+    assert without_landmarks['regions_mask'] == 0
+    assert len(without_landmarks['landmark_points']) == 0
+
+
+def test_delta_response_without_landmarks():
+    """Testa a resposta do modo delta para um frame sem landmarks"""
+    responder = FrameResponder(MonitorOptions(encoding='delta'))
+
+    data = responder.respond(_result())
+
+    assert len(data) == FRAME_RESPONSE_HEADER.size
+
+
+def test_json_batch_response():
+    """Testa o lote JSON com um frame pontuado e um erro"""
+    responder = FrameResponder()
+    error = {'error': 'PROCESSING_ERROR', 'type': 'PROCESSING'}
+
+    payload = json.loads(
+        responder.respond_batch(
+            [responder.respond(_result()), error], FRAMES_COALESCED
+        )
+    )
+
+    assert payload['frames_coalesced'] == FRAMES_COALESCED
+    assert payload['batch'][0]['attention_metrics']['attention_score'] == (
+        ATTENTION_SCORE
+    )
+    assert payload['batch'][1] == error
+
+
+def test_binary_batch_response():
+    """Testa o lote binário com as respostas FTFR de cada frame"""
+    responder = FrameResponder(MonitorOptions(encoding='binary'))
+    results = [_result(), _result(session_status='active')]
+
+    responses, frames_coalesced = decode_batch_response(
+        responder.respond_batch([responder.respond(r) for r in results])
+    )
+
+    assert frames_coalesced == 0
+    assert [decode_frame_response(r)['session_status'] for r in responses] == [
+        None,
+        'active',
+    ]
@@ -0,0 +1,138 @@
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+
+from focus_track_api.services.frame_pipeline import (
+    FramePipeline,
+    PipelineConfig,
+)
+from focus_track_api.services.landmark_tracker import (
+    LandmarkTracker,
+    tracked_landmarks,
+)
+from focus_track_api.services.monitor_protocol import encode_raw_frame
+from focus_track_api.services.pose_estimation import HeadPoseEstimator
+from tests.landmarks import FRAME_SIZE, make_landmarks
+
+TRACKING_INTERVAL = 3
+SHIFT = (2.0, -1.5)
+# Erro máximo (px) aceito para um deslocamento puro da textura
+MAX_ERROR = 0.2
+FRAMES = 6
+
+
+def _texture(seed=0):
+    rng = np.random.default_rng(seed)
+    width, height = FRAME_SIZE
+    noise = rng.integers(0, 256, (height, width), dtype=np.uint8)
+    return cv2.GaussianBlur(noise, (0, 0), 2.0)
+
+
+def _shifted(image, dx, dy):
+    transform = np.float32([[1, 0, dx], [0, 1, dy]])
+    return cv2.warpAffine(image, transform, FRAME_SIZE)
+
+
+def _shifted_landmarks(landmarks, dx, dy):
+    moved = landmarks.copy()
+    moved[:, :2] += np.float32((dx, dy)) / FRAME_SIZE
+    return moved
+
+
+def _tracker(interval=TRACKING_INTERVAL):
+    return LandmarkTracker(
+        tracked_landmarks(HeadPoseEstimator().model_lms_ids), interval
+    )
+
+
+class FakeFaceMesh:
+    def __init__(self, landmarks):
+        self.landmarks = landmarks
+        self.calls = 0
+
+    def process(self, image):
+        self.calls += 1
+        points = [
+            SimpleNamespace(x=x, y=y, z=z)
+            for x, y, z in self.landmarks.tolist()
+        ]
+        return SimpleNamespace(
+            multi_face_landmarks=[SimpleNamespace(landmark=points)]
+        )
+
+
+def test_tracker_follows_moving_frame():
+    """Testa que os landmarks acompanham o deslocamento do frame"""
+    tracker = _tracker()
+    landmarks = make_landmarks().astype(np.float32)
+    texture = _texture()
+    tracker.reset(texture, landmarks)
+
+    tracked = tracker.track(
+        _shifted(texture, *SHIFT), np.empty_like(landmarks)
+    )
+
+    expected = _shifted_landmarks(landmarks, *SHIFT)
+    error = np.abs((tracked[:, :2] - expected[:, :2]) * FRAME_SIZE)
+    assert error.max() < MAX_ERROR
+    assert tracked[:, 2] == pytest.approx(landmarks[:, 2], abs=1e-3)
+
+
+def test_tracker_requests_face_mesh_every_interval():
+    """Testa que o FaceMesh volta a rodar a cada `interval` frames"""
+    tracker = _tracker()
+    landmarks = make_landmarks().astype(np.float32)
+    texture = _texture()
+    out = np.empty_like(landmarks)
+    tracker.reset(texture, landmarks)
+
+    results = [tracker.track(texture, out) for _ in range(TRACKING_INTERVAL)]
+
+    assert all(r is not None for r in results[:-1])
+    assert results[-1] is None
+
+
+def test_tracker_falls_back_on_drift():
+    """Testa que uma troca de cena derruba o rastreamento"""
+    tracker = _tracker()
+    landmarks = make_landmarks().astype(np.float32)
+    tracker.reset(_texture(), landmarks)
+
+    tracked = tracker.track(_texture(seed=1), np.empty_like(landmarks))
+
+    assert tracked is None
+    assert tracker.drift_resets == 1
+    assert tracker.track(_texture(), np.empty_like(landmarks)) is None
+
+
+def test_tracker_disabled_by_default():
+    """Testa que com intervalo 1 o FaceMesh roda em todos os frames"""
+    tracker = _tracker(interval=1)
+    landmarks = make_landmarks().astype(np.float32)
+    tracker.reset(_texture(), landmarks)
+
+    assert tracker.track(_texture(), np.empty_like(landmarks)) is None
+
+
+def test_frame_pipeline_tracks_between_face_mesh_runs():
+    """Testa que o pipeline só chama o FaceMesh a cada N frames"""
+    landmarks = make_landmarks()
+    pipeline = FramePipeline(
+        PipelineConfig(tracking_interval=TRACKING_INTERVAL)
+    )
+    pipeline._face_mesh = face_mesh = FakeFaceMesh(landmarks)
+    texture = _texture()
+
+    analyses = [
+        pipeline.process(encode_raw_frame(texture)) for _ in range(FRAMES)
+    ]
+
+    assert face_mesh.calls == FRAMES // TRACKING_INTERVAL
+    assert pipeline.tracker.tracked_frames == FRAMES - face_mesh.calls
+    assert all(a.face_detected for a in analyses)
+    assert analyses[1].ear == pytest.approx(analyses[0].ear, rel=1e-3)
+    assert np.allclose(
+        analyses[1].landmark_points, analyses[0].landmark_points, atol=0.1
+    )
@@ -0,0 +1,443 @@
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from focus_track_api.schemas.monitor import MonitorOptions
+from focus_track_api.services.eye_detector import EyeDetector
+from focus_track_api.services.frame_pipeline import (
+    FrameDecoder,
+    FramePipeline,
+    PipelineConfig,
+)
+from focus_track_api.services.monitor_protocol import (
+    CLIENT_CLOCK_TOLERANCE,
+    FRAME_DELTA_MAGIC,
+    FRAME_RESPONSE_HEADER,
+    FRAME_RESPONSE_MAGIC,
+    LANDMARK_COUNT,
+    LANDMARK_SUBPIXELS,
+    PIXEL_FORMAT_GRAY,
+    PIXEL_FORMAT_RGB,
+    RAW_FRAME_HEADER,
+    ClientClock,
+    FrameTimer,
+    LandmarkDeltaStream,
+    apply_frame_delta,
+    decode_batch_response,
+    decode_frame_response,
+    encode_batch_response,
+    encode_envelope,
+    encode_frame_response,
+    encode_landmarks_message,
+    encode_raw_frame,
+    is_landmarks_message,
+    is_raw_frame,
+    landmarks_capture_time,
+    parse_envelope,
+    parse_landmarks_message,
+    parse_raw_frame,
+    split_frames,
+)
+from focus_track_api.utils.constants import LEFT_EYE, LEFT_IRIS
+from focus_track_api.utils.utils import FACE_REGIONS_INDEX, region_points
+from tests.landmarks import FRAME_SIZE, make_landmarks
+
+FRAME_WIDTH = 64
+FRAME_HEIGHT = 48
+CAPTURED_AT = 12.5
+SERVER_TIME = 1000.0
+HEAD_YAW = 15.0
+FATIGUE_SCORE = 12.5
+DISTRACTION_SCORE = 40.0
+ATTENTION_SCORE = 80.25
+TIME_ON_SCREEN = 93.5
+PAUSED_TIME = 4.0
+PAUSED_AT = 1_760_000_000.5
+FRAMES_COALESCED = 3
+KEYFRAME_INTERVAL = 5
+DELTA_TOLERANCE = 0.5
+SMALL_MOVE = 0.25
+LARGE_MOVE = 3.0
+JUMP = 100.0
+LANDMARKS_EVERY = 3
+EYE_REGIONS = ('left_iris', 'left_eye')
+FRAME_INTERVAL = 0.25
+ENVELOPE_FRAMES = 3
+# Instante (s) de um relógio de cliente absurdamente adiantado
+FAR_FUTURE = 1e12
+
+
+def _image(channels=None):
+    shape = (FRAME_HEIGHT, FRAME_WIDTH)
+    if channels:
+        shape = (*shape, channels)
+    return (
+        np
+        .arange(np.prod(shape), dtype=np.uint32)
+        .astype(np.uint8)
+        .reshape(shape)
+    )
+
+
+def test_parse_raw_rgb_frame_is_zero_copy():
+    """Testa que o frame RGB bruto é uma view sobre os bytes recebidos"""
+    image = _image(channels=3)
+    data = encode_raw_frame(image)
+
+    parsed, pixel_format = parse_raw_frame(data)
+
+    assert is_raw_frame(data)
+    assert pixel_format == PIXEL_FORMAT_RGB
+    assert np.array_equal(parsed, image)
+    assert not parsed.flags.owndata
+    assert not parsed.flags.writeable
+
+
+def test_parse_raw_gray_frame():
+    """Testa a leitura de um frame bruto em tons de cinza"""
+    image = _image()
+
+    parsed, pixel_format = parse_raw_frame(encode_raw_frame(image))
+
+    assert pixel_format == PIXEL_FORMAT_GRAY
+    assert np.array_equal(parsed, image)
+
+
+def test_parse_raw_frame_rejects_wrong_payload_size():
+    """Testa que um payload com tamanho incorreto é rejeitado"""
+    data = encode_raw_frame(_image())[:-1]
+
+    with pytest.raises(ValueError, match='esperados'):
+        parse_raw_frame(data)
+
+
+def test_parse_raw_frame_rejects_unknown_pixel_format():
+    """Testa que formatos de pixel desconhecidos são rejeitados"""
+    data = bytearray(encode_raw_frame(_image()))
+    data[RAW_FRAME_HEADER.size - 4] = 9
+
+    with pytest.raises(ValueError, match='Formato de pixel'):
+        parse_raw_frame(bytes(data))
+
+
+def test_frame_decoder_accepts_raw_frames():
+    """Testa que o FrameDecoder aceita frames brutos cinza e RGB"""
+    decoder = FrameDecoder()
+
+    rgb, rgb_size = decoder.decode(encode_raw_frame(_image(channels=3)))
+    gray, gray_size = decoder.decode(encode_raw_frame(_image()))
+
+    assert rgb_size == gray_size == (FRAME_WIDTH, FRAME_HEIGHT)
+    assert rgb.shape == gray.shape == (FRAME_HEIGHT, FRAME_WIDTH, 3)
+    assert np.array_equal(gray[..., 1], _image())
+
+
+def test_landmarks_message_roundtrip():
+    """Testa a serialização e leitura de uma mensagem de landmarks"""
+    landmarks = make_landmarks()
+
+    data = encode_landmarks_message(landmarks, CAPTURED_AT, FRAME_SIZE)
+    captured_at, frame_size, parsed = parse_landmarks_message(data)
+
+    assert is_landmarks_message(data)
+    assert landmarks_capture_time(data) == CAPTURED_AT
+    assert captured_at == CAPTURED_AT
+    assert frame_size == FRAME_SIZE
+    assert parsed.shape == (LANDMARK_COUNT, 3)
+    assert np.allclose(parsed, landmarks, atol=1e-6)
+
+
+def test_landmarks_message_without_face():
+    """Testa que uma mensagem sem landmarks indica rosto não detectado"""
+    data = encode_landmarks_message(None, CAPTURED_AT, FRAME_SIZE)
+
+    _, _, parsed = parse_landmarks_message(data)
+
+    assert parsed is None
+
+
+def test_landmarks_message_rejects_wrong_count():
+    """Testa que uma quantidade incorreta de landmarks é rejeitada"""
+    data = encode_landmarks_message(make_landmarks()[:468], 0.0, FRAME_SIZE)
+
+    with pytest.raises(ValueError, match='esperados'):
+        parse_landmarks_message(data)
+
+
+def test_client_clock_keeps_client_intervals():
+    """Testa que os intervalos do cliente são preservados no relógio local"""
+    clock = ClientClock()
+
+    first = clock.to_server_time(CAPTURED_AT, SERVER_TIME)
+    second = clock.to_server_time(CAPTURED_AT + 0.5, SERVER_TIME + 0.9)
+
+    assert first == SERVER_TIME
+    assert second == pytest.approx(SERVER_TIME + 0.5)
+
+
+def test_frame_pipeline_scores_client_landmarks():
+    """Testa que landmarks do cliente geram as mesmas métricas do servidor"""
+    pipeline = FramePipeline()
+    landmarks = make_landmarks(yaw=HEAD_YAW)
+
+    analysis = pipeline.process(
+        encode_landmarks_message(landmarks, CAPTURED_AT, FRAME_SIZE)
+    )
+
+    assert analysis.face_detected
+    assert analysis.ear == pytest.approx(
+        EyeDetector().get_EAR(landmarks.astype(np.float32)), rel=1e-5
+    )
+    assert analysis.yaw == pytest.approx(HEAD_YAW, abs=1.0)
+    assert len(analysis.landmark_points) == len(FACE_REGIONS_INDEX.index)
+
+
+def test_frame_pipeline_client_landmarks_without_face():
+    """Testa que a ausência de landmarks é tratada como rosto não detectado"""
+    pipeline = FramePipeline()
+
+    analysis = pipeline.process(
+        encode_landmarks_message(None, CAPTURED_AT, FRAME_SIZE)
+    )
+
+    assert not analysis.face_detected
+
+
+def test_frame_response_round_trip():
+    """Testa a codificação binária das métricas e dos landmarks"""
+    points = np.random.default_rng(0).uniform(0, 640, (30, 2))
+
+    data = encode_frame_response(
+        points,
+        FATIGUE_SCORE,
+        DISTRACTION_SCORE,
+        ATTENTION_SCORE,
+        TIME_ON_SCREEN,
+        'paused',
+        PAUSED_TIME,
+        PAUSED_AT,
+        FRAMES_COALESCED,
+    )
+    decoded = decode_frame_response(data)
+
+    assert len(data) == FRAME_RESPONSE_HEADER.size + points.size * 2
+    assert np.allclose(
+        decoded['landmark_points'], points, atol=0.5 / LANDMARK_SUBPIXELS
+    )
+    assert decoded['attention_score'] == ATTENTION_SCORE
+    assert decoded['session_status'] == 'paused'
+    assert decoded['paused_at'] == PAUSED_AT
+    assert decoded['frames_coalesced'] == FRAMES_COALESCED
+
+
+def test_frame_response_without_session():
+    """Testa a resposta binária sem sessão de estudo associada"""
+    data = encode_frame_response(
+        np.zeros((0, 2)),
+        FATIGUE_SCORE,
+        DISTRACTION_SCORE,
+        ATTENTION_SCORE,
+        TIME_ON_SCREEN,
+    )
+    decoded = decode_frame_response(data)
+
+    assert decoded['session_status'] is None
+    assert decoded['paused_at'] is None
+    assert len(decoded['landmark_points']) == 0
+
+
+def _delta_stream_points():
+    return region_points(make_landmarks(), FRAME_SIZE)
+
+
+def _encode_delta(stream, points):
+    return stream.encode(
+        points,
+        FATIGUE_SCORE,
+        DISTRACTION_SCORE,
+        ATTENTION_SCORE,
+        TIME_ON_SCREEN,
+    )
+
+
+def test_delta_stream_sends_only_moved_regions():
+    """Testa que regiões paradas são omitidas e as demais reconstruídas"""
+    stream = LandmarkDeltaStream(KEYFRAME_INTERVAL, DELTA_TOLERANCE)
+    points = _delta_stream_points()
+    start, stop = FACE_REGIONS_INDEX.slices['left_iris']
+
+    keyframe = _encode_delta(stream, points)
+    state = apply_frame_delta(keyframe, None)['landmark_points']
+
+    moved = points + SMALL_MOVE
+    moved[start:stop] += LARGE_MOVE
+    delta = _encode_delta(stream, moved)
+    reconstructed = apply_frame_delta(delta, state)['landmark_points']
+
+    assert keyframe.startswith(FRAME_RESPONSE_MAGIC)
+    assert delta.startswith(FRAME_DELTA_MAGIC)
+    assert len(delta) == FRAME_RESPONSE_HEADER.size + (stop - start) * 2
+    assert np.allclose(
+        reconstructed[start:stop], moved[start:stop], atol=SMALL_MOVE
+    )
+    assert np.array_equal(reconstructed[:start], state[:start])
+
+
+def test_delta_stream_keyframes():
+    """Testa keyframes periódicos, após saltos grandes e a pedido"""
+    stream = LandmarkDeltaStream(KEYFRAME_INTERVAL, DELTA_TOLERANCE)
+    points = _delta_stream_points()
+
+    frames = [_encode_delta(stream, points) for _ in range(KEYFRAME_INTERVAL)]
+    jumped = _encode_delta(stream, points + JUMP)
+    _encode_delta(stream, points + JUMP)
+    stream.request_resync()
+    resynced = _encode_delta(stream, points + JUMP)
+
+    kinds = [frame[:4] for frame in frames]
+    assert kinds == [FRAME_RESPONSE_MAGIC] + [FRAME_DELTA_MAGIC] * (
+        KEYFRAME_INTERVAL - 1
+    )
+    assert jumped.startswith(FRAME_RESPONSE_MAGIC)
+    assert resynced.startswith(FRAME_RESPONSE_MAGIC)
+
+
+def test_monitor_options_from_query_string():
+    """Testa a leitura das opções de resposta da query string"""
+    options = MonitorOptions.model_validate({
+        'token': 'abc',
+        'encoding': 'binary',
+        'regions': 'left_iris, left_eye',
+        'landmarks_every': str(LANDMARKS_EVERY),
+    })
+
+    assert options.encoding == 'binary'
+    assert options.landmark_regions == ('left_eye', 'left_iris')
+    assert options.landmarks_every == LANDMARKS_EVERY
+    assert MonitorOptions(metrics_only=True).landmark_regions == ()
+
+
+@pytest.mark.parametrize(
+    'query',
+    [
+        {'regions': 'left_eye,ears'},
+        {'encoding': 'xml'},
+        {'landmarks_every': 0},
+    ],
+)
+def test_monitor_options_rejects_invalid_values(query):
+    """Testa que opções inválidas são rejeitadas"""
+    with pytest.raises(ValidationError):
+        MonitorOptions.model_validate(query)
+
+
+def test_frame_pipeline_extracts_selected_regions_every_n_frames():
+    """Testa que só as regiões pedidas são extraídas, a cada N frames"""
+    pipeline = FramePipeline(
+        PipelineConfig(regions=EYE_REGIONS, landmarks_every=LANDMARKS_EVERY)
+    )
+    message = encode_landmarks_message(
+        make_landmarks(), CAPTURED_AT, FRAME_SIZE
+    )
+
+    analyses = [pipeline.process(message) for _ in range(LANDMARKS_EVERY)]
+
+    assert len(analyses[0].landmark_points) == len(LEFT_EYE) + len(LEFT_IRIS)
+    assert all(a.landmark_points is None for a in analyses[1:])
+    assert all(a.ear is not None for a in analyses)
+
+
+def test_envelope_round_trip():
+    """Testa que o envelope preserva a ordem e os instantes dos frames"""
+    frames = [
+        (CAPTURED_AT + i * FRAME_INTERVAL, bytes([i]) * (i + 1))
+        for i in range(ENVELOPE_FRAMES)
+    ]
+
+    assert parse_envelope(encode_envelope(frames)) == frames
+    assert split_frames(encode_envelope(frames)) == frames
+
+
+@pytest.mark.parametrize(
+    'data',
+    [
+        encode_envelope([]),
+        encode_envelope([(CAPTURED_AT, b'abc')])[:-1],
+        encode_envelope([(CAPTURED_AT, b'abc')]) + b'x',
+    ],
+)
+def test_envelope_rejects_invalid_data(data):
+    """Testa envelopes vazios, truncados e com bytes excedentes"""
+    with pytest.raises(ValueError, match='Envelope inválido'):
+        parse_envelope(data)
+
+
+def test_split_frames_single_message():
+    """Testa que mensagens avulsas resultam em um único frame"""
+    message = encode_landmarks_message(None, CAPTURED_AT, FRAME_SIZE)
+
+    assert split_frames(message) == [(CAPTURED_AT, message)]
+    assert split_frames(b'jpeg') == [(None, b'jpeg')]
+
+
+def test_frame_timer_uses_capture_times():
+    """Testa que o FPS dos frames de um envelope vem dos instantes de captura"""
+    timer = FrameTimer(SERVER_TIME - FRAME_INTERVAL)
+
+    ticks = [
+        timer.tick(SERVER_TIME, CAPTURED_AT + i * FRAME_INTERVAL)
+        for i in range(ENVELOPE_FRAMES)
+    ]
+
+    assert [t_now for t_now, _ in ticks] == pytest.approx([
+        SERVER_TIME + i * FRAME_INTERVAL for i in range(ENVELOPE_FRAMES)
+    ])
+    assert all(fps == 1 / FRAME_INTERVAL for _, fps in ticks)
+
+
+def test_frame_timer_never_goes_backwards():
+    """Testa que um instante de captura anterior não faz o tempo voltar"""
+    timer = FrameTimer(SERVER_TIME - FRAME_INTERVAL)
+
+    t_first, fps = timer.tick(SERVER_TIME, CAPTURED_AT)
+    t_back, fps_back = timer.tick(SERVER_TIME, CAPTURED_AT - FRAME_INTERVAL)
+    t_next, _ = timer.tick(SERVER_TIME, CAPTURED_AT + FRAME_INTERVAL)
+
+    assert t_back == t_first
+    assert fps_back == fps
+    assert t_next == pytest.approx(t_first + FRAME_INTERVAL)
+
+
+@pytest.mark.parametrize('jump', [FAR_FUTURE, float('inf'), float('nan')])
+def test_frame_timer_limits_client_clock_jumps(jump):
+    """Testa que um instante de captura adiantado é limitado à recepção"""
+    timer = FrameTimer(SERVER_TIME - FRAME_INTERVAL)
+    timer.tick(SERVER_TIME, CAPTURED_AT)
+
+    t_jump, _ = timer.tick(SERVER_TIME, CAPTURED_AT + jump)
+    t_next, _ = timer.tick(SERVER_TIME + FRAME_INTERVAL)
+
+    assert t_jump == SERVER_TIME + CLIENT_CLOCK_TOLERANCE
+    assert t_next == t_jump
+
+
+def test_batch_response_round_trip():
+    """Testa a resposta em lote com entradas binárias e JSON"""
+    responses = [b'FTFR...', '{"error":"PROCESSING_ERROR"}']
+
+    data = encode_batch_response(responses, FRAMES_COALESCED)
+
+    assert decode_batch_response(data) == (responses, FRAMES_COALESCED)
+
+
+def test_frame_pipeline_process_batch_keeps_order():
+    """Testa que o lote é processado em ordem, como frames avulsos"""
+    pipeline = FramePipeline()
+    frames = [
+        encode_landmarks_message(make_landmarks(), CAPTURED_AT, FRAME_SIZE),
+        encode_landmarks_message(None, CAPTURED_AT, FRAME_SIZE),
+    ]
+
+    analyses = pipeline.process_batch(frames)
+
+    assert [a.face_detected for a in analyses] == [True, False]
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from focus_track_api.services.pose_estimation import HeadPoseEstimator
+from tests.landmarks import FRAME_SIZE, make_landmarks
+
+HEAD_YAW = 15.0
+HEAD_PITCH = 8.0
+FRAMES = 5
+YAW_STEP = 2.0
+# Tolerância (graus) entre solvers para a mesma pose
+ANGLE_TOLERANCE = 0.05
+# Desvio do jitter dos landmarks (px) e tolerância correspondente (graus)
+JITTER_PX = 0.3
+JITTER_ANGLE_TOLERANCE = 0.5
+
+
+def _angles(estimator, landmarks):
+    _, roll, pitch, yaw = estimator.get_pose(None, landmarks, FRAME_SIZE)
+    return np.array([roll.item(), pitch.item(), yaw.item()])
+
+
+@pytest.mark.parametrize(
+    'options',
+    [
+        {'warm_start': True},
+        {'warm_start': True, 'refine': False},
+        {'solver': 'sqpnp'},
+        {'solver': 'sqpnp', 'refine': False},
+        {'solver': 'procrustes'},
+    ],
+)
+def test_headless_modes_match_current_path(options):
+    """Testa que warm start, SQPNP e Procrustes chegam aos mesmos ângulos"""
+    reference = HeadPoseEstimator()
+    estimator = HeadPoseEstimator(headless=True, **options)
+
+    for i in range(FRAMES):
+        landmarks = make_landmarks(
+            yaw=HEAD_YAW + i * YAW_STEP, pitch=HEAD_PITCH
+        )
+        assert _angles(estimator, landmarks) == pytest.approx(
+            _angles(reference, landmarks), abs=ANGLE_TOLERANCE
+        )
+
+
+def test_procrustes_matches_current_path_with_jitter():
+    """
+    Testa o modo Procrustes contra o solvePnP com landmarks ruidosos.
+
+    Os landmarks sintéticos são o próprio modelo canônico rotacionado, então
+    isto só verifica a consistência entre os solvers; a precisão com rostos
+    reais depende de landmarks gravados.
+    """
+    rng = np.random.default_rng(0)
+    reference = HeadPoseEstimator()
+    estimator = HeadPoseEstimator(headless=True, solver='procrustes')
+
+    for i in range(FRAMES):
+        landmarks = make_landmarks(
+            yaw=HEAD_YAW - i * YAW_STEP, pitch=-HEAD_PITCH, roll=i
+        )
+        landmarks[:, :2] += rng.normal(
+            0, JITTER_PX, (len(landmarks), 2)
+        ) / np.asarray(FRAME_SIZE)
+        assert _angles(estimator, landmarks) == pytest.approx(
+            _angles(reference, landmarks), abs=JITTER_ANGLE_TOLERANCE
+        )
+
+
+def test_warm_start_keeps_and_resets_previous_pose():
+    """Testa que o warm start guarda a pose anterior até o reset"""
+    estimator = HeadPoseEstimator(warm_start=True)
+
+    _angles(estimator, make_landmarks(yaw=HEAD_YAW))
+    assert estimator._rvec is not None
+
+    estimator.reset()
+    assert estimator._rvec is None
+
+
+def test_headless_never_draws():
+    """Testa que o modo headless não desenha os eixos no frame"""
+    estimator = HeadPoseEstimator(headless=True)
+    estimator.show_axis = True
+    width, height = FRAME_SIZE
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+
+    estimator.get_pose(frame, make_landmarks(yaw=HEAD_YAW), FRAME_SIZE)
+
+    assert not frame.any()
+
+
+def test_unknown_solver_is_rejected():
+    """Testa que um solver desconhecido é rejeitado na criação"""
+    with pytest.raises(ValueError, match='Unknown pose solver'):
+        HeadPoseEstimator(solver='epnp')
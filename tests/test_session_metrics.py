@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from focus_track_api.services.session_metrics import (
+    ATTENTION_QUANTILES,
+    SCORE_BIN_WIDTH,
+    ScoreHistogram,
+    SessionMetrics,
+)
+
+FRAMES = 20000
+MAX_SCORE = 100.0
+
+
+def _score_stream():
+    rng = np.random.default_rng(0)
+    attention = np.clip(rng.normal(70, 20, FRAMES), 0, MAX_SCORE)
+    fatigue = rng.uniform(0, MAX_SCORE, FRAMES)
+    distraction = rng.uniform(0, MAX_SCORE, FRAMES)
+    return attention, fatigue, distraction
+
+
+def test_summary_matches_full_score_lists():
+    """Testa médias e máximos acumulados contra as listas completas"""
+    attention, fatigue, distraction = _score_stream()
+    metrics = SessionMetrics()
+
+    for a, f, d in zip(
+        attention.tolist(), fatigue.tolist(), distraction.tolist()
+    ):
+        metrics.update(f, d, a)
+    summary = metrics.summary()
+
+    assert (
+        summary['average_attention_score'] == sum(attention.tolist()) / FRAMES
+    )
+    assert summary['average_fatigue'] == sum(fatigue.tolist()) / FRAMES
+    assert summary['average_distraction'] == (
+        sum(distraction.tolist()) / FRAMES
+    )
+    assert summary['max_fatigue'] == fatigue.max()
+    for key, q in ATTENTION_QUANTILES.items():
+        expected = np.quantile(attention, q, method='inverted_cdf')
+        assert summary[key] == pytest.approx(expected, abs=SCORE_BIN_WIDTH)
+
+
+def test_empty_session_summary():
+    """Testa o resumo de uma sessão sem frames"""
+    summary = SessionMetrics().summary()
+
+    assert summary['average_attention_score'] == 0.0
+    assert all(summary[key] == 0.0 for key in ATTENTION_QUANTILES)
+
+
+def test_histogram_has_fixed_size_and_exact_extremes():
+    """Testa que o sketch não cresce e devolve os extremos observados"""
+    histogram = ScoreHistogram()
+    bins = len(histogram.bins)
+
+    for _ in range(FRAMES):
+        histogram.add(MAX_SCORE)
+
+    assert len(histogram.bins) == bins
+    assert histogram.quantile(0.5) == MAX_SCORE
@@ -0,0 +1,174 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from focus_track_api.routers import study_session as study_session_router
+from focus_track_api.services.session_metrics import SessionMetrics
+from focus_track_api.services.session_timeline import (
+    TIMELINE_BUCKET_SECONDS,
+    SessionTimeline,
+    lttb_indices,
+    timeline_from_bytes,
+    timeline_points,
+)
+
+FPS = 20
+SECONDS = 90
+SMALL_CAPACITY = 8
+MAX_POINTS = 30
+# Precisão do float16 para scores de 0 a 100
+FLOAT16_TOLERANCE = 0.05
+GAP_START = 10
+GAP_END = 20
+USER_ID = 1
+# Instante (s) de um relógio de cliente absurdamente adiantado
+FAR_FUTURE = 1e12
+
+
+def _timeline(seconds=SECONDS, capacity=SMALL_CAPACITY):
+    timeline = SessionTimeline(capacity=capacity)
+    for frame in range(seconds * FPS):
+        second = frame // FPS
+        timeline.add(100.0 + frame / FPS, second % 100, 1.0, 2.0)
+    return timeline
+
+
+def test_buckets_average_frames_of_each_second():
+    """Testa as médias por bucket de 1 s, com crescimento da capacidade"""
+    means = _timeline().means()
+
+    assert means.shape == (SECONDS, 3)
+    assert means[:, 0] == pytest.approx(np.arange(SECONDS) % 100)
+    assert means[:, 1:] == pytest.approx(np.tile([1.0, 2.0], (SECONDS, 1)))
+
+
+def test_samples_beyond_max_buckets_are_dropped():
+    """Testa que um instante muito adiantado não faz a linha do tempo crescer"""
+    timeline = SessionTimeline(capacity=SMALL_CAPACITY, max_buckets=MAX_POINTS)
+
+    timeline.add(0.0, 50.0, 0.0, 0.0)
+    timeline.add(FAR_FUTURE, 10.0, 0.0, 0.0)
+    timeline.add(float('nan'), 10.0, 0.0, 0.0)
+    timeline.add(MAX_POINTS - 1.0, 70.0, 0.0, 0.0)
+
+    assert len(timeline._counts) == MAX_POINTS
+    assert timeline.size == MAX_POINTS
+    assert timeline.means()[[0, -1], 0].tolist() == [50.0, 70.0]
+
+
+def test_blob_roundtrip():
+    """Testa que o blob colunar float16 preserva as médias"""
+    timeline = _timeline()
+
+    bucket_seconds, means = timeline_from_bytes(timeline.to_bytes())
+
+    assert bucket_seconds == timeline.bucket_seconds
+    assert means == pytest.approx(timeline.means(), abs=FLOAT16_TOLERANCE)
+
+
+def test_blob_rejects_unknown_format():
+    """Testa que um blob de outro formato é rejeitado"""
+    with pytest.raises(ValueError, match='formato desconhecido'):
+        timeline_from_bytes(b'XXXX' + bytes(8))
+
+
+def test_empty_buckets_are_skipped():
+    """Testa que segundos sem frames não viram pontos"""
+    timeline = SessionTimeline()
+    for second in [*range(GAP_START), *range(GAP_END, SECONDS)]:
+        timeline.add(float(second), 50.0, 0.0, 0.0)
+
+    _, times, means = timeline_points(timeline.to_bytes())
+
+    assert len(times) == SECONDS - (GAP_END - GAP_START)
+    assert not np.isnan(means).any()
+
+
+def test_lttb_keeps_extremes_and_peak():
+    """Testa que o LTTB mantém as pontas e o pico da série"""
+    x = np.arange(SECONDS * 10, dtype=float)
+    y = np.zeros_like(x)
+    peak = len(x) // 3
+    y[peak] = 100.0
+
+    indices = lttb_indices(x, y, MAX_POINTS)
+
+    assert len(indices) == MAX_POINTS
+    assert indices[0] == 0
+    assert indices[-1] == len(x) - 1
+    assert peak in indices
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_session_metrics_fill_timeline_with_frame_time():
+    """Testa que o update com o instante do frame alimenta a linha do tempo"""
+    metrics = SessionMetrics()
+
+    metrics.update(10.0, 20.0, 70.0, t_now=5.0)
+    metrics.update(10.0, 20.0, 90.0, t_now=5.5)
+    metrics.update(10.0, 20.0, 90.0)
+
+    assert metrics.timeline.means().tolist() == [[80.0, 10.0, 20.0]]
+    assert metrics.summary()['average_attention_score'] == pytest.approx(
+        250.0 / 3
+    )
+
+
+def _patch_timeline(monkeypatch, blob):
+    async def fake_get_study_session_timeline(db, session_id):
+        return USER_ID, blob
+
+    monkeypatch.setattr(
+        study_session_router,
+        'get_study_session_timeline',
+        fake_get_study_session_timeline,
+    )
+
+
+async def _get_timeline(max_points=None):
+    return await study_session_router.get_study_session_timeline_endpoint(
+        db=None,
+        current_user=SimpleNamespace(id=USER_ID),
+        session_id=str(uuid4()),
+        max_points=max_points,
+    )
+
+
+@pytest.mark.asyncio
+async def test_timeline_endpoint_without_blob(monkeypatch):
+    """Testa que uma sessão sem linha do tempo retorna colunas vazias"""
+    _patch_timeline(monkeypatch, None)
+
+    timeline = await _get_timeline(MAX_POINTS)
+
+    assert timeline.bucket_seconds == TIMELINE_BUCKET_SECONDS
+    assert timeline.t == []
+    assert timeline.attention == timeline.fatigue == timeline.distraction == []
+
+
+@pytest.mark.asyncio
+async def test_timeline_endpoint_returns_all_buckets(monkeypatch):
+    """Testa que, sem max_points, todos os buckets são retornados"""
+    _patch_timeline(monkeypatch, _timeline().to_bytes())
+
+    timeline = await _get_timeline()
+
+    assert timeline.t == list(map(float, range(SECONDS)))
+    assert timeline.attention == pytest.approx(
+        np.arange(SECONDS) % 100, abs=FLOAT16_TOLERANCE
+    )
+    assert timeline.distraction == pytest.approx([2.0] * SECONDS)
+
+
+@pytest.mark.asyncio
+async def test_timeline_endpoint_reduces_to_max_points(monkeypatch):
+    """Testa que max_points reduz a linha do tempo por LTTB"""
+    _patch_timeline(monkeypatch, _timeline().to_bytes())
+
+    timeline = await _get_timeline(MAX_POINTS)
+
+    assert len(timeline.t) == len(timeline.attention) == MAX_POINTS
+    assert timeline.t[0] == 0.0
+    assert timeline.t[-1] == SECONDS - 1
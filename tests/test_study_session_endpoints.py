@@ -3,10 +3,19 @@ from datetime import datetime, timezone
 import pytest
 from fastapi import status
 
+from focus_track_api.models import CriticalEvent
+from focus_track_api.services.session_timeline import SessionTimeline
 from tests.factories import DailySummaryFactory, StudySessionFactory
 
 # Constantes para valores de teste
 EXPECTED_STUDY_SESSIONS_COUNT = 2
+TIMELINE_SECONDS = 120
+TIMELINE_MAX_POINTS = 20
+TIMELINE_SCORE = 80.0
+EVENTS_START = 1_735_776_000.0
+EVENTS_COUNT = 5
+EVENTS_PAGE = 2
+EVENT_SCORE = 20.0
 
 
 def test_create_study_session_success(client, session, user, token):
@@ -150,6 +159,158 @@ def test_get_study_session_unauthorized(client):
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
 
+async def _session_with_timeline(session, user, frames):
+    """Sessão persistida com a linha do tempo de `frames` segundos"""
+    daily_summary = DailySummaryFactory(user_id=user.id)
+    session.add(daily_summary)
+    await session.commit()
+    await session.refresh(daily_summary)
+
+    timeline = SessionTimeline()
+    for second in range(frames):
+        timeline.add(float(second), TIMELINE_SCORE, 0.0, 0.0)
+    study_session = StudySessionFactory(
+        user_id=user.id,
+        daily_summary_id=daily_summary.id,
+        attention_timeline=timeline.to_bytes(),
+    )
+    session.add(study_session)
+    await session.commit()
+    await session.refresh(study_session)
+    return study_session
+
+
+@pytest.mark.asyncio
+async def test_get_study_session_timeline_success(
+    client, session, user, token
+):
+    """Testa a linha do tempo persistida da sessão"""
+    study_session = await _session_with_timeline(
+        session, user, TIMELINE_SECONDS
+    )
+
+    response = client.get(
+        f'/study-session/{study_session.id}/timeline',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data['bucket_seconds'] == 1.0
+    assert len(data['t']) == TIMELINE_SECONDS
+    assert data['attention'] == [TIMELINE_SCORE] * TIMELINE_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_get_study_session_timeline_downsampled(
+    client, session, user, token
+):
+    """Testa a redução da linha do tempo a `max_points` pontos"""
+    study_session = await _session_with_timeline(
+        session, user, TIMELINE_SECONDS
+    )
+
+    response = client.get(
+        f'/study-session/{study_session.id}/timeline',
+        params={'max_points': TIMELINE_MAX_POINTS},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert len(data['t']) == TIMELINE_MAX_POINTS
+    assert data['t'][0] == 0.0
+    assert data['t'][-1] == TIMELINE_SECONDS - 1
+
+
+@pytest.mark.asyncio
+async def test_get_study_session_timeline_of_other_user(
+    client, session, other_user, token
+):
+    """Testa que a linha do tempo de outro usuário não é exposta"""
+    study_session = await _session_with_timeline(session, other_user, 1)
+
+    response = client.get(
+        f'/study-session/{study_session.id}/timeline',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def _session_with_events(session, user, count):
+    """Sessão persistida com `count` eventos, um a cada 60 s"""
+    study_session = await _session_with_timeline(session, user, 1)
+    session.add_all([
+        CriticalEvent(
+            session_id=study_session.id,
+            user_id=user.id,
+            timestamp=EVENTS_START + 60 * i,
+            type='attention',
+            level='critical',
+            score=EVENT_SCORE,
+        )
+        for i in range(count)
+    ])
+    await session.commit()
+    return study_session
+
+
+@pytest.mark.asyncio
+async def test_list_critical_events_paginated(client, session, user, token):
+    """Testa a listagem paginada dos eventos em ordem cronológica"""
+    study_session = await _session_with_events(session, user, EVENTS_COUNT)
+
+    response = client.get(
+        '/study-session/events',
+        params={
+            'session_id': str(study_session.id),
+            'offset': 1,
+            'limit': EVENTS_PAGE,
+        },
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    events = response.json()['events']
+    assert [event['timestamp'] for event in events] == [
+        EVENTS_START + 60,
+        EVENTS_START + 120,
+    ]
+    assert events[0]['score'] == EVENT_SCORE
+
+
+@pytest.mark.asyncio
+async def test_list_critical_events_by_range(client, session, user, token):
+    """Testa o filtro por intervalo [start, end) de instantes epoch"""
+    await _session_with_events(session, user, EVENTS_COUNT)
+
+    response = client.get(
+        '/study-session/events',
+        params={'start': EVENTS_START + 60, 'end': EVENTS_START + 180},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()['events']) == EVENTS_PAGE
+
+
+@pytest.mark.asyncio
+async def test_list_critical_events_of_other_user(
+    client, session, other_user, token
+):
+    """Testa que os eventos de outro usuário não são expostos"""
+    await _session_with_events(session, other_user, EVENTS_COUNT)
+
+    response = client.get(
+        '/study-session/events',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['events'] == []
+
+
 def test_start_study_session_success(client, session, user, token):
     """Testa início bem-sucedido de study session"""
     response = client.post(
@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from focus_track_api.utils.constants import FACE_REGIONS, LANDMARK_COUNT
+from focus_track_api.utils.utils import (
+    RegionsIndex,
+    extract_landmarks,
+    get_landmarks,
+    landmark_regions,
+)
+from tests.landmarks import FRAME_SIZE, make_landmarks
+
+SMALL_FACE_SCALE = 0.5
+
+
+def _face_mesh_result(*faces):
+    """Simula `multi_face_landmarks` do FaceMesh"""
+    return [
+        SimpleNamespace(
+            landmark=[
+                SimpleNamespace(x=float(x), y=float(y), z=float(z))
+                for x, y, z in face
+            ]
+        )
+        for face in faces
+    ]
+
+
+def test_extract_landmarks_fills_preallocated_buffer():
+    """Testa que os landmarks são copiados para o buffer informado"""
+    landmarks = make_landmarks()
+    out = np.empty((LANDMARK_COUNT, 3), dtype=np.float32)
+
+    result = extract_landmarks(_face_mesh_result(landmarks), out)
+
+    assert result is out
+    assert np.allclose(out, landmarks, atol=1e-6)
+
+
+def test_extract_landmarks_picks_biggest_face():
+    """Testa que, com vários rostos, o maior é escolhido"""
+    big = make_landmarks()
+    small = 0.5 + (big - 0.5) * SMALL_FACE_SCALE
+
+    result = extract_landmarks(_face_mesh_result(small, big))
+
+    assert np.allclose(result, big, atol=1e-6)
+
+
+def test_get_landmarks_clamps_coordinates():
+    """Testa que x e y são limitados ao frame e z é preservado"""
+    landmarks = make_landmarks(offset=(0.6, 0.0))
+
+    result = get_landmarks(_face_mesh_result(landmarks))
+
+    assert result[:, :2].max() <= 1.0
+    assert np.allclose(result[:, 2], landmarks[:, 2], atol=1e-6)
+
+
+def test_landmark_regions_matches_per_region_indexing():
+    """Testa que o índice único equivale à extração região a região"""
+    landmarks = make_landmarks().astype(np.float32)
+
+    regions = landmark_regions(landmarks, FRAME_SIZE)
+
+    assert list(regions) == list(FACE_REGIONS)
+    for region, indices in FACE_REGIONS.items():
+        expected = landmarks[indices, :2] * FRAME_SIZE
+        assert np.allclose(regions[region], expected)
+
+
+def test_landmark_regions_with_subset_index():
+    """Testa a extração de apenas algumas regiões"""
+    index = RegionsIndex({'left_eye': FACE_REGIONS['left_eye']})
+
+    regions = landmark_regions(make_landmarks(), FRAME_SIZE, index)
+
+    assert list(regions) == ['left_eye']